@@ -0,0 +1,95 @@
+"""Baseline schema: users, dcf_analyses and lbo_analyses
+
+Databases created by the app's startup create_all already have these
+tables; they are only created where missing, so such databases can be
+upgraded in place.
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-01-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('email', sa.String(), nullable=False),
+            sa.Column('username', sa.String(), nullable=False),
+            sa.Column('hashed_password', sa.String(), nullable=False),
+            sa.Column('full_name', sa.String()),
+            sa.Column('tier', sa.Enum('FREE', 'PREMIUM', 'ENTERPRISE', name='usertier'), nullable=False),
+            sa.Column('is_active', sa.Boolean()),
+            sa.Column('is_verified', sa.Boolean()),
+            sa.Column('monthly_analyses', sa.Integer()),
+            sa.Column('total_analyses', sa.Integer()),
+            sa.Column('has_factset_access', sa.Boolean()),
+            sa.Column('has_morningstar_access', sa.Boolean()),
+            sa.Column('factset_username', sa.String(), nullable=True),
+            sa.Column('morningstar_api_key', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True)),
+            sa.Column('last_login', sa.DateTime(timezone=True)),
+        )
+        op.create_index('ix_users_id', 'users', ['id'])
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+        op.create_index('ix_users_username', 'users', ['username'], unique=True)
+
+    if 'dcf_analyses' not in existing:
+        op.create_table(
+            'dcf_analyses',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('ticker', sa.String(), nullable=False),
+            sa.Column('company_name', sa.String(), nullable=False),
+            sa.Column('current_price', sa.Float()),
+            sa.Column('fair_value', sa.Float(), nullable=False),
+            sa.Column('upside_percent', sa.Float(), nullable=False),
+            sa.Column('enterprise_value', sa.Float()),
+            sa.Column('equity_value', sa.Float()),
+            sa.Column('dcf_results', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True)),
+        )
+        op.create_index('ix_dcf_analyses_id', 'dcf_analyses', ['id'])
+        op.create_index('ix_dcf_analyses_ticker', 'dcf_analyses', ['ticker'])
+
+    if 'lbo_analyses' not in existing:
+        op.create_table(
+            'lbo_analyses',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('ticker', sa.String(), nullable=False),
+            sa.Column('company_name', sa.String(), nullable=False),
+            sa.Column('purchase_multiple', sa.Float(), nullable=False),
+            sa.Column('exit_multiple', sa.Float(), nullable=False),
+            sa.Column('debt_percent', sa.Float(), nullable=False),
+            sa.Column('hold_period', sa.Integer(), nullable=False),
+            sa.Column('irr', sa.Float(), nullable=False),
+            sa.Column('moic', sa.Float(), nullable=False),
+            sa.Column('entry_equity', sa.Float()),
+            sa.Column('exit_equity', sa.Float()),
+            sa.Column('lbo_results', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True)),
+        )
+        op.create_index('ix_lbo_analyses_id', 'lbo_analyses', ['id'])
+        op.create_index('ix_lbo_analyses_ticker', 'lbo_analyses', ['ticker'])
+
+
+def downgrade() -> None:
+    op.drop_table('lbo_analyses')
+    op.drop_table('dcf_analyses')
+    op.drop_table('users')
+    sa.Enum(name='usertier').drop(op.get_bind(), checkfirst=True)
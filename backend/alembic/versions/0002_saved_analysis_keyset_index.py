@@ -0,0 +1,32 @@
+"""Composite (user_id, created_at, id) indexes for keyset-paginated listings
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-01-22
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'dcf_analyses': 'ix_dcf_analyses_user_created_id',
+    'lbo_analyses': 'ix_lbo_analyses_user_created_id',
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, name in INDEXES.items():
+        # Tables created by a newer startup create_all already carry the index
+        if name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, ['user_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    for table, name in INDEXES.items():
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,221 @@
+"""Store saved analysis results in the compact columnar format
+
+Adds dcf_results_blob / lbo_results_blob, makes the JSON columns nullable
+and re-encodes existing rows in the columnar format, clearing their JSON.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-02-05
+"""
+import json
+import struct
+import zlib
+from typing import Any, Dict, List
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+RESULT_COLUMNS = {
+    'dcf_analyses': 'dcf_results',
+    'lbo_analyses': 'lbo_results',
+}
+BATCH_SIZE = 500
+
+
+# ============ FROZEN CODEC ============
+# Version 1 of app.utils.columnar as this revision shipped it. Kept here so
+# later changes to the app's codec never change what this migration writes
+# or reads. The app's later payloads only add header keys, so downgrades can
+# still read them here.
+
+try:
+    import zstandard
+except ImportError:  # zlib is always available
+    zstandard = None
+
+MAGIC = b"AFC1"
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# Lists shorter than this stay in the JSON header
+MIN_TABLE_ROWS = 2
+
+_HEADER = struct.Struct("<4sBI")  # magic, codec, header length
+_MAX_EXACT_INT = 2 ** 53  # Largest integer range float64 holds exactly
+
+# Single-key dicts with these keys are markers in the encoded tree
+_TABLE_KEY = "__table__"
+_LITERAL_KEY = "__literal__"
+
+
+def encode_results(results: Any) -> bytes:
+    """Encode a JSON-compatible result tree
+
+    Every list of flat dicts with the same keys and numeric values (the
+    per-year projection and debt schedule tables) becomes one row-major
+    float64 block; everything else stays JSON. The whole payload is
+    compressed with zstd when available, zlib otherwise.
+    """
+    tables: List[Dict] = []
+    tree = _extract_tables(results, tables)
+    blocks = [table.pop("block") for table in tables]
+
+    header = json.dumps({"tree": tree, "tables": tables}, separators=(",", ":")).encode()
+    body = header + b"".join(block.tobytes() for block in blocks)
+
+    if zstandard is not None:
+        codec, payload = CODEC_ZSTD, zstandard.ZstdCompressor(level=3).compress(body)
+    else:
+        codec, payload = CODEC_ZLIB, zlib.compress(body, 6)
+    return _HEADER.pack(MAGIC, codec, len(header)) + payload
+
+
+def decode_results(blob: bytes) -> Any:
+    """Inverse of encode_results"""
+    magic, codec, header_length = _HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError("Not a columnar result payload")
+
+    payload = memoryview(blob)[_HEADER.size:]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstandard is required to read this result payload")
+        body = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec == CODEC_ZLIB:
+        body = zlib.decompress(payload)
+    else:
+        raise ValueError(f"Unknown result codec {codec}")
+
+    header = json.loads(body[:header_length])
+    offset = header_length
+    tables = []
+    for table in header["tables"]:
+        names, rows = table["columns"], table["rows"]
+        count = rows * len(names)
+        values = np.frombuffer(body, dtype="<f8", count=count, offset=offset).reshape(rows, len(names))
+        offset += count * 8
+
+        records = values.tolist()
+        if table["nulls"]:
+            records = [[None if value != value else value for value in record] for record in records]
+        for index in table["ints"]:
+            for record in records:
+                record[index] = int(record[index])
+        tables.append([dict(zip(names, record)) for record in records])
+
+    return _restore_tables(header["tree"], tables)
+
+
+def _extract_tables(value: Any, tables: List[Dict]) -> Any:
+    if isinstance(value, dict):
+        encoded = {key: _extract_tables(item, tables) for key, item in value.items()}
+        if len(value) == 1 and next(iter(value)) in (_TABLE_KEY, _LITERAL_KEY):
+            return {_LITERAL_KEY: encoded}
+        return encoded
+    if isinstance(value, list):
+        table = _as_table(value)
+        if table is not None:
+            tables.append(table)
+            return {_TABLE_KEY: len(tables) - 1}
+        return [_extract_tables(item, tables) for item in value]
+    return value
+
+
+def _as_table(rows: list):
+    """Row-major float64 block for a list of same-keyed numeric dicts, else None"""
+    if len(rows) < MIN_TABLE_ROWS or not all(isinstance(row, dict) for row in rows):
+        return None
+    names = list(rows[0])
+    if not names or any(list(row) != names for row in rows):
+        return None
+
+    records = [list(row.values()) for row in rows]
+    ints, nulls = [], False
+    for index in range(len(names)):
+        kinds = {type(record[index]) for record in records}
+        # bools are not numbers here; ints must survive the float64 round trip
+        if kinds == {int}:
+            if any(abs(record[index]) > _MAX_EXACT_INT for record in records):
+                return None
+            ints.append(index)
+        elif not kinds <= {int, float, type(None)}:
+            return None
+        elif type(None) in kinds:
+            nulls = True
+
+    block = np.array(records, dtype="<f8") if not nulls else np.array(
+        [[np.nan if value is None else value for value in record] for record in records], dtype="<f8"
+    )
+    return {"rows": len(rows), "columns": names, "ints": ints, "nulls": nulls, "block": block}
+
+
+def _restore_tables(value: Any, tables: List[list]) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and _TABLE_KEY in value:
+            return tables[value[_TABLE_KEY]]
+        if len(value) == 1 and _LITERAL_KEY in value:
+            value = value[_LITERAL_KEY]
+        return {key: _restore_tables(item, tables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_restore_tables(item, tables) for item in value]
+    return value
+
+
+def _table(name: str, field: str):
+    return sa.table(
+        name,
+        sa.column('id', sa.Integer()),
+        sa.column(field, sa.JSON()),
+        sa.column(f'{field}_blob', sa.LargeBinary()),
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for name, field in RESULT_COLUMNS.items():
+        with op.batch_alter_table(name) as batch:
+            batch.add_column(sa.Column(f'{field}_blob', sa.LargeBinary(), nullable=True))
+            batch.alter_column(field, existing_type=sa.JSON(), nullable=True)
+
+        table = _table(name, field)
+        json_column, blob_column = table.c[field], table.c[f'{field}_blob']
+        last_id = 0
+        while True:
+            rows = bind.execute(
+                sa.select(table.c.id, json_column)
+                .where(table.c.id > last_id, blob_column.is_(None), json_column.isnot(None))
+                .order_by(table.c.id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                bind.execute(
+                    table.update().where(table.c.id == row.id)
+                    .values({f'{field}_blob': encode_results(row[1]), field: sa.null()})
+                )
+            last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for name, field in RESULT_COLUMNS.items():
+        table = _table(name, field)
+        blob_column = table.c[f'{field}_blob']
+        rows = bind.execute(sa.select(table.c.id, blob_column).where(blob_column.isnot(None))).all()
+        for row in rows:
+            bind.execute(
+                table.update().where(table.c.id == row.id)
+                .values({field: decode_results(row[1])})
+            )
+
+        with op.batch_alter_table(name) as batch:
+            batch.drop_column(f'{field}_blob')
+            batch.alter_column(field, existing_type=sa.JSON(), nullable=False)
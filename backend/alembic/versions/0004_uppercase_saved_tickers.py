@@ -0,0 +1,29 @@
+"""Upper-case the tickers of saved analyses
+
+Saves stored tickers as given while listings and exports filter on the
+upper-cased ticker, so analyses saved as e.g. "aapl" could not be found
+by ticker. Saves now upper-case the ticker; this normalizes older rows.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-02-19
+"""
+from alembic import op
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+TABLES = ('dcf_analyses', 'lbo_analyses')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(f"UPDATE {table} SET ticker = UPPER(ticker) WHERE ticker <> UPPER(ticker)")
+
+
+def downgrade() -> None:
+    # The original casing is not kept; upper-case tickers are valid either way
+    pass
@@ -0,0 +1,30 @@
+"""Track the billing month of users.monthly_analyses
+
+monthly_analyses was never reset, so a user who used up a month's quota
+stayed locked out. usage_period records the month (YYYYMM) the count
+belongs to; usage flushes restart the count when the month changes and
+quota checks ignore counts from earlier months. Existing counts have no
+known month and are left to be replaced by the next flush.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-03-04
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('users') as batch:
+        batch.add_column(sa.Column('usage_period', sa.String(6), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch:
+        batch.drop_column('usage_period')
@@ -5,24 +5,24 @@ File: backend/app/api/v1/routes/auth.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from typing import Optional
+from typing import Optional, Union
+import time
 
-from app.database import get_db
+from app.core.auth_cache import get_password_hasher, password_context, token_cache, user_cache
+from app.core.entitlements import Feature, feature_bits, feature_keys, tier_entitlements
+from app.database import get_async_db
 from app.models.analysis import User
 from app.config import settings
 
 router = APIRouter()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
 # Pydantic models
 class UserCreate(BaseModel):
@@ -45,12 +45,12 @@ class TokenData(BaseModel):
 
 # Helper functions
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against a hash (blocking; handlers use get_password_hasher())"""
+    return password_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+    """Hash a password (blocking; handlers use get_password_hasher())"""
+    return password_context().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
@@ -61,18 +61,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def get_user_by_email(db: Session, email: str):
+async def get_user_by_email(db: AsyncSession, email: str):
     """Get user by email"""
-    return db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
-def get_user_by_username(db: Session, username: str):
+async def get_user_by_username(db: AsyncSession, username: str):
     """Get user by username"""
-    return db.query(User).filter(User.username == username).first()
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     """Get current authenticated user"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -80,35 +83,78 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+    # Tokens already verified recently skip the signature check
+    username = token_cache.get(token)
+    if username is None:
+        from jose import JWTError, jwt
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            username: str = payload.get("sub")
+            if username is None:
+                raise credentials_exception
+            token_data = TokenData(username=username)
+        except JWTError:
             raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
-        raise credentials_exception
+        username = token_data.username
+        # Never past the token's own expiry
+        expires = payload.get("exp")
+        token_cache.set(token, username, ttl=expires - time.time() if expires is not None else None)
     
-    user = get_user_by_username(db, username=token_data.username)
+    user = user_cache.get(username)
     if user is None:
-        raise credentials_exception
+        user = await get_user_by_username(db, username=username)
+        if user is None:
+            raise credentials_exception
+        # Detached, so the cached row outlives this request's session
+        db.expunge(user)
+        user_cache.set(username, user)
     return user
 
+async def get_optional_user(token: Optional[str] = Depends(optional_oauth2_scheme),
+                            db: AsyncSession = Depends(get_async_db)):
+    """Authenticated user when a valid token is sent, otherwise None"""
+    if not token:
+        return None
+    try:
+        return await get_current_user(token, db)
+    except HTTPException:
+        return None
+
+def require_feature(feature: Union[Feature, str]):
+    """Dependency admitting only users whose tier includes ``feature``
+    
+    e.g. ``@router.post("/comps", dependencies=[Depends(require_feature(Feature.COMPS_ANALYSIS))])``
+    """
+    bits = feature_bits(feature)
+    if not bits:
+        raise ValueError(f"Unknown feature: {feature}")
+    names = ", ".join(feature_keys(bits))
+    
+    async def check_feature(current_user: User = Depends(get_current_user)) -> User:
+        if tier_entitlements(current_user.tier) & bits != bits:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Your plan does not include {names}"
+            )
+        return current_user
+    
+    return check_feature
+
 # Routes
 @router.post("/signup", response_model=UserResponse)
-async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
+async def signup(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user
     """
     # Check if user already exists
-    existing_user = get_user_by_email(db, user_data.email)
+    existing_user = await get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    existing_username = get_user_by_username(db, user_data.username)
+    existing_username = await get_user_by_username(db, user_data.username)
     if existing_username:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -116,7 +162,7 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hasher().hash(user_data.password)
     new_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -125,22 +171,22 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """
     Login and get access token
     """
     # Try to find user by username or email
-    user = get_user_by_username(db, form_data.username)
+    user = await get_user_by_username(db, form_data.username)
     if not user:
-        user = get_user_by_email(db, form_data.username)
+        user = await get_user_by_email(db, form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await get_password_hasher().verify(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username/email or password",
@@ -162,6 +208,16 @@ async def get_me(current_user: User = Depends(get_current_user)):
     """
     return current_user
 
+@router.get("/cache-stats")
+async def auth_cache_stats():
+    """Password hashing pool and token/user cache counters"""
+    return {
+        "success": True,
+        "password_hashing": get_password_hasher().get_stats(),
+        "token_cache": token_cache.get_stats(),
+        "user_cache": user_cache.get_stats()
+    }
+
 @router.post("/logout")
 async def logout():
     """
@@ -0,0 +1,123 @@
+"""
+Rate Limit and Quota Dependencies
+Per-tier request limits for every API route and monthly quotas for model runs
+
+The check_* functions and charged_analysis take the caller directly, for
+WebSocket handlers where request dependencies do not apply.
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from starlette.requests import HTTPConnection
+
+from app.api.v1.middleware.auth import get_optional_user
+from app.config import settings
+from app.core.entitlements import monthly_analysis_limit, usage_period
+from app.core.rate_limit import (
+    ANONYMOUS_QUOTA_TTL, QUOTA_TTL, RATE_LIMIT_WINDOW, Decision, get_rate_limiter, get_usage_recorder,
+    tier_rate_limit
+)
+from app.models.user import User, UserTier
+
+
+async def _check(method: str, *args) -> Decision:
+    limiter = get_rate_limiter()
+    if limiter.name == "redis":
+        # redis-py blocks; keep the round trip off the event loop
+        return await run_in_threadpool(getattr(limiter, method), *args)
+    return getattr(limiter, method)(*args)
+
+
+def _client_key(connection: HTTPConnection) -> str:
+    return f"ip:{connection.client.host if connection.client else 'unknown'}"
+
+
+async def check_rate_limit(connection: HTTPConnection, user: Optional[User]):
+    """Raise 429 when the caller is over its per-minute limit"""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    if user is not None:
+        key, tier = f"user:{user.id}", user.tier
+    else:
+        key, tier = _client_key(connection), UserTier.FREE
+
+    decision = await _check("hit", key, tier_rate_limit(tier), RATE_LIMIT_WINDOW)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Rate limit of {decision.limit} requests per minute exceeded",
+            headers={
+                "Retry-After": str(decision.retry_after),
+                "X-RateLimit-Limit": str(decision.limit),
+                "X-RateLimit-Remaining": "0",
+            },
+        )
+
+
+def _quota_key(user: Optional[User], connection: Optional[HTTPConnection], period: str) -> str:
+    return f"user:{user.id}:{period}" if user is not None else f"{_client_key(connection)}:{period}"
+
+
+async def check_analysis_quota(user: Optional[User], connection: Optional[HTTPConnection] = None) -> Optional[str]:
+    """Reserve one model run of the caller's monthly analyses; 429 once they are used up
+
+    Anonymous callers get the free tier's allowance per client IP, counted
+    in the limiter alone. Returns the billing month the run was reserved in
+    (None when nothing was reserved); pass it to settle_analysis_quota once
+    the run is over.
+    """
+    if not settings.RATE_LIMIT_ENABLED or (user is None and connection is None):
+        return None
+    period = usage_period()
+    if user is not None:
+        tier, limit, used, ttl = user.tier, user.get_monthly_limit(), user.analyses_in_period(period), QUOTA_TTL
+    else:
+        tier, limit, used, ttl = UserTier.FREE, monthly_analysis_limit(UserTier.FREE), 0, ANONYMOUS_QUOTA_TTL
+    decision = await _check("consume", _quota_key(user, connection, period), limit, used, ttl)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Monthly limit of {decision.limit} analyses reached for the {UserTier(tier).value} tier",
+        )
+    return period
+
+
+async def settle_analysis_quota(user: Optional[User], period: Optional[str], succeeded: bool,
+                                connection: Optional[HTTPConnection] = None):
+    """Charge a reserved run to the caller's usage, or give it back when the run failed"""
+    if period is None:
+        return
+    if not succeeded:
+        await _check("release", _quota_key(user, connection, period))
+    elif user is not None:
+        # An anonymous run stays counted in the limiter; there is no row to record it on
+        get_usage_recorder().record(user.id, period)
+
+
+@asynccontextmanager
+async def charged_analysis(user: Optional[User], connection: Optional[HTTPConnection] = None) -> AsyncIterator[None]:
+    """Reserve one model run for the block; it counts only if the block does not raise"""
+    period = await check_analysis_quota(user, connection)
+    try:
+        yield
+    except BaseException:
+        await settle_analysis_quota(user, period, succeeded=False, connection=connection)
+        raise
+    await settle_analysis_quota(user, period, succeeded=True, connection=connection)
+
+
+async def rate_limit(request: Request, user: Optional[User] = Depends(get_optional_user)):
+    """Sliding-window limit per user (per client IP when anonymous), sized by tier"""
+    await check_rate_limit(request, user)
+
+
+async def analysis_quota(request: Request, user: Optional[User] = Depends(get_optional_user)):
+    """Count one model run against the caller's monthly analyses, unless the handler fails
+
+    Anonymous callers are metered per client IP.
+    """
+    async with charged_analysis(user, request):
+        yield
@@ -1,7 +1,29 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+import json
+import time
+import numpy as np
+
+from app.api.v1.middleware.rate_limit import analysis_quota
+from app.config import settings
+from app.core.memo import get_model_cache
+from app.core.responses import FastJSONResponse
+from app.core.single_flight import valuation_flight
+from app.schemas.analysis import DCFInputs, MonteCarloDistribution, MonteCarloOutputs
+from app.services.data.mock_data import MockDataService
+from app.services.data.sources import get_data_service
+from app.services.modeling.dcf import MAX_GRID_CELLS, validate_projection_years
+from app.services.modeling.monte_carlo import MonteCarloValuation
+from app.services.modeling.lbo import MAX_HOLD_PERIOD
+from app.services.modeling.offload import run_dcf, run_monte_carlo, run_scenarios, run_screen, run_sensitivity_grid
+from app.services.modeling.screening import MAX_SCREEN_TICKERS, SCREEN_OVERRIDE_FIELDS
+from app.services.modeling.sensitivity import SensitivityAnalysis, check_grid_size
+from app.utils.hashing import stable_hash
 
 router = APIRouter()
+data_service = MockDataService()
 
 class DCFRequest(BaseModel):
     ticker: str
@@ -9,181 +31,317 @@ class DCFRequest(BaseModel):
 class ScenarioRequest(BaseModel):
     ticker: str
 
-@router.post("/quick")
+class SensitivityAxis(BaseModel):
+    name: str
+    start: float = 0.0
+    stop: float = 0.0
+    steps: int = Field(5, ge=1, le=MAX_GRID_CELLS)
+    values: Optional[List[float]] = Field(None, max_length=MAX_GRID_CELLS)  # Explicit values override start/stop/steps
+
+    @property
+    def size(self) -> int:
+        return len(self.values) if self.values is not None else self.steps
+
+    def to_array(self) -> np.ndarray:
+        if self.values is not None:
+            return np.asarray(self.values, dtype=np.float64)
+        return np.linspace(self.start, self.stop, self.steps)
+
+class SensitivityRequest(BaseModel):
+    ticker: str
+    x_axis: SensitivityAxis = SensitivityAxis(name="wacc", start=0.06, stop=0.10, steps=5)
+    y_axis: SensitivityAxis = SensitivityAxis(name="terminal_growth_rate", start=0.015, stop=0.035, steps=5)
+    output: str = "value_per_share"
+    format: str = "columnar"  # "columnar" (JSON) or "binary" (float64 little-endian)
+    base_inputs: Optional[DCFInputs] = None
+
+class MonteCarloRequest(BaseModel):
+    ticker: str
+    paths: int = 100_000
+    seed: int = 0
+    distributions: Dict[str, MonteCarloDistribution] = {}  # Unset variables use the bear/bull spread
+    base_inputs: Optional[DCFInputs] = None
+
+class ScreenLBOTerms(BaseModel):
+    purchase_multiple: float = 10.0
+    exit_multiple: float = 10.0
+    debt_percent: float = 0.60
+    interest_rate: float = 0.06
+    hold_period: int = Field(5, ge=1, le=MAX_HOLD_PERIOD)
+    management_fees: float = 0.02
+
+class BatchScreenRequest(BaseModel):
+    tickers: List[str]
+    overrides: Dict[str, float] = {}  # Applied to every ticker, e.g. {"wacc": 0.1}
+    lbo: Optional[ScreenLBOTerms] = None  # Adds IRR/MOIC columns when set
+    ranked: bool = True  # False streams each chunk as soon as it is valued
+    limit: Optional[int] = None  # Top N rows only (ranked screens)
+    chunk_size: int = 250
+
+@router.post("/quick", dependencies=[Depends(analysis_quota)])
 async def quick_dcf(request: DCFRequest):
     """Quick DCF analysis using default assumptions"""
     ticker = request.ticker.upper()
     
-    # Complete mock response with properly capitalized fields
+    # Identical concurrent requests share one data fetch and model run
+    try:
+        result = await valuation_flight.do(
+            stable_hash({"ticker": ticker}, "quick"),
+            lambda: _quick_dcf(ticker)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(result)
+
+async def _quick_dcf(ticker: str) -> dict:
+    company_info = data_service.get_company_info(ticker)
+    inputs = DCFInputs(**data_service.get_dcf_inputs(ticker))
+    
+    results, terminal_value = await valuation_flight.do(
+        stable_hash(inputs, "dcf"),
+        lambda: run_dcf(inputs)
+    )
+    
+    current_price = inputs.current_price
+    upside = (results.value_per_share - current_price) / current_price * 100 if current_price > 0 else 0.0
+    
     return {
         "ticker": ticker,
-        "company_name": f"{ticker} Corporation",
-        "current_price": 100.00,
-        "upside": 10.50,
+        "company_name": company_info["name"],
+        "current_price": current_price,
+        "upside": round(upside, 2),
         "dcf_results": {
-            "value_per_share": 110.50,
-            "enterprise_value": 50000000000,
-            "equity_value": 48000000000,
-            "wacc": 0.08,
-            "terminal_growth_rate": 0.025,
-            "pv_fcf": 20000000000,
-            "pv_terminal": 28000000000,
-            "projections": [
-                {
-                    "Year": 1,
-                    "Revenue": 100000000000,
-                    "EBITDA": 30000000000,
-                    "EBIT": 28000000000,
-                    "NOPAT": 21000000000,
-                    "FCF": 19000000000
-                },
-                {
-                    "Year": 2,
-                    "Revenue": 115000000000,
-                    "EBITDA": 34500000000,
-                    "EBIT": 32200000000,
-                    "NOPAT": 24150000000,
-                    "FCF": 21850000000
-                },
-                {
-                    "Year": 3,
-                    "Revenue": 132250000000,
-                    "EBITDA": 39675000000,
-                    "EBIT": 37030000000,
-                    "NOPAT": 27773000000,
-                    "FCF": 25128000000
-                },
-                {
-                    "Year": 4,
-                    "Revenue": 152087500000,
-                    "EBITDA": 45626250000,
-                    "EBIT": 42585000000,
-                    "NOPAT": 31939000000,
-                    "FCF": 28897000000
-                },
-                {
-                    "Year": 5,
-                    "Revenue": 174900625000,
-                    "EBITDA": 52470187500,
-                    "EBIT": 48972000000,
-                    "NOPAT": 36729000000,
-                    "FCF": 33231000000
-                },
-                {
-                    "Year": 6,
-                    "Revenue": 201135718750,
-                    "EBITDA": 60341000000,
-                    "EBIT": 56318000000,
-                    "NOPAT": 42239000000,
-                    "FCF": 38216000000
-                },
-                {
-                    "Year": 7,
-                    "Revenue": 231306076563,
-                    "EBITDA": 69392000000,
-                    "EBIT": 64766000000,
-                    "NOPAT": 48575000000,
-                    "FCF": 43948000000
-                },
-                {
-                    "Year": 8,
-                    "Revenue": 266002988047,
-                    "EBITDA": 79801000000,
-                    "EBIT": 74481000000,
-                    "NOPAT": 55861000000,
-                    "FCF": 50540000000
-                },
-                {
-                    "Year": 9,
-                    "Revenue": 305903436254,
-                    "EBITDA": 91771000000,
-                    "EBIT": 85653000000,
-                    "NOPAT": 64240000000,
-                    "FCF": 58121000000
-                },
-                {
-                    "Year": 10,
-                    "Revenue": 351788951692,
-                    "EBITDA": 105537000000,
-                    "EBIT": 98501000000,
-                    "NOPAT": 73876000000,
-                    "FCF": 66839000000
-                }
-            ],
-            "terminal_value": 1200000000000,
-            "pv_terminal_value": 816326530612,
-            "total_pv": 948000000000
+            "value_per_share": results.value_per_share,
+            "enterprise_value": results.enterprise_value,
+            "equity_value": results.equity_value,
+            "wacc": inputs.wacc,
+            "terminal_growth_rate": inputs.terminal_growth_rate,
+            "pv_fcf": results.pv_fcf,
+            "pv_terminal": results.pv_terminal,
+            "projections": results.projections,
+            "terminal_value": terminal_value,
+            "pv_terminal_value": results.pv_terminal,
+            "total_pv": results.enterprise_value
         }
     }
 
-@router.post("/scenarios")
+@router.post("/scenarios", dependencies=[Depends(analysis_quota)])
 async def scenario_analysis(request: ScenarioRequest):
     """Generate Bear, Base, and Bull scenarios"""
     ticker = request.ticker.upper()
     
-    base_projections = [
-        {"Year": 1, "Revenue": 100000000000, "EBITDA": 30000000000, "EBIT": 28000000000, "NOPAT": 21000000000, "FCF": 19000000000},
-        {"Year": 2, "Revenue": 115000000000, "EBITDA": 34500000000, "EBIT": 32200000000, "NOPAT": 24150000000, "FCF": 21850000000},
-        {"Year": 3, "Revenue": 132250000000, "EBITDA": 39675000000, "EBIT": 37030000000, "NOPAT": 27773000000, "FCF": 25128000000},
-        {"Year": 4, "Revenue": 152087500000, "EBITDA": 45626250000, "EBIT": 42585000000, "NOPAT": 31939000000, "FCF": 28897000000},
-        {"Year": 5, "Revenue": 174900625000, "EBITDA": 52470187500, "EBIT": 48972000000, "NOPAT": 36729000000, "FCF": 33231000000},
-    ]
+    try:
+        company_info = data_service.get_company_info(ticker)
+        inputs = DCFInputs(**data_service.get_dcf_inputs(ticker))
+        
+        # Scenarios, base case and sensitivity grid all value the same inputs
+        scenarios = await run_scenarios(inputs)
+        base_case, terminal_value = await valuation_flight.do(
+            stable_hash(inputs, "dcf"),
+            lambda: run_dcf(inputs)
+        )
+        
+        wacc_range = [0.06, 0.07, 0.08, 0.09, 0.10]
+        growth_range = [0.015, 0.020, 0.025, 0.030, 0.035]
+        sensitivity = SensitivityAnalysis(inputs).wacc_terminal_grid(np.array(wacc_range), np.array(growth_range))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return {
+    return FastJSONResponse({
         "ticker": ticker,
-        "company_name": f"{ticker} Corporation",
-        "current_price": 100.00,
-        "scenarios": {
-            "bear": {
-                "value_per_share": 85.30,
-                "upside": -14.7,
-                "assumptions": {
-                    "wacc": 0.10,
-                    "terminal_growth": 0.02,
-                    "revenue_growth": 0.08,
-                    "ebitda_margin": 0.28
-                }
-            },
-            "base": {
-                "value_per_share": 110.50,
-                "upside": 10.5,
-                "assumptions": {
-                    "wacc": 0.08,
-                    "terminal_growth": 0.025,
-                    "revenue_growth": 0.15,
-                    "ebitda_margin": 0.30
-                }
-            },
-            "bull": {
-                "value_per_share": 135.80,
-                "upside": 35.8,
-                "assumptions": {
-                    "wacc": 0.06,
-                    "terminal_growth": 0.03,
-                    "revenue_growth": 0.20,
-                    "ebitda_margin": 0.32
-                }
-            }
-        },
+        "company_name": company_info["name"],
+        "current_price": inputs.current_price,
+        "scenarios": {name: scenarios[name] for name in ("bear", "base", "bull")},
         "base_case": {
-            "enterprise_value": 50000000000,
-            "equity_value": 48000000000,
-            "wacc": 0.08,
-            "terminal_growth_rate": 0.025,
-            "projections": base_projections,
-            "terminal_value": 1200000000000,
-            "pv_terminal_value": 816326530612,
-            "total_pv": 948000000000
+            "enterprise_value": base_case.enterprise_value,
+            "equity_value": base_case.equity_value,
+            "wacc": inputs.wacc,
+            "terminal_growth_rate": inputs.terminal_growth_rate,
+            "projections": base_case.projections,
+            "terminal_value": terminal_value,
+            "pv_terminal_value": base_case.pv_terminal,
+            "total_pv": base_case.enterprise_value
         },
         "sensitivity_analysis": {
-            "wacc_range": [0.06, 0.07, 0.08, 0.09, 0.10],
-            "growth_range": [0.015, 0.020, 0.025, 0.030, 0.035],
-            "values": [
-                [145.2, 135.8, 127.5, 120.1, 113.5],
-                [138.5, 129.7, 122.0, 115.2, 109.1],
-                [132.3, 124.1, 116.8, 110.5, 104.8],
-                [126.5, 118.9, 112.0, 106.0, 100.6],
-                [121.1, 114.1, 107.6, 101.9, 96.7]
-            ]
+            "wacc_range": wacc_range,
+            "growth_range": growth_range,
+            "values": np.round(sensitivity, 1)
         }
-    }
+    })
+
+@router.post("/sensitivity", dependencies=[Depends(analysis_quota)])
+async def sensitivity_grid(request: SensitivityRequest):
+    """
+    Two-way sensitivity surface over any pair of DCF assumptions
+
+    The columnar format returns axis values plus the grid flattened row-major
+    (x major). The binary format returns x values, y values and the grid as
+    consecutive little-endian float64 arrays, described by the X-Grid-*
+    headers.
+    """
+    ticker = request.ticker.upper()
+
+    try:
+        base_inputs = request.base_inputs or DCFInputs(**data_service.get_dcf_inputs(ticker))
+        # Checked before either axis is materialized
+        check_grid_size(
+            request.x_axis.name, request.x_axis.size,
+            request.y_axis.name, request.y_axis.size,
+            base_inputs.projection_years
+        )
+        x_values = request.x_axis.to_array()
+        y_values = request.y_axis.to_array()
+
+        grid = await run_sensitivity_grid(
+            base_inputs,
+            request.x_axis.name, x_values,
+            request.y_axis.name, y_values,
+            request.output
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if request.format == "binary":
+        payload = np.concatenate([x_values, y_values, grid.ravel()]).astype("<f8")
+        return Response(
+            content=payload.tobytes(),
+            media_type="application/octet-stream",
+            headers={
+                "X-Grid-Shape": f"{x_values.size},{y_values.size}",
+                "X-Grid-Axes": f"{request.x_axis.name},{request.y_axis.name}",
+                "X-Grid-Output": request.output,
+                "X-Grid-Dtype": "<f8",
+            }
+        )
+
+    return FastJSONResponse({
+        "ticker": ticker,
+        "output": request.output,
+        "shape": [x_values.size, y_values.size],
+        "x_axis": {"name": request.x_axis.name, "values": x_values},
+        "y_axis": {"name": request.y_axis.name, "values": y_values},
+        "values": grid.ravel()
+    })
+
+
+@router.post("/monte-carlo", response_model=MonteCarloOutputs, dependencies=[Depends(analysis_quota)])
+async def monte_carlo(request: MonteCarloRequest):
+    """
+    Distribution of value per share and upside under sampled assumptions
+
+    Runs on the compute pool. Larger runs than MONTE_CARLO_MAX_INLINE_PATHS
+    are refused here; submit them as a "monte_carlo" job instead.
+    """
+    ticker = request.ticker.upper()
+    if request.paths > settings.MONTE_CARLO_MAX_INLINE_PATHS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Runs above {settings.MONTE_CARLO_MAX_INLINE_PATHS} paths must be submitted "
+                   f"as a monte_carlo job (POST /api/v1/jobs)"
+        )
+    
+    try:
+        base_inputs = request.base_inputs or DCFInputs(**data_service.get_dcf_inputs(ticker))
+        simulation = MonteCarloValuation(base_inputs, request.distributions)
+        return await run_monte_carlo(simulation, request.paths, request.seed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/batch", dependencies=[Depends(analysis_quota)])
+async def batch_screen(request: BatchScreenRequest):
+    """
+    Value a whole ticker universe in one call, streamed as NDJSON
+
+    The first line is a header; ranked screens then report progress per
+    fetched chunk and stream rows by descending upside once the universe is
+    valued, while unranked screens stream each chunk's rows as soon as it is
+    valued. The last line is a summary. Every line carries a "type" field.
+    """
+    tickers = validate_screen(request.tickers, request.overrides)
+    return StreamingResponse(_screen_stream(tickers, request), media_type="application/x-ndjson")
+
+def validate_screen(tickers: List[str], overrides: Dict[str, float]) -> List[str]:
+    """A screen's tickers, deduplicated and upper-cased; 400 for anything the screen would reject
+
+    Shared by /batch, screen jobs and screen exports, so queued screens fail at submit time.
+    """
+    tickers = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker.strip()))
+    if not tickers:
+        raise HTTPException(status_code=400, detail="No tickers to screen")
+    if len(tickers) > MAX_SCREEN_TICKERS:
+        raise HTTPException(status_code=400, detail=f"Screen exceeds {MAX_SCREEN_TICKERS} tickers")
+    unknown = sorted(set(overrides) - set(SCREEN_OVERRIDE_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported screen overrides: {', '.join(unknown)}")
+    if "projection_years" in overrides:
+        try:
+            validate_projection_years(overrides["projection_years"])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return tickers
+
+async def _screen_stream(tickers: List[str], request: BatchScreenRequest):
+    started = time.perf_counter()
+    chunk_size = min(max(request.chunk_size, 1), 1000)
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    lbo_terms = request.lbo.dict() if request.lbo is not None else None
+
+    yield _ndjson({
+        "type": "header",
+        "count": len(tickers),
+        "ranked": request.ranked,
+        "overrides": request.overrides,
+        "lbo": lbo_terms,
+    })
+
+    valued = 0
+    try:
+        universe = {}
+        for chunk in chunks:
+            # Screens follow MARKET_DATA_SOURCE; the async fetch never blocks the loop
+            inputs = await get_data_service().get_bulk_dcf_inputs_async(chunk)
+            if request.ranked:
+                universe.update(inputs)
+                yield _ndjson({"type": "progress", "fetched": len(universe), "count": len(tickers)})
+                continue
+
+            # Valued and ranked on the compute pool, like every other model run
+            rows = await run_screen(inputs, request.overrides, lbo_terms)
+            valued += _count_valued(rows)
+            yield "".join(_ndjson({"type": "row", **row}) for row in rows)
+
+        if request.ranked:
+            rows = await run_screen(universe, request.overrides, lbo_terms, request.limit, start_rank=1)
+
+            # Serialize in slices so the first rows go out before the last are encoded
+            for start in range(0, len(rows), chunk_size):
+                batch = rows[start:start + chunk_size]
+                valued += _count_valued(batch)
+                yield "".join(_ndjson({"type": "row", **row}) for row in batch)
+    except Exception as e:
+        # Headers are already sent, so failures are reported in-band
+        yield _ndjson({"type": "error", "detail": str(e)})
+        return
+
+    yield _ndjson({
+        "type": "summary",
+        "count": len(tickers),
+        "valued": valued,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+
+def _count_valued(rows: List[Dict]) -> int:
+    return sum(row["value_per_share"] is not None for row in rows)
+
+def _ndjson(payload: Dict) -> str:
+    return json.dumps(payload, separators=(",", ":")) + "\n"
+
+@router.get("/single-flight-stats")
+async def single_flight_stats():
+    """How many valuation requests were collapsed into shared computations"""
+    return {"success": True, "single_flight": valuation_flight.get_stats()}
+
+@router.get("/model-cache-stats")
+async def model_cache_stats():
+    """Memoized model result counts, sizes and hit rates"""
+    return {"success": True, "model_cache": get_model_cache().get_stats()}
@@ -0,0 +1,139 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+from app.api.v1.middleware.auth import get_optional_user
+from app.api.v1.middleware.rate_limit import analysis_quota
+from app.api.v1.routes.analysis import ScreenLBOTerms, SensitivityAxis, validate_screen
+from app.api.v1.routes.jobs import describe_job
+from app.api.v1.routes.lbo import LBORequest, build_lbo_inputs
+from app.core.jobs import get_job_queue
+from app.models.user import User, UserTier
+from app.schemas.analysis import DCFInputs
+from app.services.export.jobs import export_path
+from app.services.export.workbook import EXPORT_FORMATS
+
+router = APIRouter()
+
+MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "zip": "application/zip",
+}
+
+class ExportDCFRequest(BaseModel):
+    ticker: str
+    format: str = "xlsx"  # "xlsx" or "csv" (a zip of one CSV per sheet)
+    base_inputs: Optional[DCFInputs] = None
+
+class ExportLBORequest(LBORequest):
+    format: str = "xlsx"
+
+class ExportScenarioRequest(BaseModel):
+    ticker: str
+    format: str = "xlsx"
+    base_inputs: Optional[DCFInputs] = None
+
+class ExportSensitivityRequest(BaseModel):
+    ticker: str
+    x_axis: SensitivityAxis = SensitivityAxis(name="wacc", start=0.06, stop=0.10, steps=5)
+    y_axis: SensitivityAxis = SensitivityAxis(name="terminal_growth_rate", start=0.015, stop=0.035, steps=5)
+    output: str = "value_per_share"
+    format: str = "xlsx"
+    base_inputs: Optional[DCFInputs] = None
+
+class ExportScreenRequest(BaseModel):
+    tickers: List[str]
+    overrides: Dict[str, float] = {}
+    lbo: Optional[ScreenLBOTerms] = None
+    limit: Optional[int] = None  # Top N rows by upside
+    include_projections: bool = True  # Adds a per-ticker, per-year projections sheet
+    format: str = "xlsx"
+
+@router.post("/dcf", status_code=202, dependencies=[Depends(analysis_quota)])
+async def export_dcf(request: ExportDCFRequest, user: Optional[User] = Depends(get_optional_user)):
+    """Queue an export of a DCF: valuation summary and projections"""
+    ticker = request.ticker.upper()
+    params = {"ticker": ticker, "base_inputs": _dump(request.base_inputs)}
+    return await _submit("dcf", request.format, f"{ticker}_dcf", params, user)
+
+@router.post("/lbo", status_code=202, dependencies=[Depends(analysis_quota)])
+async def export_lbo(request: ExportLBORequest, user: Optional[User] = Depends(get_optional_user)):
+    """Queue an export of an LBO: returns, sources and uses, projections and debt schedule"""
+    ticker = request.ticker.upper()
+    params = {"inputs": build_lbo_inputs(request).dict()}
+    return await _submit("lbo", request.format, f"{ticker}_lbo", params, user)
+
+@router.post("/scenarios", status_code=202, dependencies=[Depends(analysis_quota)])
+async def export_scenarios(request: ExportScenarioRequest, user: Optional[User] = Depends(get_optional_user)):
+    """Queue an export of the Bear, Base and Bull scenarios"""
+    ticker = request.ticker.upper()
+    params = {"ticker": ticker, "base_inputs": _dump(request.base_inputs)}
+    return await _submit("scenarios", request.format, f"{ticker}_scenarios", params, user)
+
+@router.post("/sensitivity", status_code=202, dependencies=[Depends(analysis_quota)])
+async def export_sensitivity(request: ExportSensitivityRequest, user: Optional[User] = Depends(get_optional_user)):
+    """Queue an export of a two-way sensitivity grid (see /analysis/sensitivity)"""
+    ticker = request.ticker.upper()
+    params = {
+        "ticker": ticker,
+        "base_inputs": _dump(request.base_inputs),
+        "x_axis": {"name": request.x_axis.name, "values": request.x_axis.to_array().tolist()},
+        "y_axis": {"name": request.y_axis.name, "values": request.y_axis.to_array().tolist()},
+        "output": request.output
+    }
+    return await _submit("sensitivity", request.format, f"{ticker}_sensitivity", params, user)
+
+@router.post("/screen", status_code=202, dependencies=[Depends(analysis_quota)])
+async def export_screen(request: ExportScreenRequest, user: Optional[User] = Depends(get_optional_user)):
+    """
+    Queue an export of a universe screen (see /analysis/batch)
+
+    The screen sheet is ranked by upside. With include_projections a
+    5,000-ticker, 10-year screen adds 50,000 projection rows; they are
+    written row by row and never held as a workbook in memory.
+    """
+    params = {
+        "tickers": validate_screen(request.tickers, request.overrides),
+        "overrides": request.overrides,
+        "lbo": _dump(request.lbo),
+        "limit": request.limit,
+        "include_projections": request.include_projections
+    }
+    return await _submit("screen", request.format, "screen", params, user)
+
+@router.get("/jobs/{job_id}/download")
+async def download_export(job_id: str):
+    """Download a finished export; status and progress are at /api/v1/jobs/{job_id}"""
+    queue = get_job_queue()
+    record = await run_in_threadpool(queue.get, job_id)
+    if record is None or record["kind"] != "export":
+        raise HTTPException(status_code=404, detail="Export not found or expired")
+    if record["status"] == "failed":
+        raise HTTPException(status_code=400, detail=record["error"])
+    if record["status"] == "cancelled":
+        raise HTTPException(status_code=409, detail="Export was cancelled")
+    if record["status"] != "done":
+        raise HTTPException(status_code=409, detail="Export is not finished yet")
+
+    result = await run_in_threadpool(queue.result, job_id)
+    path = export_path(job_id, result)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Export not found or expired")
+    extension = result["filename"].rsplit(".", 1)[-1]
+    return FileResponse(path, media_type=MEDIA_TYPES[extension], filename=result["filename"])
+
+async def _submit(kind: str, fmt: str, stem: str, params: dict, user: Optional[User]) -> dict:
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    tier = user.tier.value if user is not None else UserTier.FREE.value
+    params = {**params, "export": kind, "format": fmt, "stem": stem}
+    # The Redis store makes network calls; keep them off the event loop
+    record = await run_in_threadpool(get_job_queue().submit, "export", params, tier)
+    return {**describe_job(record), "download_url": f"/api/v1/export/jobs/{record['id']}/download"}
+
+def _dump(model: Optional[BaseModel]) -> Optional[dict]:
+    return model.dict() if model is not None else None
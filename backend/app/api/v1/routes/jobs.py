@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from typing import Any, Dict, Optional
+
+from app.api.v1.middleware.auth import get_optional_user
+from app.api.v1.middleware.rate_limit import analysis_quota
+from app.api.v1.routes.analysis import BatchScreenRequest, MonteCarloRequest, SensitivityRequest, validate_screen
+from app.core.jobs import get_job_queue
+from app.models.user import User, UserTier
+
+router = APIRouter()
+
+# Parameters of each job kind, validated like the matching synchronous endpoint
+JOB_PARAMS = {
+    "monte_carlo": MonteCarloRequest,
+    "sensitivity": SensitivityRequest,
+    "screen": BatchScreenRequest,
+}
+
+class SubmitJobRequest(BaseModel):
+    kind: str  # "monte_carlo", "sensitivity" or "screen"
+    params: Dict[str, Any] = {}
+
+@router.post("", status_code=202, dependencies=[Depends(analysis_quota)])
+async def submit_job(request: SubmitJobRequest, user: Optional[User] = Depends(get_optional_user)):
+    """
+    Queue a long-running valuation
+
+    Jobs run on the worker pool by tier priority (enterprise, then premium,
+    then free and anonymous), first come first served within a tier. Poll
+    the status URL for progress and fetch the result once it is done.
+    """
+    params_model = JOB_PARAMS.get(request.kind)
+    if params_model is None:
+        raise HTTPException(status_code=400, detail=f"Job kind must be one of: {', '.join(JOB_PARAMS)}")
+    try:
+        params = params_model(**request.params).dict()
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    if request.kind == "screen":
+        params["tickers"] = validate_screen(params["tickers"], params["overrides"])
+
+    tier = user.tier.value if user is not None else UserTier.FREE.value
+    # The Redis store makes network calls; keep them off the event loop
+    record = await run_in_threadpool(get_job_queue().submit, request.kind, params, tier)
+    return describe_job(record)
+
+@router.get("/{job_id}")
+async def job_status(job_id: str):
+    """Status and progress of a job"""
+    return describe_job(await _get_job(job_id))
+
+@router.get("/{job_id}/result")
+async def job_result(job_id: str):
+    """Result of a finished job"""
+    record = await _get_job(job_id)
+    if record["status"] == "failed":
+        raise HTTPException(status_code=400, detail=record["error"])
+    if record["status"] == "cancelled":
+        raise HTTPException(status_code=409, detail="Job was cancelled")
+    if record["status"] != "done":
+        raise HTTPException(status_code=409, detail="Job is not finished yet")
+
+    result = await run_in_threadpool(get_job_queue().result, job_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Job result expired")
+    return {"job_id": job_id, "kind": record["kind"], "result": result}
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    record = await run_in_threadpool(get_job_queue().cancel, job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if record["status"] != "cancelled":
+        raise HTTPException(status_code=409, detail=f"Job already {record['status']}")
+    return describe_job(record)
+
+async def _get_job(job_id: str) -> dict:
+    record = await run_in_threadpool(get_job_queue().get, job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return record
+
+def describe_job(record: dict) -> dict:
+    return {
+        "job_id": record["id"],
+        "kind": record["kind"],
+        "status": record["status"],
+        "tier": record["tier"],
+        "progress": record["progress"],
+        "message": record["message"],
+        "error": record["error"],
+        "created_at": record["created_at"],
+        "started_at": record["started_at"],
+        "finished_at": record["finished_at"],
+        "status_url": f"/api/v1/jobs/{record['id']}",
+        "result_url": f"/api/v1/jobs/{record['id']}/result"
+    }
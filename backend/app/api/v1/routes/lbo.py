@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from typing import List
 
+from app.api.v1.middleware.rate_limit import analysis_quota
+from app.core.responses import FastJSONResponse
+from app.core.single_flight import valuation_flight
 from app.services.data.mock_data import MockDataService
-from app.services.modeling.lbo import LBOModel
+from app.services.modeling.offload import run_lbo, run_returns_grid
 from app.schemas.lbo import LBOInputs, LBOOutputs
+from app.utils.hashing import stable_hash
 
 router = APIRouter()
 data_service = MockDataService()
@@ -16,46 +21,81 @@ class LBORequest(BaseModel):
     interest_rate: float = 0.06  # 6%
     hold_period: int = 5
 
-@router.post("/calculate", response_model=LBOOutputs)
-async def calculate_lbo(request: LBORequest):
-    """Calculate LBO returns"""
+class LBOGridRequest(LBORequest):
+    exit_multiples: List[float] = [6.0 + 0.5 * i for i in range(17)]  # 6x - 14x
+    debt_percents: List[float] = [round(0.30 + 0.05 * i, 2) for i in range(11)]  # 30% - 80%
+
+def build_lbo_inputs(request: LBORequest) -> LBOInputs:
+    """Assemble LBO inputs for a request from the company's DCF inputs"""
     ticker = request.ticker.upper()
     
+    # Get company data
+    company_info = data_service.get_company_info(ticker)
+    dcf_inputs = data_service.get_dcf_inputs(ticker)
+    
+    # Calculate purchase price based on EBITDA multiple
+    base_revenue = dcf_inputs["base_revenue"]
+    ebitda_margin = dcf_inputs["ebitda_margin"]
+    base_ebitda = base_revenue * ebitda_margin
+    purchase_price = base_ebitda * request.purchase_multiple
+    
+    return LBOInputs(
+        ticker=ticker,
+        company_name=company_info["name"],
+        purchase_price=purchase_price,
+        purchase_multiple=request.purchase_multiple,
+        exit_multiple=request.exit_multiple,
+        debt_percent=request.debt_percent,
+        interest_rate=request.interest_rate,
+        base_revenue=base_revenue,
+        revenue_growth=dcf_inputs["revenue_growth"],
+        ebitda_margin=ebitda_margin,
+        capex_percent=dcf_inputs["capex_percent"],
+        nwc_percent=dcf_inputs["nwc_percent"],
+        tax_rate=dcf_inputs["tax_rate"],
+        hold_period=request.hold_period,
+        management_fees=0.02  # 2% annual management fee
+    )
+
+@router.post("/calculate", response_model=LBOOutputs, dependencies=[Depends(analysis_quota)])
+async def calculate_lbo(request: LBORequest):
+    """Calculate LBO returns"""
     try:
-        # Get company data
-        company_info = data_service.get_company_info(ticker)
-        dcf_inputs = data_service.get_dcf_inputs(ticker)
-        
-        # Calculate purchase price based on EBITDA multiple
-        base_revenue = dcf_inputs["base_revenue"]
-        ebitda_margin = dcf_inputs["ebitda_margin"]
-        base_ebitda = base_revenue * ebitda_margin
-        purchase_price = base_ebitda * request.purchase_multiple
-        
-        # Create LBO inputs
-        lbo_inputs = LBOInputs(
-            ticker=ticker,
-            company_name=company_info["name"],
-            purchase_price=purchase_price,
-            purchase_multiple=request.purchase_multiple,
-            exit_multiple=request.exit_multiple,
-            debt_percent=request.debt_percent,
-            interest_rate=request.interest_rate,
-            base_revenue=base_revenue,
-            revenue_growth=dcf_inputs["revenue_growth"],
-            ebitda_margin=ebitda_margin,
-            capex_percent=dcf_inputs["capex_percent"],
-            nwc_percent=dcf_inputs["nwc_percent"],
-            tax_rate=dcf_inputs["tax_rate"],
-            hold_period=request.hold_period,
-            management_fees=0.02  # 2% annual management fee
+        # Identical concurrent requests share one data fetch and model run
+        outputs = await valuation_flight.do(
+            stable_hash(request, "lbo_request"),
+            lambda: _calculate_lbo(request)
         )
-        
-        # Run LBO model
-        lbo_model = LBOModel(lbo_inputs)
-        results = lbo_model.run()
-        
-        return results
-        
-    except Exception as e:
+    except ValueError as e:
+        # Bad inputs only; a busy pool (429) and infrastructure errors (5xx) propagate
         raise HTTPException(status_code=400, detail=str(e))
+    
+    # Outputs come straight from the model; encode them without re-validating
+    return FastJSONResponse(outputs)
+
+async def _calculate_lbo(request: LBORequest) -> LBOOutputs:
+    lbo_inputs = build_lbo_inputs(request)
+    
+    # Run LBO model
+    return await valuation_flight.do(
+        stable_hash(lbo_inputs, "lbo"),
+        lambda: run_lbo(lbo_inputs)
+    )
+
+@router.post("/returns-grid", dependencies=[Depends(analysis_quota)])
+async def lbo_returns_grid(request: LBOGridRequest):
+    """IRR and MOIC over an exit multiple x leverage grid"""
+    try:
+        lbo_inputs = build_lbo_inputs(request)
+        grid = await run_returns_grid(lbo_inputs, request.exit_multiples, request.debt_percents)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Arrays are encoded natively; undefined cells (e.g. no equity invested) become null
+    return FastJSONResponse({
+        "ticker": lbo_inputs.ticker,
+        "exit_multiples": request.exit_multiples,
+        "debt_percents": request.debt_percents,
+        "irr": grid["irr"],
+        "moic": grid["moic"]
+    })
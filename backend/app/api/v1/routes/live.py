@@ -0,0 +1,223 @@
+import asyncio
+import json
+import time
+from typing import Dict, Optional
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app.api.v1.middleware.auth import get_current_user
+from app.api.v1.middleware.rate_limit import charged_analysis, check_rate_limit
+from app.api.v1.routes.what_if import WhatIfRequest, WhatIfUpdate, build_graph, describe_session, sessions
+from app.config import settings
+from app.core.responses import dumps
+from app.database import get_async_session_factory
+from app.models.user import User
+from app.services.modeling.incremental import DependencyGraph
+
+router = APIRouter()
+
+# Close code for policy violations (bad token, over the rate limit, too many bad messages)
+POLICY_VIOLATION = 1008
+
+# Error replies in a row after which the connection is closed
+MAX_CONSECUTIVE_ERRORS = 10
+
+
+class LiveValuation:
+    """One live connection: its what-if session and the changes not yet applied
+
+    Slider events are merged as they arrive and applied together once the
+    client pauses for ``debounce`` seconds, or at the latest ``max_wait``
+    seconds after the first unapplied change, so a continuous drag still
+    gets regular updates. A new event cancels the scheduled recompute it
+    supersedes. A recompute that already started still runs and is sent;
+    diffs go out in version order.
+    """
+
+    def __init__(self, websocket: WebSocket, debounce: float, max_wait: float):
+        self.websocket = websocket
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.session_id: Optional[str] = None
+        self.graph: Optional[DependencyGraph] = None
+        self.opened_session: Optional[str] = None  # Last session this connection created
+        self._pending: Dict[str, float] = {}
+        self._pending_since = 0.0
+        self._seq: Optional[int] = None
+        self._timer: Optional[asyncio.Task] = None
+        self._waiting = False  # The timer is still sleeping and may be cancelled
+        self._send_lock = asyncio.Lock()
+        self.stats = {"events": 0, "recomputes": 0, "superseded": 0}
+
+    async def send(self, payload: dict):
+        async with self._send_lock:
+            await self.websocket.send_text(dumps(payload).decode())
+
+    async def attach(self, session_id: str, graph: DependencyGraph):
+        self.cancel()
+        self._pending.clear()
+        self.session_id, self.graph = session_id, graph
+        await self.send({"type": "snapshot", **describe_session(session_id, graph)})
+
+    def submit(self, changes: Dict[str, float], seq: Optional[int]):
+        """Queue assumption changes; later values of the same input win"""
+        now = time.monotonic()
+        if not self._pending:
+            self._pending_since = now
+        self._pending.update(changes)
+        self._seq = seq
+        self.stats["events"] += 1
+
+        if self._timer is not None and self._waiting:
+            self._timer.cancel()
+            self.stats["superseded"] += 1
+        delay = min(self.debounce, max(0.0, self._pending_since + self.max_wait - now))
+        self._waiting = True
+        self._timer = asyncio.create_task(self._recompute_after(delay))
+
+    async def _recompute_after(self, delay: float):
+        await asyncio.sleep(delay)
+        self._waiting = False
+        try:
+            await self.recompute()
+        except (WebSocketDisconnect, RuntimeError):
+            # The client went away meanwhile; the receive loop cleans up
+            pass
+
+    async def recompute(self):
+        """Apply the pending changes now and send what moved"""
+        if not self._pending or self.graph is None:
+            return
+        changes, seq = self._pending, self._seq
+        self._pending = {}
+        try:
+            diff = self.graph.update(changes)
+        except ValueError as e:
+            await self.send({"type": "error", "seq": seq, "detail": str(e)})
+            return
+        self.stats["recomputes"] += 1
+        await self.send({"type": "diff", "session_id": self.session_id, "seq": seq, **diff})
+
+    async def snapshot(self):
+        self.cancel()
+        await self.recompute()
+        await self.send({"type": "snapshot", **describe_session(self.session_id, self.graph)})
+
+    def cancel(self):
+        if self._timer is not None and self._waiting:
+            self._timer.cancel()
+        self._timer, self._waiting = None, False
+
+    def close(self):
+        """Connection gone: apply what the client last sent so a resumed session matches it"""
+        self.cancel()
+        if self._pending and self.graph is not None:
+            try:
+                self.graph.update(self._pending)
+            except ValueError:
+                pass
+            self._pending = {}
+
+
+async def _authenticate(token: Optional[str]) -> Optional[User]:
+    """User for a token passed as a query parameter (browsers cannot set WebSocket headers)"""
+    if not token:
+        return None
+    async with get_async_session_factory()() as db:
+        return await get_current_user(token, db)
+
+
+async def _handle(live: LiveValuation, message: dict, user: Optional[User]):
+    kind = message.pop("type", None)
+    if kind in ("open", "resume"):
+        # Each open or resume counts like a request, not just the handshake
+        await check_rate_limit(live.websocket, user)
+    if kind == "open":
+        request = WhatIfRequest(**message)
+        graph = build_graph(request.model, request.ticker.upper(), request.inputs)
+        async with charged_analysis(user, live.websocket):
+            session_id = sessions.create(graph)
+            await live.attach(session_id, graph)
+        # One open session per connection: re-opening drops the one it replaces
+        if live.opened_session is not None:
+            sessions.discard(live.opened_session)
+        live.opened_session = session_id
+    elif kind == "resume":
+        graph = sessions.get(message.get("session_id", ""))
+        if graph is None:
+            raise ValueError("What-if session not found or expired")
+        await live.attach(message["session_id"], graph)
+    elif kind == "update":
+        if live.graph is None:
+            raise ValueError("Open or resume a session first")
+        update = WhatIfUpdate(changes=message.get("changes", {}))
+        unknown = update.changes.keys() - live.graph.editable
+        if unknown:
+            raise ValueError(f"Unknown inputs: {', '.join(sorted(unknown))}")
+        live.submit(update.changes, message.get("seq"))
+    elif kind == "snapshot":
+        if live.graph is None:
+            raise ValueError("Open or resume a session first")
+        await live.snapshot()
+    else:
+        raise ValueError("Message type must be one of: open, resume, update, snapshot")
+
+
+@router.websocket("/live")
+async def live_valuation(websocket: WebSocket, token: Optional[str] = None):
+    """
+    Live what-if valuation
+
+    Messages are JSON objects with a "type":
+
+        {"type": "open", "ticker": "AAPL", "model": "dcf", "inputs": {...}}
+        {"type": "resume", "session_id": "..."}
+        {"type": "update", "changes": {"wacc": 0.09}, "seq": 12}
+        {"type": "snapshot"}
+
+    "open" and "resume" answer with a full snapshot. Updates are debounced
+    and answered with a diff, like PATCH /what-if/{session_id}, carrying
+    the "seq" of the last event it includes. Sessions are shared with the
+    what-if HTTP API. Pass ?token= to authenticate.
+
+    Every "open" and "resume" counts against the per-minute rate limit. A
+    connection keeps one opened session: opening another drops the last
+    one it opened. MAX_CONSECUTIVE_ERRORS error replies in a row close the
+    connection.
+    """
+    try:
+        user = await _authenticate(token)
+        await check_rate_limit(websocket, user)
+    except HTTPException as e:
+        await websocket.close(code=POLICY_VIOLATION, reason=str(e.detail))
+        return
+
+    await websocket.accept()
+    live = LiveValuation(websocket, settings.LIVE_DEBOUNCE_MS / 1000, settings.LIVE_MAX_WAIT_MS / 1000)
+    errors = 0
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = json.loads(text)
+                if not isinstance(message, dict):
+                    raise ValueError("Messages must be JSON objects")
+                await _handle(live, message, user)
+                errors = 0
+                continue
+            except ValidationError as e:
+                await live.send({"type": "error", "detail": e.errors(include_url=False, include_context=False)})
+            except ValueError as e:
+                await live.send({"type": "error", "detail": str(e)})
+            except HTTPException as e:
+                await live.send({"type": "error", "status": e.status_code, "detail": e.detail})
+
+            errors += 1
+            if errors >= MAX_CONSECUTIVE_ERRORS:
+                await websocket.close(code=POLICY_VIOLATION, reason="Too many consecutive errors")
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live.close()
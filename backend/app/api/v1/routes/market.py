@@ -1,18 +1,36 @@
 from fastapi import APIRouter, HTTPException
+from app.config import settings
 from app.services.data.mock_data import MockDataService
+from app.services.data.cache import get_market_data_cache
+from app.services.data.async_fetcher import (
+    AsyncMarketDataFetcher,
+    StubHistoryProvider,
+    TokenBucket,
+    YahooHistoryProvider,
+)
 
 router = APIRouter()
-data_service = MockDataService()  # Changed from YahooFinanceService
+data_service = MockDataService()  # Used when MARKET_DATA_SOURCE is "mock"
 
-# from app.services.data.yahoo_finance import YahooFinanceService
-# data_service = YahooFinanceService()  # Change back from MockDataService
+# Yahoo (or the offline stub) goes through the market data cache and the async fetcher,
+# so handlers never sleep
+market_fetcher = AsyncMarketDataFetcher(
+    provider=StubHistoryProvider() if settings.MARKET_DATA_SOURCE == "stub" else YahooHistoryProvider(),
+    limiter=TokenBucket(settings.MARKET_DATA_REQUESTS_PER_SECOND, settings.MARKET_DATA_BURST),
+    max_concurrency=settings.MARKET_DATA_MAX_CONCURRENCY
+)
 
 
 @router.get("/overview")
 async def get_market_overview():
     """Get market overview"""
     try:
-        market_data = data_service.get_market_data()
+        if settings.MARKET_DATA_SOURCE == "mock":
+            market_data = data_service.get_market_data()
+        else:
+            market_data = await get_market_data_cache().get_or_fetch_async(
+                "market_data", "indices", market_fetcher.get_market_data
+            )
         return {"success": True, "data": market_data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -21,7 +39,18 @@ async def get_market_overview():
 async def get_market_movers():
     """Get market movers"""
     try:
-        movers = data_service.get_market_movers(limit=5)
+        if settings.MARKET_DATA_SOURCE == "mock":
+            movers = data_service.get_market_movers(limit=5)
+        else:
+            movers = await get_market_data_cache().get_or_fetch_async(
+                "market_movers", "5", lambda: market_fetcher.get_market_movers(limit=5)
+            )
         return {"success": True, "gainers": movers["gainers"], "losers": movers["losers"]}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Market data cache hit/miss counters"""
+    return {"success": True, "cache": get_market_data_cache().get_stats()}
@@ -1,14 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import String, insert, select, tuple_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
+import base64
+import json
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_async_db, get_async_session_factory
 from app.models.analysis import DCFAnalysis, LBOAnalysis
+from app.services.export.records import MEDIA_TYPES, RECORD_FORMATS, encode_records, format_available
+from app.utils.columnar import decode_results, encode_results
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_BULK_SAVE = 5000
+EXPORT_BATCH_SIZE = 500
+
+# Summary columns for listings; the full result blobs are only read per analysis
+DCF_SUMMARY_COLUMNS = (
+    DCFAnalysis.id, DCFAnalysis.ticker, DCFAnalysis.company_name, DCFAnalysis.current_price,
+    DCFAnalysis.fair_value, DCFAnalysis.upside_percent, DCFAnalysis.created_at
+)
+LBO_SUMMARY_COLUMNS = (
+    LBOAnalysis.id, LBOAnalysis.ticker, LBOAnalysis.company_name, LBOAnalysis.irr,
+    LBOAnalysis.moic, LBOAnalysis.entry_equity, LBOAnalysis.exit_equity, LBOAnalysis.created_at
+)
+
 # Request/Response Models
 class SaveDCFRequest(BaseModel):
     ticker: str
@@ -33,10 +56,16 @@ class SaveLBORequest(BaseModel):
     exit_equity: float
     lbo_results: dict
 
+class BulkSaveDCFRequest(BaseModel):
+    analyses: List[SaveDCFRequest]
+
+class BulkSaveLBORequest(BaseModel):
+    analyses: List[SaveLBORequest]
+
 # ============ DCF ENDPOINTS ============
 
 @router.post("/dcf/save")
-async def save_dcf_analysis(request: SaveDCFRequest, db: Session = Depends(get_db)):
+async def save_dcf_analysis(request: SaveDCFRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Save a DCF analysis to database
     
@@ -47,22 +76,12 @@ async def save_dcf_analysis(request: SaveDCFRequest, db: Session = Depends(get_d
     """
     try:
         # Create database entry
-        analysis = DCFAnalysis(
-            user_id=1,  # Temporary - we'll add auth later
-            ticker=request.ticker,
-            company_name=request.company_name,
-            current_price=request.current_price,
-            fair_value=request.fair_value,
-            upside_percent=request.upside_percent,
-            enterprise_value=request.enterprise_value,
-            equity_value=request.equity_value,
-            dcf_results=request.dcf_results
-        )
+        analysis = DCFAnalysis(**_dcf_values(request))
         
         # Add to database
         db.add(analysis)
-        db.commit()
-        db.refresh(analysis)
+        await db.commit()
+        await db.refresh(analysis)
         
         return {
             "success": True,
@@ -70,24 +89,32 @@ async def save_dcf_analysis(request: SaveDCFRequest, db: Session = Depends(get_d
             "message": "DCF analysis saved successfully"
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/dcf/list")
-async def list_dcf_analyses(db: Session = Depends(get_db)):
+async def list_dcf_analyses(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ticker: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Get list of all saved DCF analyses
+    Get one page of saved DCF analyses
     
     What this does:
-    1. Queries database for all DCF analyses
-    2. Returns them sorted by date (newest first)
+    1. Reads the summary columns of the next `limit` analyses (newest first),
+       optionally filtered by ticker and creation date
+    2. Returns them with `next_cursor`; pass it back as `cursor` for the
+       following page (null on the last page)
     """
+    keyset = _decode_cursor(cursor)
     try:
-        analyses = db.query(DCFAnalysis).filter(
-            DCFAnalysis.user_id == 1
-        ).order_by(
-            DCFAnalysis.created_at.desc()
-        ).all()
+        rows, next_cursor = await _list_page(
+            db, DCFAnalysis, DCF_SUMMARY_COLUMNS, limit, keyset, ticker, created_after, created_before
+        )
         
         return {
             "success": True,
@@ -101,14 +128,57 @@ async def list_dcf_analyses(db: Session = Depends(get_db)):
                     "upside_percent": a.upside_percent,
                     "created_at": a.created_at.isoformat()
                 }
-                for a in analyses
-            ]
+                for a in rows
+            ],
+            "next_cursor": next_cursor
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/dcf/bulk-save")
+async def bulk_save_dcf_analyses(request: BulkSaveDCFRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Save many DCF analyses (e.g. a batch screen) in one transaction
+    
+    Either every analysis is saved or none is. Returns the new IDs in
+    request order.
+    """
+    _check_bulk_size(request.analyses)
+    try:
+        rows = await run_in_threadpool(lambda: [_dcf_values(item) for item in request.analyses])
+        ids = await _bulk_insert(db, DCFAnalysis, rows)
+        
+        return {
+            "success": True,
+            "count": len(ids),
+            "ids": ids,
+            "message": f"{len(ids)} DCF analyses saved successfully"
         }
     except Exception as e:
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/dcf/export")
+async def export_dcf_analyses(
+    format: str = "ndjson",
+    include_results: bool = True,
+    ticker: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+):
+    """
+    Download all saved DCF analyses as NDJSON, CSV or Parquet, newest first
+    
+    Rows are read with a server-side cursor and written out batch by batch,
+    so the export never holds the whole list in memory. In CSV and Parquet
+    the results payload is a JSON text column.
+    """
+    return _export_response(
+        DCFAnalysis, "dcf_results", format, include_results, ticker, created_after, created_before
+    )
+
 @router.get("/dcf/{analysis_id}")
-async def get_dcf_analysis(analysis_id: int, db: Session = Depends(get_db)):
+async def get_dcf_analysis(analysis_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get one specific DCF analysis by ID
     
@@ -117,9 +187,7 @@ async def get_dcf_analysis(analysis_id: int, db: Session = Depends(get_db)):
     2. Returns full details including all projections
     """
     try:
-        analysis = db.query(DCFAnalysis).filter(
-            DCFAnalysis.id == analysis_id
-        ).first()
+        analysis = await db.get(DCFAnalysis, analysis_id)
         
         if not analysis:
             raise HTTPException(status_code=404, detail="Analysis not found")
@@ -135,7 +203,7 @@ async def get_dcf_analysis(analysis_id: int, db: Session = Depends(get_db)):
                 "upside_percent": analysis.upside_percent,
                 "enterprise_value": analysis.enterprise_value,
                 "equity_value": analysis.equity_value,
-                "dcf_results": analysis.dcf_results,
+                "dcf_results": _unpack_results(analysis, "dcf_results"),
                 "created_at": analysis.created_at.isoformat()
             }
         }
@@ -145,7 +213,7 @@ async def get_dcf_analysis(analysis_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/dcf/{analysis_id}")
-async def delete_dcf_analysis(analysis_id: int, db: Session = Depends(get_db)):
+async def delete_dcf_analysis(analysis_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Delete a DCF analysis
     
@@ -154,62 +222,53 @@ async def delete_dcf_analysis(analysis_id: int, db: Session = Depends(get_db)):
     2. Deletes it from database
     """
     try:
-        analysis = db.query(DCFAnalysis).filter(
-            DCFAnalysis.id == analysis_id
-        ).first()
+        analysis = await db.get(DCFAnalysis, analysis_id)
         
         if not analysis:
             raise HTTPException(status_code=404, detail="Analysis not found")
         
-        db.delete(analysis)
-        db.commit()
+        await db.delete(analysis)
+        await db.commit()
         
         return {"success": True, "message": "Analysis deleted successfully"}
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 # ============ LBO ENDPOINTS ============
 
 @router.post("/lbo/save")
-async def save_lbo_analysis(request: SaveLBORequest, db: Session = Depends(get_db)):
+async def save_lbo_analysis(request: SaveLBORequest, db: AsyncSession = Depends(get_async_db)):
     """Save an LBO analysis"""
     try:
-        analysis = LBOAnalysis(
-            user_id=1,
-            ticker=request.ticker,
-            company_name=request.company_name,
-            purchase_multiple=request.purchase_multiple,
-            exit_multiple=request.exit_multiple,
-            debt_percent=request.debt_percent,
-            hold_period=request.hold_period,
-            irr=request.irr,
-            moic=request.moic,
-            entry_equity=request.entry_equity,
-            exit_equity=request.exit_equity,
-            lbo_results=request.lbo_results
-        )
+        analysis = LBOAnalysis(**_lbo_values(request))
         
         db.add(analysis)
-        db.commit()
-        db.refresh(analysis)
+        await db.commit()
+        await db.refresh(analysis)
         
         return {"success": True, "id": analysis.id, "message": "LBO analysis saved"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/lbo/list")
-async def list_lbo_analyses(db: Session = Depends(get_db)):
-    """List all saved LBO analyses"""
+async def list_lbo_analyses(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ticker: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List one page of saved LBO analyses, newest first (see /dcf/list)"""
+    keyset = _decode_cursor(cursor)
     try:
-        analyses = db.query(LBOAnalysis).filter(
-            LBOAnalysis.user_id == 1
-        ).order_by(
-            LBOAnalysis.created_at.desc()
-        ).all()
+        rows, next_cursor = await _list_page(
+            db, LBOAnalysis, LBO_SUMMARY_COLUMNS, limit, keyset, ticker, created_after, created_before
+        )
         
         return {
             "success": True,
@@ -224,19 +283,49 @@ async def list_lbo_analyses(db: Session = Depends(get_db)):
                     "exit_equity": a.exit_equity,
                     "created_at": a.created_at.isoformat()
                 }
-                for a in analyses
-            ]
+                for a in rows
+            ],
+            "next_cursor": next_cursor
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/lbo/bulk-save")
+async def bulk_save_lbo_analyses(request: BulkSaveLBORequest, db: AsyncSession = Depends(get_async_db)):
+    """Save many LBO analyses in one transaction (see /dcf/bulk-save)"""
+    _check_bulk_size(request.analyses)
+    try:
+        rows = await run_in_threadpool(lambda: [_lbo_values(item) for item in request.analyses])
+        ids = await _bulk_insert(db, LBOAnalysis, rows)
+        
+        return {
+            "success": True,
+            "count": len(ids),
+            "ids": ids,
+            "message": f"{len(ids)} LBO analyses saved"
         }
     except Exception as e:
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/lbo/export")
+async def export_lbo_analyses(
+    format: str = "ndjson",
+    include_results: bool = True,
+    ticker: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+):
+    """Download all saved LBO analyses (see /dcf/export)"""
+    return _export_response(
+        LBOAnalysis, "lbo_results", format, include_results, ticker, created_after, created_before
+    )
+
 @router.get("/lbo/{analysis_id}")
-async def get_lbo_analysis(analysis_id: int, db: Session = Depends(get_db)):
+async def get_lbo_analysis(analysis_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get specific LBO analysis"""
     try:
-        analysis = db.query(LBOAnalysis).filter(
-            LBOAnalysis.id == analysis_id
-        ).first()
+        analysis = await db.get(LBOAnalysis, analysis_id)
         
         if not analysis:
             raise HTTPException(status_code=404, detail="Analysis not found")
@@ -255,7 +344,7 @@ async def get_lbo_analysis(analysis_id: int, db: Session = Depends(get_db)):
                 "moic": analysis.moic,
                 "entry_equity": analysis.entry_equity,
                 "exit_equity": analysis.exit_equity,
-                "lbo_results": analysis.lbo_results,
+                "lbo_results": _unpack_results(analysis, "lbo_results"),
                 "created_at": analysis.created_at.isoformat()
             }
         }
@@ -263,3 +352,180 @@ async def get_lbo_analysis(analysis_id: int, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+# ============ RESULT STORAGE ============
+
+def _dcf_values(request: SaveDCFRequest) -> dict:
+    return {
+        "user_id": 1,  # Temporary - we'll add auth later
+        "ticker": request.ticker.upper(),  # Listings filter on the upper-cased ticker
+        "company_name": request.company_name,
+        "current_price": request.current_price,
+        "fair_value": request.fair_value,
+        "upside_percent": request.upside_percent,
+        "enterprise_value": request.enterprise_value,
+        "equity_value": request.equity_value,
+        **_pack_results("dcf_results", request.dcf_results)
+    }
+
+def _lbo_values(request: SaveLBORequest) -> dict:
+    return {
+        "user_id": 1,
+        "ticker": request.ticker.upper(),  # Listings filter on the upper-cased ticker
+        "company_name": request.company_name,
+        "purchase_multiple": request.purchase_multiple,
+        "exit_multiple": request.exit_multiple,
+        "debt_percent": request.debt_percent,
+        "hold_period": request.hold_period,
+        "irr": request.irr,
+        "moic": request.moic,
+        "entry_equity": request.entry_equity,
+        "exit_equity": request.exit_equity,
+        **_pack_results("lbo_results", request.lbo_results)
+    }
+
+def _pack_results(field: str, results: dict) -> dict:
+    """Column values for a results payload in the configured storage format"""
+    if settings.SAVED_RESULTS_FORMAT == "columnar":
+        # The JSON column is left out so it stays SQL NULL (None would store JSON 'null')
+        return {f"{field}_blob": encode_results(results)}
+    return {field: results}
+
+def _unpack_results(analysis, field: str) -> dict:
+    """Results payload of a saved analysis, whichever format it was stored in"""
+    blob = getattr(analysis, f"{field}_blob")
+    if blob is not None:
+        return decode_results(blob)
+    return getattr(analysis, field)
+
+# ============ BULK SAVE / EXPORT ============
+
+def _check_bulk_size(analyses: list):
+    if not analyses:
+        raise HTTPException(status_code=400, detail="No analyses to save")
+    if len(analyses) > MAX_BULK_SAVE:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_BULK_SAVE} analyses per request")
+
+async def _bulk_insert(db: AsyncSession, model, rows: List[dict]) -> List[int]:
+    """
+    Insert rows in one transaction and return their IDs in input order
+    
+    A single INSERT ... RETURNING executed with all parameter sets: SQLAlchemy
+    sends it as a few large multi-row statements instead of one round trip,
+    flush and refresh per analysis.
+    """
+    result = await db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+    ids = list(result.scalars())
+    await db.commit()
+    return ids
+
+def _export_response(model, field: str, format: str, include_results: bool, ticker: Optional[str],
+                     created_after: Optional[datetime], created_before: Optional[datetime]):
+    if format not in RECORD_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(RECORD_FORMATS)}")
+    if not format_available(format):
+        raise HTTPException(status_code=400, detail=f"{format} export is not available on this server")
+    
+    skipped = {"user_id", "updated_at", field, f"{field}_blob"}
+    columns = [(c.name, c.type.python_type) for c in model.__table__.columns if c.name not in skipped]
+    if include_results:
+        columns.append((field, dict))
+    
+    batches = _export_batches(model, field, [name for name, _ in columns], ticker, created_after, created_before)
+    return StreamingResponse(
+        encode_records(batches, columns, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{model.__tablename__}.{format}"'}
+    )
+
+async def _export_batches(model, field: str, names: List[str], ticker: Optional[str],
+                          created_after: Optional[datetime], created_before: Optional[datetime]):
+    """Export records in batches of EXPORT_BATCH_SIZE from a server-side cursor"""
+    include_results = field in names
+    columns = [model.__table__.c[name] for name in names if name != field]
+    if include_results:
+        columns += [model.__table__.c[field], model.__table__.c[f"{field}_blob"]]
+    
+    query = _filter_analyses(select(*columns), model, ticker, created_after, created_before)
+    query = query.order_by(model.created_at.desc(), model.id.desc()).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    
+    # The stream outlives the request handler, so it holds its own session
+    async with get_async_session_factory()() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            # Decoding result blobs is CPU work; keep it off the event loop
+            yield await run_in_threadpool(_export_records, rows, field, names)
+
+def _export_records(rows, field: str, names: List[str]) -> List[dict]:
+    records = []
+    for row in rows:
+        record = {name: getattr(row, name) for name in names if name != field}
+        if field in names:
+            record[field] = _unpack_results(row, field)
+        records.append(record)
+    return records
+
+# ============ PAGINATION ============
+
+async def _list_page(db: AsyncSession, model, columns, limit: int, keyset, ticker: Optional[str],
+                     created_after: Optional[datetime], created_before: Optional[datetime]):
+    """
+    One page of a user's analyses by keyset on (user_id, created_at, id)
+    
+    Every page is a range scan of the composite index starting right after
+    the previous page's last row, so its cost does not grow with the offset.
+    """
+    query = _filter_analyses(select(*columns), model, ticker, created_after, created_before)
+    if keyset:
+        created_at, last_id = keyset
+        query = query.where(
+            tuple_(_created_at_key(db, model), model.id) < tuple_(_created_at_value(db, created_at), last_id)
+        )
+    
+    query = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = _encode_cursor(last.created_at, last.id)
+    return rows[:limit], next_cursor
+
+def _filter_analyses(query, model, ticker: Optional[str], created_after: Optional[datetime],
+                     created_before: Optional[datetime]):
+    """Restrict a query to the user's analyses matching the listing filters"""
+    query = query.where(model.user_id == 1)
+    if ticker:
+        query = query.where(model.ticker == ticker.upper())
+    if created_after:
+        query = query.where(model.created_at >= created_after)
+    if created_before:
+        query = query.where(model.created_at < created_before)
+    return query
+
+def _encode_cursor(created_at: datetime, analysis_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), analysis_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def _decode_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, analysis_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(analysis_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _created_at_key(db: AsyncSession, model):
+    # SQLite keeps timestamps as text; compare the stored text, not a re-rendered datetime
+    if db.bind.dialect.name == "sqlite":
+        return type_coerce(model.created_at, String)
+    return model.created_at
+
+def _created_at_value(db: AsyncSession, created_at: datetime):
+    if db.bind.dialect.name == "sqlite":
+        # Same layout as SQLite's CURRENT_TIMESTAMP (server default) and SQLAlchemy's writes
+        fmt = "%Y-%m-%d %H:%M:%S.%f" if created_at.microsecond else "%Y-%m-%d %H:%M:%S"
+        return created_at.strftime(fmt)
+    return created_at
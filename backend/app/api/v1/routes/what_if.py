@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from typing import Dict
+
+from app.api.v1.middleware.rate_limit import analysis_quota
+from app.api.v1.routes.lbo import LBORequest, build_lbo_inputs
+from app.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.sessions import SessionStore
+from app.schemas.analysis import DCFInputs
+from app.services.data.mock_data import MockDataService
+from app.services.modeling.incremental import GRAPHS, DependencyGraph
+
+router = APIRouter()
+data_service = MockDataService()
+
+# Each session holds a model graph with every intermediate result cached
+sessions = SessionStore(settings.WHAT_IF_SESSION_TTL, settings.WHAT_IF_MAX_SESSIONS)
+
+class WhatIfRequest(BaseModel):
+    ticker: str
+    model: str = "dcf"  # "dcf" or "lbo"
+    inputs: Dict[str, float] = {}  # Overrides of the ticker's default assumptions
+
+class WhatIfUpdate(BaseModel):
+    changes: Dict[str, float]  # e.g. {"wacc": 0.09}
+
+def build_graph(model: str, ticker: str, overrides: Dict[str, float]) -> DependencyGraph:
+    """Model graph for a ticker's default assumptions with ``overrides`` applied"""
+    graph_class = GRAPHS.get(model)
+    if graph_class is None:
+        raise ValueError(f"Model must be one of: {', '.join(GRAPHS)}")
+    unknown = overrides.keys() - graph_class.editable
+    if unknown:
+        raise ValueError(f"Unknown inputs: {', '.join(sorted(unknown))}")
+
+    if model == "lbo":
+        base = build_lbo_inputs(LBORequest(ticker=ticker))
+    else:
+        base = DCFInputs(**data_service.get_dcf_inputs(ticker))
+    return graph_class(graph_class.inputs_model(**{**base.model_dump(), **overrides}))
+
+def describe_session(session_id: str, graph: DependencyGraph) -> dict:
+    return {
+        "session_id": session_id,
+        "model": graph.name,
+        "ticker": graph.inputs["ticker"],
+        "version": graph.version,
+        "inputs": {field: graph.inputs[field] for field in sorted(graph.editable)},
+        "outputs": graph.outputs()
+    }
+
+def _get_session(session_id: str) -> DependencyGraph:
+    graph = sessions.get(session_id)
+    if graph is None:
+        raise HTTPException(status_code=404, detail="What-if session not found or expired")
+    return graph
+
+@router.post("", dependencies=[Depends(analysis_quota)])
+async def create_what_if(request: WhatIfRequest):
+    """
+    Start a what-if session
+
+    Values the model once and keeps every intermediate result. Send
+    assumption changes to PATCH /what-if/{session_id}; only the parts of
+    the model they reach are recomputed and only the outputs that moved
+    come back.
+    """
+    try:
+        graph = build_graph(request.model, request.ticker.upper(), request.inputs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(describe_session(sessions.create(graph), graph))
+
+@router.get("/{session_id}")
+async def get_what_if(session_id: str):
+    """Current inputs and full outputs of a session"""
+    return FastJSONResponse(describe_session(session_id, _get_session(session_id)))
+
+@router.patch("/{session_id}")
+async def update_what_if(session_id: str, request: WhatIfUpdate):
+    """
+    Change assumptions of a session
+
+    Returns the recomputed nodes, the headline values that changed and the
+    projection rows that changed; anything absent is as before.
+    """
+    graph = _get_session(session_id)
+    try:
+        diff = graph.update(request.changes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({"session_id": session_id, **diff})
+
+@router.delete("/{session_id}")
+async def delete_what_if(session_id: str):
+    """End a session"""
+    if not sessions.discard(session_id):
+        raise HTTPException(status_code=404, detail="What-if session not found or expired")
+    return {"success": True}
@@ -0,0 +1,157 @@
+"""
+Auth Performance Layer
+Password hashing off the event loop, and short-lived caches of verified tokens and users
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.core.compute import ComputeBusy
+from app.models.user import User
+
+
+@lru_cache(maxsize=1)
+def password_context():
+    """passlib context; passlib and bcrypt load on first use rather than at startup"""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordHasher:
+    """bcrypt on a bounded thread pool
+
+    A hash or verify costs a few hundred milliseconds of CPU by design;
+    bcrypt releases the GIL while it works, so ``workers`` threads hash in
+    parallel while the event loop keeps serving. At most ``max_queue``
+    more calls may wait; beyond that callers get ComputeBusy (429) instead
+    of an ever-growing login backlog. With ``workers=0`` hashing runs inline.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 64):
+        self.workers = max(0, workers)
+        self.max_queue = max(0, max_queue)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self.stats = {"hashed": 0, "verified": 0, "rejected": 0}
+
+    async def hash(self, password: str) -> str:
+        self.stats["hashed"] += 1
+        return await self._run(password_context().hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        self.stats["verified"] += 1
+        return await self._run(password_context().verify, password, hashed_password)
+
+    async def _run(self, func: Callable, *args) -> Any:
+        if self.workers == 0:
+            return func(*args)
+        if self._pending >= self.workers + self.max_queue:
+            self.stats["rejected"] += 1
+            raise ComputeBusy()
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+        finally:
+            self._pending -= 1
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "workers": self.workers, "max_queue": self.max_queue, "pending": self._pending}
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after a per-entry TTL"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, key: Any) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard_where(self, predicate: Callable[[Any, Any], bool]) -> int:
+        """Drop every entry whose (key, value) matches; returns how many"""
+        stale = [key for key, (_, value) in self._entries.items() if predicate(key, value)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+# token -> subject (username) of a token whose signature and expiry were checked
+token_cache = TTLCache(settings.AUTH_CACHE_TTL, settings.AUTH_CACHE_MAX_ENTRIES)
+# username -> detached User row
+user_cache = TTLCache(settings.AUTH_CACHE_TTL, settings.AUTH_CACHE_MAX_ENTRIES)
+
+
+def invalidate_user(user_id: int) -> int:
+    """Forget cached rows of a user, e.g. after a tier or password change"""
+    return user_cache.discard_where(lambda _, user: user.id == user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User):
+    # Flushes through the ORM in this process; other processes rely on the TTL
+    invalidate_user(target.id)
+
+
+_password_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Process-wide password hasher built from settings on first use"""
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher(settings.AUTH_HASH_WORKERS, settings.AUTH_HASH_MAX_QUEUE)
+    return _password_hasher
+
+
+def shutdown_password_hasher():
+    global _password_hasher
+    if _password_hasher is not None:
+        _password_hasher.shutdown()
+        _password_hasher = None
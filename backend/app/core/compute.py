@@ -0,0 +1,153 @@
+"""
+Compute Offload
+Warm process pool for CPU-bound model runs, with bounded queueing
+"""
+
+import asyncio
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from app.core.memo import get_model_cache
+
+
+class ComputeBusy(Exception):
+    """Every worker is busy and the wait queue is full; the caller should retry"""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Compute pool is at capacity")
+        self.retry_after = retry_after
+
+
+def _init_worker(preload: Tuple[str, ...]):
+    """Pool initializer: import the model stack once, before the first task arrives"""
+    # Results are memoized by the calling process; a per-worker copy would only cost memory
+    settings.MODEL_CACHE_ENABLED = False
+    for module in preload:
+        importlib.import_module(module)
+
+
+def _ready() -> bool:
+    return True
+
+
+class ComputeExecutor:
+    """Run CPU-bound functions on a process pool without blocking the event loop
+
+    At most ``workers`` calls run at once and ``max_queue`` more may wait;
+    beyond that ``run`` raises ComputeBusy immediately instead of letting
+    latency grow without bound. With ``workers=0`` calls run inline.
+    Functions and their arguments must be picklable (module-level functions).
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 32, start_method: str = "spawn",
+                 preload: Tuple[str, ...] = ()):
+        self.workers = max(0, workers)
+        self.max_queue = max(0, max_queue)
+        self.preload = preload
+        self._context = multiprocessing.get_context(start_method)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self.stats = {"submitted": 0, "rejected": 0, "failed": 0}
+
+    async def run(self, func: Callable, *args) -> Any:
+        if self.workers == 0:
+            return func(*args)
+        if self._pending >= self.workers + self.max_queue:
+            self.stats["rejected"] += 1
+            raise ComputeBusy()
+
+        self._pending += 1
+        self.stats["submitted"] += 1
+        pool = self._executor()
+        try:
+            return await asyncio.wrap_future(pool.submit(func, *args))
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool for the next call
+            self.stats["failed"] += 1
+            if self._pool is pool:
+                self._pool = None
+            raise
+        finally:
+            self._pending -= 1
+
+    async def warm(self) -> bool:
+        """Start every worker and wait until each has imported the model stack"""
+        if self.workers == 0:
+            return True
+        pool = self._executor()
+        try:
+            await asyncio.gather(*(asyncio.wrap_future(pool.submit(_ready)) for _ in range(self.workers)))
+        except BrokenProcessPool:
+            # Leave a fresh pool for the first request rather than a broken one
+            if self._pool is pool:
+                self._pool = None
+            return False
+        return True
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=self._context,
+                initializer=_init_worker,
+                initargs=(self.preload,),
+            )
+        return self._pool
+
+
+async def run_memoized(namespace: str, version: str, inputs: Any, func: Callable, *args) -> Any:
+    """``func(*args)`` on the compute pool, memoized in this process by ``inputs``
+
+    Cache hits never leave the event loop; misses are computed by a worker
+    and stored here, so every worker shares one cache.
+    """
+    if not settings.MODEL_CACHE_ENABLED:
+        return await get_compute_executor().run(func, *args)
+
+    cache = get_model_cache()
+    cache.register(namespace, version)
+    result = cache.get(namespace, inputs)
+    if result is None:
+        result = await get_compute_executor().run(func, *args)
+        cache.put(namespace, inputs, result)
+    return result
+
+
+_compute_executor: Optional[ComputeExecutor] = None
+
+
+def get_compute_executor() -> ComputeExecutor:
+    """Process-wide compute pool built from settings on first use"""
+    global _compute_executor
+    if _compute_executor is None:
+        _compute_executor = ComputeExecutor(
+            workers=settings.COMPUTE_WORKERS,
+            max_queue=settings.COMPUTE_MAX_QUEUE,
+            start_method=settings.WORKER_START_METHOD,
+            preload=("app.services.modeling.offload",),
+        )
+    return _compute_executor
+
+
+def shutdown_compute_executor():
+    global _compute_executor
+    if _compute_executor is not None:
+        _compute_executor.shutdown()
+        _compute_executor = None
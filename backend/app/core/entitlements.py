@@ -0,0 +1,176 @@
+"""
+Entitlements
+Single source of truth for what each subscription tier includes
+
+Features are interned once as bits of a Feature flag; each tier's
+entitlements are a bitmask built at import, so a feature check is one
+dict lookup and one AND. Tiers are keyed by their UserTier value
+("free", "premium", "enterprise"); UserTier members are str enums and look
+up the same entries.
+"""
+
+import enum
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Union
+
+
+class Feature(enum.IntFlag):
+    BASIC_DCF = enum.auto()
+    BASIC_LBO = enum.auto()
+    SAVE_ANALYSES = enum.auto()
+    EXPORT_EXCEL = enum.auto()
+    ADVANCED_DCF = enum.auto()
+    ADVANCED_LBO = enum.auto()
+    SCENARIO_ANALYSIS = enum.auto()
+    COMPS_ANALYSIS = enum.auto()
+    HISTORICAL_DATA = enum.auto()
+    PRIORITY_SUPPORT = enum.auto()
+    AI_RESEARCH_AGENT = enum.auto()
+    FACTSET_INTEGRATION = enum.auto()
+    MORNINGSTAR_INTEGRATION = enum.auto()
+    CUSTOM_DATA_SOURCES = enum.auto()
+    API_ACCESS = enum.auto()
+    WHITE_LABEL = enum.auto()
+    DEDICATED_SUPPORT = enum.auto()
+
+    @property
+    def key(self) -> str:
+        """Name used by the API and User.has_feature, e.g. "basic_dcf" """
+        return self.name.lower()
+
+
+_FREE = Feature.BASIC_DCF | Feature.BASIC_LBO | Feature.SAVE_ANALYSES | Feature.EXPORT_EXCEL
+_PREMIUM = (
+    _FREE | Feature.ADVANCED_DCF | Feature.ADVANCED_LBO | Feature.SCENARIO_ANALYSIS
+    | Feature.COMPS_ANALYSIS | Feature.HISTORICAL_DATA | Feature.PRIORITY_SUPPORT
+)
+_ENTERPRISE = (
+    _PREMIUM | Feature.AI_RESEARCH_AGENT | Feature.FACTSET_INTEGRATION | Feature.MORNINGSTAR_INTEGRATION
+    | Feature.CUSTOM_DATA_SOURCES | Feature.API_ACCESS | Feature.WHITE_LABEL | Feature.DEDICATED_SUPPORT
+)
+
+# Interned as plain ints: IntFlag arithmetic costs about a microsecond per operation
+FEATURE_BITS: Dict[str, int] = {feature.key: int(feature) for feature in Feature}
+TIER_ENTITLEMENTS: Dict[str, int] = {
+    "free": int(_FREE),
+    "premium": int(_PREMIUM),
+    "enterprise": int(_ENTERPRISE),
+}
+
+UNLIMITED = 999999
+TIER_MONTHLY_ANALYSES: Dict[str, int] = {
+    "free": 10,
+    "premium": 100,
+    "enterprise": UNLIMITED,
+}
+
+DEFAULT_TIER = "free"
+_DEFAULT_ENTITLEMENTS = TIER_ENTITLEMENTS[DEFAULT_TIER]
+
+
+def tier_entitlements(tier: Optional[str]) -> int:
+    """Feature bitmask of a tier; unknown tiers get the free tier's"""
+    return TIER_ENTITLEMENTS.get(tier, _DEFAULT_ENTITLEMENTS)
+
+
+def monthly_analysis_limit(tier: Optional[str]) -> int:
+    return TIER_MONTHLY_ANALYSES.get(tier, TIER_MONTHLY_ANALYSES[DEFAULT_TIER])
+
+
+def usage_period(now: Optional[datetime] = None) -> str:
+    """Billing month that monthly analyses are counted in, as YYYYMM (UTC)"""
+    return (now or datetime.now(timezone.utc)).strftime("%Y%m")
+
+
+def feature_bits(feature: Union[Feature, str]) -> int:
+    """Bits of a flag or of a feature key; unknown keys have none"""
+    if isinstance(feature, str):
+        return FEATURE_BITS.get(feature, 0)
+    return int(feature)
+
+
+def has_feature(tier: Optional[str], feature: Union[Feature, str]) -> bool:
+    bits = feature_bits(feature)
+    return bits != 0 and TIER_ENTITLEMENTS.get(tier, _DEFAULT_ENTITLEMENTS) & bits == bits
+
+
+def feature_keys(mask: int) -> List[str]:
+    """Keys of the features in a mask, in declaration order"""
+    return [feature.key for feature in Feature if feature & mask]
+
+
+# ============ CATALOG ============
+
+# Marketing copy shown on the pricing page; limits and entitlements come from the tables above
+TIER_CATALOG = {
+    "free": {
+        "name": "Free",
+        "price": 0,
+        "features": [
+            "Basic DCF Models",
+            "Basic LBO Models",
+            "Save up to 10 analyses",
+            "Export to Excel",
+            "Yahoo Finance data",
+            "Community support"
+        ],
+        "limitations": [
+            "10 analyses per month",
+            "Limited historical data",
+            "No advanced features",
+            "No AI insights"
+        ]
+    },
+    "premium": {
+        "name": "Premium",
+        "price": 49,
+        "features": [
+            "Everything in Free, plus:",
+            "Advanced DCF with custom inputs",
+            "Advanced LBO scenarios",
+            "Unlimited saved analyses",
+            "Scenario analysis (Bear/Base/Bull)",
+            "Comparable company analysis",
+            "5 years historical data",
+            "Real-time market data",
+            "Priority email support",
+            "Export to PDF",
+            "Advanced charts & visualizations"
+        ],
+        "popular": True
+    },
+    "enterprise": {
+        "name": "Enterprise",
+        "price": "Custom",
+        "features": [
+            "Everything in Premium, plus:",
+            "AI Research Agent for equity analysis",
+            "Connect your FactSet license",
+            "Connect your Morningstar license",
+            "Custom data source integrations",
+            "API access for automation",
+            "White-label options",
+            "10+ years historical data",
+            "Dedicated account manager",
+            "Priority phone & chat support",
+            "Custom model templates",
+            "Team collaboration features",
+            "SSO & advanced security"
+        ],
+        "contact_sales": True
+    }
+}
+
+
+def describe_tier(tier: str) -> dict:
+    """Catalog entry of a tier with its monthly limit and entitlement keys"""
+    entry = TIER_CATALOG[tier]
+    limit = monthly_analysis_limit(tier)
+    return {
+        "name": entry["name"],
+        "price": entry["price"],
+        "monthly_analyses": "Unlimited" if limit >= UNLIMITED else limit,
+        **{key: value for key, value in entry.items() if key not in ("name", "price")},
+        "entitlements": feature_keys(tier_entitlements(tier)),
+    }
+
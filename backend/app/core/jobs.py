@@ -0,0 +1,457 @@
+"""
+Background Jobs
+Priority queue of long-running model runs executed on a local process pool
+"""
+
+import heapq
+import json
+import multiprocessing
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+# Lower runs first; jobs of the same priority run in submission order
+TIER_PRIORITY = {"enterprise": 0, "premium": 1, "free": 2}
+
+FINAL_STATUSES = ("done", "failed", "cancelled")
+
+DISPATCH_INTERVAL = 0.05
+
+
+class JobCancelled(Exception):
+    """Raised inside a task when its job was cancelled"""
+
+
+# ============ WORKER SIDE ============
+
+_progress_queue = None
+_cancel_flags = None
+
+
+def _init_worker(progress_queue, cancel_flags, preload: Tuple[str, ...]):
+    """Process pool initializer: keep the shared channels and pre-import task modules"""
+    global _progress_queue, _cancel_flags
+    _progress_queue, _cancel_flags = progress_queue, cancel_flags
+
+    import importlib
+    for module in preload:
+        importlib.import_module(module)
+
+
+class JobContext:
+    """Handed to every task to report progress and notice cancellation"""
+
+    def __init__(self, job_id: str, slot: int):
+        self.job_id = job_id
+        self.slot = slot
+
+    @property
+    def cancelled(self) -> bool:
+        return bool(_cancel_flags is not None and _cancel_flags[self.slot])
+
+    def progress(self, fraction: float, message: Optional[str] = None):
+        """Report progress (0..1); raises JobCancelled once the job is cancelled"""
+        if self.cancelled:
+            raise JobCancelled()
+        if _progress_queue is not None:
+            _progress_queue.put((self.job_id, min(max(float(fraction), 0.0), 1.0), message))
+
+
+def _run_task(task: Callable, params: Dict, job_id: str, slot: int):
+    return task(params, JobContext(job_id, slot))
+
+
+# ============ STORES ============
+
+class LocalJobStore:
+    """Job records and the priority queue in this process's memory"""
+
+    name = "local"
+
+    def __init__(self):
+        self._records: Dict[str, Dict] = {}
+        self._results: Dict[str, object] = {}
+        self._queue: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def create(self, record: Dict, score: float):
+        with self._lock:
+            self._records[record["id"]] = dict(record)
+            heapq.heappush(self._queue, (score, record["id"]))
+
+    def pop(self) -> Optional[str]:
+        with self._lock:
+            while self._queue:
+                _, job_id = heapq.heappop(self._queue)
+                if self._records.get(job_id, {}).get("status") == "queued":
+                    return job_id
+        return None
+
+    def dequeue(self, job_id: str) -> bool:
+        """Take a queued job off the queue; False when a dispatcher already took it"""
+        with self._lock:
+            record = self._records.get(job_id)
+            if record is None or record["status"] != "queued":
+                return False
+            record["status"] = "dequeued"
+            return True
+
+    def start(self, job_id: str, started_at: float) -> bool:
+        """Move a queued job to running; False when it was cancelled (or taken) first"""
+        with self._lock:
+            record = self._records.get(job_id)
+            if record is None or record["status"] != "queued":
+                return False
+            record.update(status="running", started_at=started_at)
+            return True
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        self._purge_expired()
+        with self._lock:
+            record = self._records.get(job_id)
+            return dict(record) if record is not None else None
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._records:
+                self._records[job_id].update(fields)
+
+    def set_result(self, job_id: str, result, ttl: float):
+        with self._lock:
+            self._results[job_id] = result
+
+    def get_result(self, job_id: str):
+        with self._lock:
+            return self._results.get(job_id)
+
+    def expire(self, job_id: str, ttl: float):
+        self.update(job_id, expires_at=time.time() + ttl)
+
+    def _purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [job_id for job_id, record in self._records.items()
+                       if record.get("expires_at") and record["expires_at"] <= now]
+            for job_id in expired:
+                del self._records[job_id]
+                self._results.pop(job_id, None)
+
+
+# Compare-and-set of a job's status; fields are stored JSON-encoded
+START_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'status') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'status', ARGV[2], 'started_at', ARGV[3])
+return 1
+"""
+
+
+class RedisJobStore:
+    """Job records in Redis hashes and the queue in a sorted set
+
+    Every API process runs a dispatcher against the same queue; ZPOPMIN
+    hands each job to exactly one of them. ``client`` may be any
+    redis-py compatible client (e.g. fakeredis in tests).
+    """
+
+    name = "redis"
+
+    def __init__(self, client, prefix: str = "alphaforge:jobs:"):
+        self.client = client
+        self.prefix = prefix
+        self.queue_key = prefix + "queue"
+        self._start = client.register_script(START_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisJobStore":
+        import redis
+
+        return cls(redis.Redis.from_url(url, socket_timeout=2.0, socket_connect_timeout=2.0))
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}job:{job_id}"
+
+    def _result_key(self, job_id: str) -> str:
+        return f"{self.prefix}result:{job_id}"
+
+    def create(self, record: Dict, score: float):
+        pipeline = self.client.pipeline()
+        pipeline.hset(self._key(record["id"]), mapping=_encode_fields(record))
+        pipeline.zadd(self.queue_key, {record["id"]: score})
+        pipeline.execute()
+
+    def pop(self) -> Optional[str]:
+        popped = self.client.zpopmin(self.queue_key)
+        if not popped:
+            return None
+        job_id = popped[0][0]
+        return job_id.decode() if isinstance(job_id, bytes) else job_id
+
+    def dequeue(self, job_id: str) -> bool:
+        return bool(self.client.zrem(self.queue_key, job_id))
+
+    def start(self, job_id: str, started_at: float) -> bool:
+        args = [json.dumps("queued"), json.dumps("running"), json.dumps(started_at)]
+        return bool(self._start(keys=[self._key(job_id)], args=args))
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        fields = self.client.hgetall(self._key(job_id))
+        if not fields:
+            return None
+        return {_text(key): json.loads(value) for key, value in fields.items()}
+
+    def update(self, job_id: str, **fields):
+        # Only touch existing (unexpired) jobs
+        if self.client.exists(self._key(job_id)):
+            self.client.hset(self._key(job_id), mapping=_encode_fields(fields))
+
+    def set_result(self, job_id: str, result, ttl: float):
+        self.client.set(self._result_key(job_id), json.dumps(result), ex=max(1, int(ttl)))
+
+    def get_result(self, job_id: str):
+        payload = self.client.get(self._result_key(job_id))
+        return json.loads(payload) if payload is not None else None
+
+    def expire(self, job_id: str, ttl: float):
+        self.client.hset(self._key(job_id), "expires_at", json.dumps(time.time() + ttl))
+        self.client.expire(self._key(job_id), max(1, int(ttl)))
+
+
+def _encode_fields(fields: Dict) -> Dict[str, str]:
+    return {key: json.dumps(value) for key, value in fields.items()}
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+# ============ QUEUE ============
+
+class JobQueue:
+    """Submit, track and cancel model runs executed on a process pool
+
+    A dispatcher thread keeps at most ``workers`` jobs in flight and always
+    starts the highest-priority queued job next, so enterprise jobs jump
+    ahead of queued free-tier ones (running jobs are never preempted).
+    Tasks are ``task(params, job)`` functions registered per kind; they
+    report progress through ``job.progress`` and stop at their next report
+    once cancelled. Finished jobs and results expire after ``result_ttl``.
+    """
+
+    def __init__(self, store, tasks: Dict[str, Callable], workers: int = 2, result_ttl: float = 3600.0,
+                 start_method: str = "spawn", preload: Tuple[str, ...] = ()):
+        self.store = store
+        self.tasks = tasks
+        self.workers = max(1, workers)
+        self.result_ttl = result_ttl
+        self.preload = preload
+        self._context = multiprocessing.get_context(start_method)
+        self._pool = None
+        self._progress = None
+        self._cancel_flags = None
+        self._running: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def submit(self, kind: str, params: Dict, tier: str = "free") -> Dict:
+        if kind not in self.tasks:
+            raise ValueError(f"Unknown job kind {kind}; expected one of: {', '.join(self.tasks)}")
+
+        priority = TIER_PRIORITY.get(tier, TIER_PRIORITY["free"])
+        record = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "tier": tier,
+            "priority": priority,
+            "status": "queued",
+            "progress": 0.0,
+            "message": None,
+            "error": None,
+            "params": params,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "expires_at": None,
+        }
+        # Priority band first, then submission time in milliseconds
+        self.store.create(record, priority * 1e13 + record["created_at"] * 1e3)
+        self._ensure_started()
+        self._wake.set()
+        return record
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.store.get(job_id)
+
+    def result(self, job_id: str):
+        return self.store.get_result(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """Cancel a queued or running job; finished jobs are returned unchanged"""
+        record = self.store.get(job_id)
+        if record is None or record["status"] in FINAL_STATUSES:
+            return record
+
+        # A running job (here or in another process) sees the flag at its next progress report
+        self.store.dequeue(job_id)
+        self._finish(job_id, "cancelled")
+        self._wake.set()
+        return self.store.get(job_id)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            running = len(self._running)
+        return {"backend": self.store.name, "workers": self.workers, "running": running}
+
+    def shutdown(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # Dispatcher
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._progress = self._context.Queue()
+                self._cancel_flags = self._context.Array("b", self.workers, lock=False)
+                self._thread = threading.Thread(target=self._dispatch_loop, name="job-dispatcher", daemon=True)
+                self._thread.start()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=self._context,
+                initializer=_init_worker,
+                initargs=(self._progress, self._cancel_flags, self.preload),
+            )
+        return self._pool
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            try:
+                self._drain_progress()
+                self._flag_cancelled()
+                self._start_queued()
+            except Exception as e:
+                # A flaky store must not kill the dispatcher
+                print(f"Job dispatcher error: {e}")
+            self._wake.wait(DISPATCH_INTERVAL)
+            self._wake.clear()
+
+    def _drain_progress(self):
+        while True:
+            try:
+                job_id, fraction, message = self._progress.get_nowait()
+            except queue.Empty:
+                return
+            record = self.store.get(job_id)
+            if record is not None and record["status"] == "running":
+                self.store.update(job_id, progress=fraction, message=message)
+
+    def _flag_cancelled(self):
+        with self._lock:
+            running = list(self._running.items())
+        for slot, job_id in running:
+            record = self.store.get(job_id)
+            if record is None or record["status"] == "cancelled":
+                self._cancel_flags[slot] = 1
+
+    def _start_queued(self):
+        while True:
+            with self._lock:
+                free = [slot for slot in range(self.workers) if slot not in self._running]
+            if not free:
+                return
+            job_id = self.store.pop()
+            if job_id is None:
+                return
+            record = self.store.get(job_id)
+            # Claimed atomically, so a cancel racing this dispatch either wins or flags the running job
+            if record is None or not self.store.start(job_id, time.time()):
+                continue
+
+            slot = free[0]
+            self._cancel_flags[slot] = 0
+            with self._lock:
+                self._running[slot] = job_id
+            try:
+                future = self._executor().submit(
+                    _run_task, self.tasks[record["kind"]], record["params"], job_id, slot
+                )
+            except BrokenProcessPool:
+                self._pool = None
+                future = self._executor().submit(
+                    _run_task, self.tasks[record["kind"]], record["params"], job_id, slot
+                )
+            future.add_done_callback(lambda future, job_id=job_id, slot=slot: self._on_done(future, job_id, slot))
+
+    def _on_done(self, future, job_id: str, slot: int):
+        with self._lock:
+            self._running.pop(slot, None)
+        self._wake.set()
+
+        record = self.store.get(job_id)
+        if record is None or record["status"] != "running":
+            # Cancelled (or expired) while it ran; the outcome is discarded
+            return
+        try:
+            result = future.result()
+        except JobCancelled:
+            self._finish(job_id, "cancelled")
+        except BrokenProcessPool as e:
+            self._pool = None
+            self._finish(job_id, "failed", error=f"Worker process died: {e}")
+        except Exception as e:
+            self._finish(job_id, "failed", error=str(e))
+        else:
+            self.store.set_result(job_id, result, self.result_ttl)
+            self._finish(job_id, "done", progress=1.0)
+
+    def _finish(self, job_id: str, status: str, **fields):
+        self.store.update(job_id, status=status, finished_at=time.time(), **fields)
+        self.store.expire(job_id, self.result_ttl)
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue built from settings on first use"""
+    global _job_queue
+    if _job_queue is None:
+        from app.services.modeling import tasks
+
+        if settings.JOB_BACKEND == "redis":
+            store = RedisJobStore.from_url(settings.REDIS_URL)
+        else:
+            store = LocalJobStore()
+        _job_queue = JobQueue(
+            store,
+            tasks.TASKS,
+            workers=settings.JOB_WORKERS,
+            result_ttl=settings.JOB_RESULT_TTL,
+            start_method=settings.WORKER_START_METHOD,
+            preload=(tasks.__name__,),
+        )
+    return _job_queue
+
+
+def shutdown_job_queue():
+    global _job_queue
+    if _job_queue is not None:
+        _job_queue.shutdown()
+        _job_queue = None
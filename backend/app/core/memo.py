@@ -0,0 +1,240 @@
+"""
+Model Result Memoization
+Content-addressed cache of pure model runs keyed by input hash and model version
+"""
+
+import glob
+import os
+import pickle
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.utils.hashing import stable_hash
+
+# Size charged per scalar, key or object header when estimating a result's memory
+SCALAR_BYTES = 32
+
+
+class ResultCache:
+    """Size-bounded LRU of model results with optional spill to disk
+
+    Entries are keyed ``"<namespace>-<version>-<input hash>"``. Memory is
+    bounded by the estimated in-memory size of the results (see
+    ``estimate_size``; nothing is serialized on a store); entries evicted from memory
+    are written to ``spill_dir`` (itself bounded) and promoted back on a hit.
+    Registering a new version for a namespace drops every entry of its older
+    versions, in memory and on disk. Cached results are shared between callers
+    and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_entries: int = 10_000,
+                 spill_dir: Optional[str] = None, spill_max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes
+        self.versions: Dict[str, str] = {}
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._spilled: "OrderedDict[str, int]" = OrderedDict()
+        self._spilled_bytes = 0
+        self._lock = threading.RLock()
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            paths = sorted(glob.glob(os.path.join(spill_dir, "*.pkl")), key=os.path.getmtime)
+            for path in paths:
+                size = os.path.getsize(path)
+                self._spilled[os.path.basename(path)[:-4]] = size
+                self._spilled_bytes += size
+
+    def register(self, namespace: str, version: str):
+        """Declare the current version of a model, invalidating older entries"""
+        with self._lock:
+            if self.versions.get(namespace) == version:
+                return
+            self.versions[namespace] = version
+            current = f"{namespace}-{version}-"
+            stale = [key for key in list(self._entries) + list(self._spilled)
+                     if key.startswith(f"{namespace}-") and not key.startswith(current)]
+            for key in stale:
+                self._drop(key)
+                self.stats[namespace]["invalidated"] += 1
+
+    def get_or_compute(self, namespace: str, inputs: Any, compute: Callable[[], Any]):
+        """Return the memoized result for ``inputs``, running ``compute`` on a miss"""
+        result = self.get(namespace, inputs)
+        if result is None:
+            result = compute()
+            self.put(namespace, inputs, result)
+        return result
+
+    def get(self, namespace: str, inputs: Any):
+        """Memoized result for ``inputs``, or None (counted as a miss)"""
+        key = self._key(namespace, inputs)
+        stats = self.stats[namespace]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                stats["hits"] += 1
+                return entry[0]
+
+            result = self._load_spilled(key)
+            if result is not None:
+                stats["disk_hits"] += 1
+                self._store(key, result)
+                return result
+
+        stats["misses"] += 1
+        return None
+
+    def put(self, namespace: str, inputs: Any, result: Any):
+        with self._lock:
+            self._store(self._key(namespace, inputs), result)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries) + list(self._spilled):
+                self._drop(key)
+
+    def get_stats(self) -> Dict:
+        summary = {}
+        for namespace, counters in self.stats.items():
+            lookups = counters["hits"] + counters["disk_hits"] + counters["misses"]
+            summary[namespace] = {
+                **counters,
+                "version": self.versions.get(namespace),
+                "hit_rate": round((counters["hits"] + counters["disk_hits"]) / lookups, 4) if lookups else 0.0,
+            }
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "spilled_entries": len(self._spilled),
+            "spilled_bytes": self._spilled_bytes,
+            "namespaces": summary,
+        }
+
+    def _key(self, namespace: str, inputs: Any) -> str:
+        return f"{namespace}-{self.versions.get(namespace, '0')}-{stable_hash(inputs)}"
+
+    def _store(self, key: str, result: Any):
+        size = estimate_size(result)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (result, size)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+            evicted_key, (evicted, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.stats[evicted_key.split("-", 1)[0]]["evictions"] += 1
+            self._spill(evicted_key, evicted)
+
+    def _spill(self, key: str, result: Any):
+        if not self.spill_dir or key in self._spilled:
+            return
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            with open(self._path(key), "wb") as handle:
+                handle.write(payload)
+        except OSError:
+            return
+        self._spilled[key] = len(payload)
+        self._spilled_bytes += len(payload)
+
+        while self._spilled_bytes > self.spill_max_bytes and self._spilled:
+            oldest = next(iter(self._spilled))
+            self._remove_spilled(oldest)
+
+    def _load_spilled(self, key: str):
+        if key not in self._spilled:
+            return None
+        try:
+            with open(self._path(key), "rb") as handle:
+                result = pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            result = None
+        self._remove_spilled(key)
+        return result
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+        self._remove_spilled(key)
+
+    def _remove_spilled(self, key: str):
+        size = self._spilled.pop(key, None)
+        if size is None:
+            return
+        self._spilled_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, f"{key}.pkl")
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory bytes of a result, without serializing it
+
+    Arrays count their buffers; containers, pydantic models and ``__slots__``
+    objects (such as ProjectionTable) count their contents, and every scalar
+    counts a flat SCALAR_BYTES.
+    """
+    if isinstance(value, (float, int, bool)) or value is None:
+        return SCALAR_BYTES
+    if isinstance(value, np.ndarray):
+        return value.nbytes + SCALAR_BYTES
+    if isinstance(value, (str, bytes)):
+        return len(value) + SCALAR_BYTES
+    if isinstance(value, dict):
+        return SCALAR_BYTES * (1 + len(value)) + sum(map(estimate_size, value.values()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return SCALAR_BYTES + sum(map(estimate_size, value))
+
+    size = SCALAR_BYTES
+    if hasattr(value, '__dict__'):
+        size += estimate_size(value.__dict__)
+    slots = getattr(type(value), '__slots__', ())
+    for slot in (slots,) if isinstance(slots, str) else slots:
+        if not slot.startswith('__') and hasattr(value, slot):
+            size += estimate_size(getattr(value, slot))
+    return size
+
+
+_model_cache: Optional[ResultCache] = None
+
+
+def get_model_cache() -> ResultCache:
+    """Process-wide model result cache built from settings on first use"""
+    global _model_cache
+    if _model_cache is None:
+        _model_cache = ResultCache(
+            max_bytes=settings.MODEL_CACHE_MAX_BYTES,
+            max_entries=settings.MODEL_CACHE_MAX_ENTRIES,
+            spill_dir=settings.MODEL_CACHE_SPILL_DIR or None,
+            spill_max_bytes=settings.MODEL_CACHE_SPILL_MAX_BYTES
+        )
+    return _model_cache
+
+
+def memoize(namespace: str, version: str, inputs: Any, compute: Callable[[], Any]):
+    """Run ``compute`` through the model cache under ``namespace``/``version``"""
+    if not settings.MODEL_CACHE_ENABLED:
+        return compute()
+    cache = get_model_cache()
+    cache.register(namespace, version)
+    return cache.get_or_compute(namespace, inputs, compute)
@@ -0,0 +1,329 @@
+"""
+Rate Limiting and Quotas
+Sliding-window request limits and monthly analysis quotas per tier, with
+usage counters written to the users table in batches
+"""
+
+import asyncio
+import math
+import time
+from collections import defaultdict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import bindparam, case, func
+
+from app.config import settings
+from app.core.auth_cache import invalidate_user
+from app.database import get_async_session_factory
+from app.models.user import User, UserTier
+
+RATE_LIMIT_WINDOW = 60.0  # Seconds; limits are configured per minute
+QUOTA_TTL = 3600  # Seconds an idle quota counter is kept before it is re-read from the database
+# Anonymous counters have no database row to re-read; keep them for the whole billing month
+ANONYMOUS_QUOTA_TTL = 32 * 24 * 3600
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: Optional[int] = None  # Seconds until a rejected request would be allowed
+
+
+def tier_rate_limit(tier: Optional[str]) -> int:
+    """Requests per minute for a tier; anonymous clients get the free tier's limit"""
+    limits = {
+        UserTier.PREMIUM: settings.RATE_LIMIT_PREMIUM_PER_MINUTE,
+        UserTier.ENTERPRISE: settings.RATE_LIMIT_ENTERPRISE_PER_MINUTE,
+    }
+    return limits.get(tier, settings.RATE_LIMIT_PER_MINUTE)
+
+
+def _decide(allowed: bool, limit: int, window: float, elapsed: float, current: int, previous: int) -> Decision:
+    """Decision for a sliding-window counter after a hit
+
+    The request count over the last ``window`` seconds is estimated as this
+    window's count plus the previous window's, weighted by how much of the
+    previous window still overlaps it.
+    """
+    used = previous * (1 - elapsed / window) + current
+    if allowed:
+        return Decision(True, limit, max(0, int(limit - used)), 0)
+    if current < limit and previous > 0:
+        # The previous window decays out of the estimate within this one
+        wait = window * (1 - (limit - current - 1) / previous) - elapsed
+    else:
+        # This window's count has to decay in the next one
+        wait = window - elapsed
+        if current > 0 and limit > 0:
+            wait += window * max(0.0, 1 - (limit - 1) / current)
+    return Decision(False, limit, 0, max(1, math.ceil(wait)))
+
+
+# ============ BACKENDS ============
+
+class LocalRateLimiter:
+    """Counters in this process's memory
+
+    Each API process enforces the limits on its own, so with N workers a
+    client may get up to N times its limit; use the Redis backend there.
+    """
+
+    name = "local"
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._windows: Dict[str, list] = {}  # key -> [window index, count, previous window's count]
+        self._usage: Dict[str, list] = {}  # key -> [count, expires at]
+
+    def hit(self, key: str, limit: int, window: float = RATE_LIMIT_WINDOW, now: Optional[float] = None) -> Decision:
+        """Count one request against ``limit`` per ``window`` unless that would exceed it"""
+        index, elapsed = divmod(time.time() if now is None else now, window)
+        state = self._windows.get(key)
+        if state is None or state[0] < index - 1:
+            current, previous = 0, 0
+        elif state[0] < index:
+            current, previous = 0, state[1]
+        else:
+            current, previous = state[1], state[2]
+
+        allowed = previous * (1 - elapsed / window) + current + 1 <= limit
+        if allowed:
+            current += 1
+        self._windows[key] = [index, current, previous]
+        if len(self._windows) > self.max_keys:
+            self._windows = {k: v for k, v in self._windows.items() if v[0] >= index - 1}
+        return _decide(allowed, limit, window, elapsed, current, previous)
+
+    def consume(self, key: str, limit: int, used: int, ttl: int = QUOTA_TTL) -> Decision:
+        """Count one unit of a quota; ``used`` seeds a counter this process has not seen"""
+        now = time.time()
+        entry = self._usage.get(key)
+        count = entry[0] if entry is not None and entry[1] > now else used
+        allowed = count + 1 <= limit
+        if allowed:
+            count += 1
+        self._usage[key] = [count, now + ttl]
+        if len(self._usage) > self.max_keys:
+            self._usage = {k: v for k, v in self._usage.items() if v[1] > now}
+        return Decision(allowed, limit, max(0, limit - count))
+
+    def release(self, key: str):
+        """Give back one unit of a quota taken by consume (e.g. the request failed)"""
+        entry = self._usage.get(key)
+        if entry is not None and entry[0] > 0:
+            entry[0] -= 1
+
+    def reset(self, key: str):
+        self._windows.pop(key, None)
+        self._usage.pop(key, None)
+
+
+# KEYS: this window, previous window; ARGV: limit, previous window's weight, key TTL (ms)
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[2]) + current + 1 > tonumber(ARGV[1]) then
+    return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return {1, current, previous}
+"""
+
+# KEYS: counter; ARGV: limit, count to seed a missing counter with, TTL (s)
+QUOTA_SCRIPT = """
+local count = tonumber(redis.call('GET', KEYS[1]) or ARGV[2])
+local allowed = 0
+if count + 1 <= tonumber(ARGV[1]) then
+    count = count + 1
+    allowed = 1
+end
+redis.call('SET', KEYS[1], count, 'EX', ARGV[3])
+return {allowed, count}
+"""
+
+# KEYS: counter; gives back one unit without creating or re-expiring the counter
+RELEASE_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[1]) or '0') > 0 then
+    return redis.call('DECR', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisRateLimiter:
+    """Counters on the configured Redis instance, shared by every API process
+
+    Each check-and-increment is one Lua script, so concurrent requests from
+    different processes never both take the last slot. If Redis is
+    unreachable requests are let through rather than failed.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, prefix: str = "alphaforge:limits:"):
+        self.client = client
+        self.prefix = prefix
+        self._hit = client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._consume = client.register_script(QUOTA_SCRIPT)
+        self._release = client.register_script(RELEASE_SCRIPT)
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisRateLimiter":
+        import redis
+
+        return cls(redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5))
+
+    def hit(self, key: str, limit: int, window: float = RATE_LIMIT_WINDOW, now: Optional[float] = None) -> Decision:
+        index, elapsed = divmod(time.time() if now is None else now, window)
+        keys = [f"{self.prefix}rate:{key}:{int(index)}", f"{self.prefix}rate:{key}:{int(index) - 1}"]
+        try:
+            allowed, current, previous = self._hit(keys=keys, args=[limit, 1 - elapsed / window, int(window * 2000)])
+        except Exception as e:
+            return self._fail_open("rate limit", limit, e)
+        return _decide(bool(allowed), limit, window, elapsed, int(current), int(previous))
+
+    def consume(self, key: str, limit: int, used: int, ttl: int = QUOTA_TTL) -> Decision:
+        try:
+            allowed, count = self._consume(keys=[f"{self.prefix}quota:{key}"], args=[limit, used, ttl])
+        except Exception as e:
+            return self._fail_open("quota", limit, e)
+        return Decision(bool(allowed), limit, max(0, limit - int(count)))
+
+    def release(self, key: str):
+        try:
+            self._release(keys=[f"{self.prefix}quota:{key}"])
+        except Exception as e:
+            self.errors += 1
+            print(f"Redis quota release failed: {e}")
+
+    def reset(self, key: str):
+        self.client.delete(f"{self.prefix}quota:{key}")
+
+    def _fail_open(self, check: str, limit: int, error: Exception) -> Decision:
+        self.errors += 1
+        print(f"Redis {check} check failed, allowing request: {error}")
+        return Decision(True, limit, limit, 0)
+
+
+# ============ USAGE ============
+
+_users = User.__table__
+# A count from a new billing month replaces the previous month's instead of adding to it
+_INCREMENT_USAGE = (
+    _users.update()
+    .where(_users.c.id == bindparam("user_id"))
+    .values(
+        monthly_analyses=case(
+            (_users.c.usage_period == bindparam("period"),
+             func.coalesce(_users.c.monthly_analyses, 0) + bindparam("count")),
+            else_=bindparam("count"),
+        ),
+        total_analyses=func.coalesce(_users.c.total_analyses, 0) + bindparam("count"),
+        usage_period=bindparam("period"),
+    )
+)
+
+
+class UsageRecorder:
+    """Analysis counts per user and billing month, added to the users table in batches
+
+    Requests only bump an in-memory counter; every ``interval`` seconds a
+    background task writes all of them with one executemany UPDATE, and
+    counts from a failed write are kept for the next one. Quotas are
+    enforced by the rate limiter's counters, so the table may lag by up to
+    one interval.
+    """
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self._pending: Dict[Tuple[int, str], int] = defaultdict(int)
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"recorded": 0, "flushed": 0, "flushes": 0, "errors": 0}
+
+    def record(self, user_id: int, period: str, count: int = 1):
+        self._pending[(user_id, period)] += count
+        self.stats["recorded"] += count
+
+    async def flush(self) -> int:
+        """Write pending counts now; returns how many users were updated"""
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, defaultdict(int)
+        # Earlier months first, so a batch spanning a month change ends on the new month
+        rows = [
+            {"user_id": user_id, "period": period, "count": count}
+            for (user_id, period), count in sorted(batch.items(), key=lambda item: item[0][1])
+        ]
+        try:
+            async with get_async_session_factory()() as db:
+                await db.execute(_INCREMENT_USAGE, rows)
+                await db.commit()
+        except Exception as e:
+            for key, count in batch.items():
+                self._pending[key] += count
+            self.stats["errors"] += 1
+            print(f"Usage flush failed, retrying in {self.interval:g}s: {e}")
+            return 0
+
+        # Core UPDATEs bypass the ORM events that keep cached user rows fresh
+        users = {user_id for user_id, _ in batch}
+        for user_id in users:
+            invalidate_user(user_id)
+        self.stats["flushed"] += sum(batch.values())
+        self.stats["flushes"] += 1
+        return len(users)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        """Cancel the background task and write what is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "pending_users": len({user_id for user_id, _ in self._pending}), "interval": self.interval}
+
+
+_rate_limiter = None
+_usage_recorder: Optional[UsageRecorder] = None
+
+
+def get_rate_limiter():
+    """Process-wide rate limiter built from settings on first use"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        if settings.RATE_LIMIT_BACKEND == "redis":
+            _rate_limiter = RedisRateLimiter.from_url(settings.REDIS_URL)
+        else:
+            _rate_limiter = LocalRateLimiter()
+    return _rate_limiter
+
+
+def get_usage_recorder() -> UsageRecorder:
+    global _usage_recorder
+    if _usage_recorder is None:
+        _usage_recorder = UsageRecorder(settings.USAGE_FLUSH_INTERVAL)
+    return _usage_recorder
+
+
+async def shutdown_usage_recorder():
+    global _usage_recorder
+    if _usage_recorder is not None:
+        await _usage_recorder.stop()
+        _usage_recorder = None
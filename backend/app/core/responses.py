@@ -0,0 +1,95 @@
+"""
+JSON Responses
+orjson rendering for model outputs, NumPy values and projection tables
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+
+import numpy as np
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+from app.schemas.projections import ProjectionTable
+
+try:
+    import orjson
+except ImportError:  # Falls back to the standard library encoder
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Values orjson does not encode natively"""
+    if isinstance(obj, ProjectionTable):
+        return obj.records()
+    if isinstance(obj, BaseModel):
+        # Fields of a constructed model are already valid; encode them as they are
+        return dict(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """JSON bytes for ``content``; NaN and infinity become null"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        _finite(content), default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _finite(obj: Any) -> Any:
+    if isinstance(obj, float):
+        return obj if obj == obj and obj not in (float("inf"), float("-inf")) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    if isinstance(obj, (BaseModel, ProjectionTable, np.ndarray, np.generic)):
+        return _finite(_default(obj))
+    return obj
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson
+
+    Handlers that already hold validated outputs can return one of these
+    directly: FastAPI then skips re-validating the content against the
+    route's response_model and the jsonable_encoder pass, and pydantic
+    models, projection tables and NumPy arrays are encoded as they are.
+    As the app's default response class it also renders plain dict results.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class PrecomputedJSON:
+    """JSON body for content that never changes while the process runs
+
+    Rendered once, with a strong ETag over its bytes: serving it costs no
+    encoding, and a client that sends the ETag back in If-None-Match gets a
+    bodiless 304 instead.
+    """
+
+    __slots__ = ("body", "etag", "headers")
+
+    def __init__(self, content: Any, max_age: int = 300):
+        self.body = dumps(content)
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.headers = {"ETag": self.etag, "Cache-Control": f"public, max-age={max_age}"}
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags
+
+    def response(self, if_none_match: Optional[str] = None) -> Response:
+        if self.matches(if_none_match):
+            return Response(status_code=304, headers=self.headers)
+        return Response(self.body, media_type="application/json", headers=self.headers)
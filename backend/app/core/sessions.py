@@ -0,0 +1,67 @@
+"""
+Session Store
+Short-lived per-client state kept in this process's memory
+"""
+
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class SessionStore:
+    """Sessions keyed by unguessable ids, dropped after ``ttl`` idle seconds
+
+    At most ``max_sessions`` are kept; creating one more evicts the least
+    recently used. Sessions live in the process that created them, so
+    deployments with several API workers need sticky routing for them.
+    """
+
+    def __init__(self, ttl: float = 1800.0, max_sessions: int = 1000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()  # id -> [expires at, value]
+        self.stats = {"created": 0, "expired": 0, "evicted": 0}
+
+    def create(self, value: Any) -> str:
+        self._purge_expired()
+        session_id = secrets.token_urlsafe(16)
+        self._sessions[session_id] = [time.monotonic() + self.ttl, value]
+        self.stats["created"] += 1
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.stats["evicted"] += 1
+        return session_id
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Session value, renewing its idle timeout; None when unknown or expired"""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if entry[0] <= now:
+            del self._sessions[session_id]
+            self.stats["expired"] += 1
+            return None
+        entry[0] = now + self.ttl
+        self._sessions.move_to_end(session_id)
+        return entry[1]
+
+    def discard(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def _purge_expired(self):
+        # Least recently used first, so expired sessions sit at the front
+        now = time.monotonic()
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if entry[0] > now:
+                break
+            del self._sessions[session_id]
+            self.stats["expired"] += 1
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "active": len(self._sessions), "max_sessions": self.max_sessions, "ttl": self.ttl}
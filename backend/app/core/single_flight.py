@@ -0,0 +1,93 @@
+"""
+Single-flight request coalescing
+Concurrent identical computations share one in-flight execution
+"""
+
+import asyncio
+import inspect
+import time
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution
+
+    The first caller for a key runs the computation; callers that arrive while
+    it is in flight await the same task, and callers within ``result_ttl``
+    seconds after it finished get the cached result. Failures are shared with
+    the waiters of that flight but never cached. Keys are namespaced as
+    ``"<namespace>:<hash>"`` and stats are kept per namespace.
+    """
+
+    def __init__(self, result_ttl: float = 2.0, max_results: int = 1024):
+        self.result_ttl = result_ttl
+        self.max_results = max_results
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._results: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+        self._loop = None
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def do(self, key: str, compute: Callable):
+        """Return the result of ``compute()``, shared with identical concurrent calls
+
+        ``compute`` may be a coroutine function or a plain function.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._in_flight = loop, {}
+
+        stats = self.stats[key.split(":", 1)[0]]
+        stats["requests"] += 1
+
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                stats["cached"] += 1
+                return cached[1]
+            del self._results[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            stats["collapsed"] += 1
+        else:
+            stats["executed"] += 1
+            task = loop.create_task(_call(compute))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        # Shield so one disconnected client does not cancel everyone's result
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        self._results[key] = (time.monotonic() + self.result_ttl, task.result())
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        """Per-namespace request counts and how many were collapsed"""
+        summary = {}
+        for namespace, counters in self.stats.items():
+            requests = counters["requests"]
+            shared = counters["collapsed"] + counters["cached"]
+            summary[namespace] = {
+                **counters,
+                "collapse_rate": round(shared / requests, 4) if requests else 0.0,
+            }
+        return {"in_flight": len(self._in_flight), "namespaces": summary}
+
+
+async def _call(compute: Callable):
+    result = compute()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+valuation_flight = SingleFlight()
@@ -1,13 +1,81 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./alphaforge.db"
+from app.config import settings
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}
-)
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+
+# Async drivers for each sync URL scheme the app accepts
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return _is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+def engine_options(url: str) -> dict:
+    """Pool settings for a database URL
+
+    Server databases get a sized QueuePool with pre-ping and recycling.
+    In-memory SQLite shares one connection (StaticPool). File SQLite allows a
+    single writer, so it gets a fixed pool without overflow: excess sessions
+    queue on the pool instead of piling up in SQLite's busy-wait backoff.
+    """
+    options = {"echo": settings.DATABASE_ECHO}
+    if _is_memory_sqlite(url):
+        options.update(connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    elif _is_sqlite(url):
+        options.update(
+            connect_args={"check_same_thread": False},
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=0,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        )
+    else:
+        options.update(
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        )
+    return options
+
+
+def async_database_url(url: str) -> str:
+    """Same database, addressed through its asyncio driver"""
+    parsed = make_url(url)
+    if "+" in parsed.drivername and parsed.drivername not in ("postgresql+psycopg2", "sqlite+pysqlite"):
+        return url
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _enable_sqlite_wal(dbapi_connection, connection_record):
+    """WAL lets readers proceed while a writer commits; busy_timeout queues writers"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+if _is_sqlite(SQLALCHEMY_DATABASE_URL) and not _is_memory_sqlite(SQLALCHEMY_DATABASE_URL):
+    event.listen(engine, "connect", _enable_sqlite_wal)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -20,3 +88,50 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async engine and sessions are created on first use, so the sync-only paths
+# (scripts, migrations) do not need the async drivers installed
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        url = async_database_url(SQLALCHEMY_DATABASE_URL)
+        options = engine_options(SQLALCHEMY_DATABASE_URL)
+        if "pool_size" in options:
+            # aiosqlite defaults to NullPool, which opens a connection and thread per session
+            options.setdefault("poolclass", AsyncAdaptedQueuePool)
+        _async_engine = create_async_engine(url, **options)
+        if _is_sqlite(url) and not _is_memory_sqlite(url):
+            event.listen(_async_engine.sync_engine, "connect", _enable_sqlite_wal)
+    return _async_engine
+
+
+def get_async_session_factory():
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_session_factory = async_sessionmaker(
+            get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory
+
+
+async def get_async_db():
+    """FastAPI dependency yielding an AsyncSession that never blocks the event loop"""
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    """Close pooled async connections (their driver threads keep the process alive)"""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine, _async_session_factory = None, None
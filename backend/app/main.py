@@ -1,15 +1,26 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
+from app.core.auth_cache import shutdown_password_hasher
+from app.core.compute import ComputeBusy, get_compute_executor, shutdown_compute_executor
+from app.core.jobs import shutdown_job_queue
+from app.core.rate_limit import get_usage_recorder, shutdown_usage_recorder
+from app.core.responses import FastJSONResponse
+from app.config import settings
+from app.database import engine, Base, dispose_async_engine
 
 # Import routes first (they don't need models)
-from app.api.v1.routes import analysis, market, lbo, saved_analyses, tiers
+from app.api.v1.routes import analysis, market, lbo, saved_analyses, tiers, export, jobs, what_if, live
 from app.api.v1.middleware import auth
+from app.api.v1.middleware.rate_limit import rate_limit
 
 app = FastAPI(
     title="AlphaForge API",
     description="AI-Powered Equity Research Platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # CORS
@@ -21,25 +32,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create tables - import models here AFTER Base is defined
+# Schema changes are applied by `alembic upgrade head` before deploying, not on every boot
 @app.on_event("startup")
 async def startup_event():
-    # Import models here to avoid circular imports
-    from app.models import user, analysis as analysis_models
+    if settings.DATABASE_CREATE_TABLES:
+        # Throwaway databases (e.g. in-memory SQLite) that migrations never see
+        from app.models import user, analysis as analysis_models
+        Base.metadata.create_all(bind=engine)
+        print("✅ Database tables created!")
     
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created!")
+    # Spawn the compute workers in the background; requests queue until they are up
+    app.state.compute_warmup = asyncio.create_task(_warm_compute_pool())
+    get_usage_recorder().start()
     print("🚀 AlphaForge API started!")
-    print("📊 Database initialized!")
-
-# Include routers
-app.include_router(analysis.router, prefix="/api/v1/analysis", tags=["analysis"])
-app.include_router(market.router, prefix="/api/v1/market", tags=["market"])
-app.include_router(lbo.router, prefix="/api/v1/lbo", tags=["lbo"])
-app.include_router(saved_analyses.router, prefix="/api/v1/saved", tags=["saved"])
-app.include_router(tiers.router, prefix="/api/v1", tags=["tiers"])
-app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
-app.include_router(analysis.router, prefix="/api/v1/analysis", tags=["analysis"])
+
+async def _warm_compute_pool():
+    if not await get_compute_executor().warm():
+        print("⚠️ Compute workers failed to start; the pool restarts on the next request")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await shutdown_usage_recorder()
+    await dispose_async_engine()
+    shutdown_job_queue()
+    shutdown_compute_executor()
+    shutdown_password_hasher()
+
+@app.exception_handler(ComputeBusy)
+async def compute_busy_handler(request: Request, exc: ComputeBusy):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# Include routers; every API route counts against the caller's per-minute limit
+limited = [Depends(rate_limit)]
+app.include_router(analysis.router, prefix="/api/v1/analysis", tags=["analysis"], dependencies=limited)
+app.include_router(what_if.router, prefix="/api/v1/analysis/what-if", tags=["analysis"], dependencies=limited)
+# WebSocket; checks the rate limit itself when a connection opens
+app.include_router(live.router, prefix="/api/v1/analysis", tags=["analysis"])
+app.include_router(market.router, prefix="/api/v1/market", tags=["market"], dependencies=limited)
+app.include_router(lbo.router, prefix="/api/v1/lbo", tags=["lbo"], dependencies=limited)
+app.include_router(saved_analyses.router, prefix="/api/v1/saved", tags=["saved"], dependencies=limited)
+app.include_router(export.router, prefix="/api/v1/export", tags=["export"], dependencies=limited)
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["jobs"], dependencies=limited)
+app.include_router(tiers.router, prefix="/api/v1", tags=["tiers"], dependencies=limited)
+app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"], dependencies=limited)
+app.include_router(analysis.router, prefix="/api/v1/analysis", tags=["analysis"], dependencies=limited)
 
 @app.get("/")
 async def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Index, LargeBinary
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -22,12 +22,18 @@ class DCFAnalysis(Base):
     enterprise_value = Column(Float)
     equity_value = Column(Float)
     
-    # Full DCF Results (JSON)
-    dcf_results = Column(JSON, nullable=False)
+    # Full DCF Results: columnar binary (app.utils.columnar), or JSON for rows saved before it
+    dcf_results = Column(JSON, nullable=True)
+    dcf_results_blob = Column(LargeBinary, nullable=True)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Keyset pagination of a user's history, newest first
+    __table_args__ = (
+        Index("ix_dcf_analyses_user_created_id", "user_id", "created_at", "id"),
+    )
 
 class LBOAnalysis(Base):
     __tablename__ = "lbo_analyses"
@@ -51,9 +57,14 @@ class LBOAnalysis(Base):
     entry_equity = Column(Float)
     exit_equity = Column(Float)
     
-    # Full LBO Results (JSON)
-    lbo_results = Column(JSON, nullable=False)
+    # Full LBO Results: columnar binary (app.utils.columnar), or JSON for rows saved before it
+    lbo_results = Column(JSON, nullable=True)
+    lbo_results_blob = Column(LargeBinary, nullable=True)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_lbo_analyses_user_created_id", "user_id", "created_at", "id"),
+    )
@@ -1,5 +1,6 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
 from sqlalchemy.sql import func
+from app.core.entitlements import has_feature, monthly_analysis_limit, usage_period
 from app.database import Base
 import enum
 
@@ -25,6 +26,7 @@ class User(Base):
     # Usage Limits
     monthly_analyses = Column(Integer, default=0)
     total_analyses = Column(Integer, default=0)
+    usage_period = Column(String(6), nullable=True)  # Billing month (YYYYMM) monthly_analyses counts
     
     # Enterprise Features
     has_factset_access = Column(Boolean, default=False)
@@ -38,37 +40,15 @@ class User(Base):
     last_login = Column(DateTime(timezone=True))
     
     def get_monthly_limit(self):
-        limits = {
-            UserTier.FREE: 10,
-            UserTier.PREMIUM: 100,
-            UserTier.ENTERPRISE: 999999
-        }
-        return limits.get(self.tier, 10)
+        return monthly_analysis_limit(self.tier)
+    
+    def analyses_in_period(self, period: str) -> int:
+        """Analyses counted in a billing month; counts from earlier months do not carry over"""
+        return (self.monthly_analyses or 0) if self.usage_period == period else 0
     
     def can_analyze(self):
-        return self.monthly_analyses < self.get_monthly_limit()
+        return self.analyses_in_period(usage_period()) < self.get_monthly_limit()
     
     def has_feature(self, feature: str) -> bool:
-        """Check if user has access to a specific feature"""
-        features = {
-            UserTier.FREE: [
-                "basic_dcf", "basic_lbo", "save_analyses", 
-                "export_excel"
-            ],
-            UserTier.PREMIUM: [
-                "basic_dcf", "basic_lbo", "save_analyses", 
-                "export_excel", "advanced_dcf", "advanced_lbo",
-                "scenario_analysis", "comps_analysis", 
-                "historical_data", "priority_support"
-            ],
-            UserTier.ENTERPRISE: [
-                "basic_dcf", "basic_lbo", "save_analyses", 
-                "export_excel", "advanced_dcf", "advanced_lbo",
-                "scenario_analysis", "comps_analysis", 
-                "historical_data", "priority_support",
-                "ai_research_agent", "factset_integration",
-                "morningstar_integration", "custom_data_sources",
-                "api_access", "white_label", "dedicated_support"
-            ]
-        }
-        return feature in features.get(self.tier, [])
+        """Check if user has access to a specific feature (a Feature or its key, e.g. "basic_dcf")"""
+        return has_feature(self.tier, feature)
@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 
+from app.schemas.projections import ProjectionTable
+
 class DCFInputs(BaseModel):
     ticker: str
     base_revenue: float
@@ -19,7 +21,7 @@ class DCFInputs(BaseModel):
     current_price: float
 
 class DCFOutputs(BaseModel):
-    projections: List[Dict]
+    projections: ProjectionTable
     enterprise_value: float
     equity_value: float
     value_per_share: float
@@ -45,3 +47,28 @@ class ScenarioAnalysisResponse(BaseModel):
     current_price: float
     scenarios: Dict[str, ScenarioResult]
     base_case: DCFOutputs
+
+class MonteCarloDistribution(BaseModel):
+    distribution: str = "normal"  # normal, uniform, triangular or fixed
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    low: Optional[float] = None
+    high: Optional[float] = None
+    mode: Optional[float] = None
+    value: Optional[float] = None
+
+class MonteCarloStatistics(BaseModel):
+    mean: float
+    std: float
+    min: float
+    max: float
+    percentiles: Dict[str, float]
+
+class MonteCarloOutputs(BaseModel):
+    paths: int
+    seed: int
+    value_per_share: MonteCarloStatistics
+    upside: MonteCarloStatistics
+    probability_of_upside: float
+    histogram: Dict[str, List[float]]
+    distributions: Dict[str, MonteCarloDistribution]
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import Dict
+
+from app.schemas.projections import ProjectionTable
 
 class LBOInputs(BaseModel):
     # Transaction Details
@@ -44,7 +46,7 @@ class LBOReturns(BaseModel):
     cash_on_cash: float
 
 class LBOOutputs(BaseModel):
-    projections: List[Dict]
+    projections: ProjectionTable
     returns: LBOReturns
     sources_and_uses: Dict
-    debt_schedule: List[Dict]
+    debt_schedule: ProjectionTable
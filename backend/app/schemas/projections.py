@@ -0,0 +1,102 @@
+"""
+Projection Tables
+Per-year model lines held as one NumPy array instead of a list of dicts
+"""
+
+from typing import Any, Dict, Iterator, List, Sequence
+
+import numpy as np
+from pydantic_core import core_schema
+
+
+class ProjectionTable:
+    """Per-year model lines as a (lines x years) float64 array
+
+    Models build the array directly, so a projection costs one allocation
+    instead of a dict per year. ``table['FCF']`` is a view of one line,
+    ``records()`` gives the list-of-dicts layout the API has always returned
+    (``{"Year": 1, "Revenue": ..., ...}``) and ``to_dataframe()`` wraps the
+    array without copying it. In pydantic models the table validates from
+    either form and serializes as records.
+    """
+
+    __slots__ = ('index', 'columns', 'values')
+
+    def __init__(self, index: str, columns: Sequence[str], values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[0] != len(columns):
+            raise ValueError(f"Expected {len(columns)} projection lines, got shape {values.shape}")
+        self.index = index
+        self.columns = tuple(columns)
+        self.values = values
+
+    @classmethod
+    def from_records(cls, records: List[Dict], index: str = 'Year') -> 'ProjectionTable':
+        """Table from per-year dicts; the first key is taken as the year column"""
+        if not records:
+            return cls(index, (), np.empty((0, 0)))
+        index, *columns = records[0]
+        values = np.array([[record[name] for record in records] for name in columns], dtype=np.float64)
+        return cls(index, columns, values.reshape(len(columns), len(records)))
+
+    @property
+    def years(self) -> int:
+        return self.values.shape[1]
+
+    def __len__(self) -> int:
+        return self.years
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        try:
+            return self.values[self.columns.index(column)]
+        except ValueError:
+            raise KeyError(column) from None
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ProjectionTable):
+            return NotImplemented
+        return (self.index, self.columns) == (other.index, other.columns) and np.array_equal(self.values, other.values)
+
+    def __repr__(self) -> str:
+        return f"ProjectionTable({self.index!r}, {list(self.columns)!r}, years={self.years})"
+
+    def rows(self) -> Iterator[tuple]:
+        """``(year, *line values)`` per year, as plain Python numbers"""
+        return zip(range(1, self.years + 1), *self.values.tolist())
+
+    def records(self) -> List[Dict[str, float]]:
+        """One dict per year, keyed by the year column and then each line"""
+        keys = (self.index, *self.columns)
+        return [dict(zip(keys, row)) for row in self.rows()]
+
+    def to_dataframe(self):
+        """DataFrame indexed by year whose single float block is this table's array"""
+        import pandas as pd
+
+        return pd.DataFrame(
+            self.values.T,
+            index=pd.RangeIndex(1, self.years + 1, name=self.index),
+            columns=list(self.columns),
+            copy=False
+        )
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda table: table.records(), when_used='always'
+            )
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: core_schema.CoreSchema, handler) -> Dict:
+        return handler(core_schema.list_schema(core_schema.dict_schema(core_schema.str_schema(), core_schema.float_schema())))
+
+    @classmethod
+    def _validate(cls, value: Any) -> 'ProjectionTable':
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, list) and all(isinstance(record, dict) for record in value):
+            return cls.from_records(value)
+        raise ValueError("Projections must be a ProjectionTable or a list of per-year records")
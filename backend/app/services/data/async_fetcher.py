@@ -0,0 +1,232 @@
+"""
+Async Market Data Fetcher
+Concurrent, rate-limited price history fetching for async route handlers
+"""
+
+import asyncio
+import re
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+INDICES = {
+    "^GSPC": "S&P 500",
+    "^IXIC": "NASDAQ",
+    "^DJI": "Dow Jones",
+}
+
+MOVER_TICKERS = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'TSLA', 'META', 'AMD', 'NFLX']
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, bursts up to ``capacity``
+
+    Waiters are served in arrival order; nobody blocks the event loop.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Token bucket needs a positive rate and capacity")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = None
+        self._loop = None
+
+    async def acquire(self, tokens: int = 1):
+        if tokens > self.capacity:
+            raise ValueError("Cannot acquire more tokens than the bucket holds")
+
+        # asyncio primitives belong to one loop; rebind if the loop changed
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._lock = loop, asyncio.Lock()
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+class YahooHistoryProvider:
+    """Closing prices for many symbols in one yfinance download"""
+
+    def fetch_history(self, symbols: List[str], period: str) -> Dict[str, List[float]]:
+        import pandas as pd
+        import yfinance as yf
+
+        frame = yf.download(
+            symbols, period=period, group_by="ticker",
+            progress=False, threads=False, auto_adjust=False
+        )
+        history = {}
+        for symbol in symbols:
+            try:
+                if isinstance(frame.columns, pd.MultiIndex):
+                    closes = frame[symbol]["Close"]
+                else:
+                    closes = frame["Close"]
+            except KeyError:
+                continue
+            closes = closes.dropna()
+            if not closes.empty:
+                history[symbol] = [float(value) for value in closes]
+        return history
+
+
+class StubHistoryProvider:
+    """Deterministic offline provider for tests and local development
+
+    Prices are derived from the symbol name, ``latency`` simulates a slow
+    upstream, and every batch it serves is recorded in ``calls``.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: List[Tuple[str, ...]] = []
+
+    def fetch_history(self, symbols: List[str], period: str) -> Dict[str, List[float]]:
+        self.calls.append(tuple(symbols))
+        if self.latency:
+            time.sleep(self.latency)
+
+        days = _period_days(period)
+        history = {}
+        for symbol in symbols:
+            seed = zlib.crc32(symbol.encode())
+            price = 20 + seed % 480
+            drift = ((seed >> 9) % 81 - 40) / 1000  # -4% .. +4% per day
+            history[symbol] = [round(price * (1 + drift) ** day, 2) for day in range(days)]
+        return history
+
+
+class AsyncMarketDataFetcher:
+    """Fetch price history concurrently without blocking the event loop
+
+    Symbols are downloaded in batches (one upstream call per batch), with at
+    most ``max_concurrency`` batches in flight and every batch paying one token
+    from the shared limiter. Concurrent requests for a symbol that is already
+    being fetched await the same future instead of fetching it again.
+    """
+
+    def __init__(self, provider=None, limiter: Optional[TokenBucket] = None,
+                 max_concurrency: int = 4, batch_size: int = 50):
+        self.provider = provider or YahooHistoryProvider()
+        self.limiter = limiter or TokenBucket(rate=2.0, capacity=4)
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._loop = None
+        self.stats = {"requested": 0, "coalesced": 0, "fetched": 0, "batches": 0}
+
+    async def get_history(self, symbols: Iterable[str], period: str = "5d") -> Dict[str, List[float]]:
+        """Closing prices per symbol; symbols the provider has no data for are omitted"""
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        self.stats["requested"] += len(symbols)
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._in_flight = {}
+
+        waiting, to_fetch = {}, []
+        for symbol in symbols:
+            key = (symbol, period)
+            if key in self._in_flight:
+                self.stats["coalesced"] += 1
+            else:
+                self._in_flight[key] = loop.create_future()
+                to_fetch.append(symbol)
+            waiting[symbol] = self._in_flight[key]
+
+        batches = [to_fetch[i:i + self.batch_size] for i in range(0, len(to_fetch), self.batch_size)]
+        if batches:
+            await asyncio.gather(*(self._fetch_batch(batch, period) for batch in batches))
+
+        results = await asyncio.gather(*waiting.values(), return_exceptions=True)
+        return {
+            symbol: closes for symbol, closes in zip(waiting, results)
+            if closes is not None and not isinstance(closes, BaseException)
+        }
+
+    async def _fetch_batch(self, symbols: List[str], period: str):
+        try:
+            async with self._semaphore:
+                await self.limiter.acquire()
+                self.stats["batches"] += 1
+                history = await asyncio.to_thread(self.provider.fetch_history, symbols, period)
+            self.stats["fetched"] += len(symbols)
+            for symbol in symbols:
+                self._in_flight[(symbol, period)].set_result(history.get(symbol))
+        except BaseException as e:
+            # Coalesced waiters from other requests must not hang on a failed or cancelled fetch
+            error = e if isinstance(e, Exception) else RuntimeError("Market data fetch was cancelled")
+            for symbol in symbols:
+                future = self._in_flight.get((symbol, period))
+                if future is not None and not future.done():
+                    future.set_exception(error)
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            for symbol in symbols:
+                self._in_flight.pop((symbol, period), None)
+
+    async def get_market_data(self) -> Dict:
+        """Major indices, in the YahooFinanceService.get_market_data layout"""
+        history = await self.get_history(INDICES, period="5d")
+
+        market_data = {}
+        for symbol, name in INDICES.items():
+            closes = history.get(symbol, [])
+            if len(closes) < 2:
+                continue
+            current, previous = closes[-1], closes[-2]
+            change = current - previous
+            market_data[name] = {
+                "symbol": symbol,
+                "name": name,
+                "price": round(current, 2),
+                "change": round(change, 2),
+                "change_percent": round(change / previous * 100, 2),
+                "is_positive": change >= 0
+            }
+        return market_data
+
+    async def get_market_movers(self, limit: int = 5) -> Dict:
+        """Top gainers and losers from one batched history download"""
+        history = await self.get_history(MOVER_TICKERS, period="5d")
+
+        gainers, losers = [], []
+        for ticker_symbol in MOVER_TICKERS:
+            closes = history.get(ticker_symbol, [])
+            if len(closes) < 2:
+                continue
+            change_percent = (closes[-1] - closes[-2]) / closes[-2] * 100
+            stock_data = {
+                "ticker": ticker_symbol,
+                "name": ticker_symbol,
+                "change_percent": round(change_percent, 2)
+            }
+            (gainers if change_percent > 0 else losers).append(stock_data)
+
+        return {
+            "gainers": sorted(gainers, key=lambda x: x['change_percent'], reverse=True)[:limit],
+            "losers": sorted(losers, key=lambda x: x['change_percent'])[:limit]
+        }
+
+
+def _period_days(period: str) -> int:
+    """Trading days covered by a yfinance-style period such as '5d' or '1mo'"""
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        return 30
+    count, unit = int(match.group(1)), match.group(2)
+    return count * {"d": 1, "wk": 5, "mo": 21, "y": 252}[unit]
@@ -0,0 +1,370 @@
+"""
+Market Data Cache
+Tiered cache (in-process LRU -> SQLite -> optional Redis) with per-type TTLs
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+# (fresh seconds, additional seconds an entry may be served stale while it refreshes)
+CACHE_TTLS: Dict[str, Tuple[int, int]] = {
+    "quote": (15, 60),
+    "market_data": (30, 120),
+    "market_movers": (30, 120),
+    "company_info": (15 * 60, 60 * 60),
+    "dcf_inputs": (24 * 60 * 60, 24 * 60 * 60),
+}
+DEFAULT_TTL = (60, 60)
+
+# Seconds between sweeps of expired rows out of the SQLite layer, which runs on writes
+SQLITE_PURGE_INTERVAL = 300
+
+
+class PartialResult(Exception):
+    """Raised by a fetcher that only got part of its data
+
+    The cache serves ``value`` to the caller but does not store it, so the
+    next lookup retries the fetch instead of pinning the gap for a full TTL.
+    """
+
+    def __init__(self, value, errors: Dict[str, str]):
+        super().__init__(f"Partial result; failed: {', '.join(errors)}")
+        self.value = value
+        self.errors = errors
+
+
+class CacheEntry:
+    """A cached value with its freshness deadlines (epoch seconds)"""
+
+    __slots__ = ("value", "fresh_until", "stale_until")
+
+    def __init__(self, value, fresh_until: float, stale_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"value": self.value, "fresh_until": self.fresh_until, "stale_until": self.stale_until},
+            default=float
+        )
+
+    @classmethod
+    def from_json(cls, payload) -> "CacheEntry":
+        data = json.loads(payload)
+        return cls(data["value"], data["fresh_until"], data["stale_until"])
+
+
+class MemoryCache:
+    """Per-process LRU layer"""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.stale_until <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLiteCache:
+    """Host-local layer shared by every worker process through one SQLite file
+
+    Expired rows are swept when the layer opens and then at most every
+    ``purge_interval`` seconds on writes, so the file does not grow forever.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, purge_interval: float = SQLITE_PURGE_INTERVAL):
+        self.path = path
+        self.purge_interval = purge_interval
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS market_cache ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, stale_until REAL NOT NULL)"
+            )
+        self.purge_expired()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        row = self._connection().execute(
+            "SELECT payload FROM market_cache WHERE key = ? AND stale_until > ?", (key, time.time())
+        ).fetchone()
+        return CacheEntry.from_json(row[0]) if row else None
+
+    def set(self, key: str, entry: CacheEntry):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO market_cache (key, payload, stale_until) VALUES (?, ?, ?)",
+            (key, entry.to_json(), entry.stale_until)
+        )
+        if time.time() >= self._next_purge:
+            self.purge_expired()
+
+    def delete(self, key: str):
+        self._connection().execute("DELETE FROM market_cache WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        """Drop entries past their stale deadline; returns the number removed"""
+        now = time.time()
+        self._next_purge = now + self.purge_interval
+        cursor = self._connection().execute("DELETE FROM market_cache WHERE stale_until <= ?", (now,))
+        return cursor.rowcount
+
+
+class RedisCache:
+    """Cluster-wide layer on the configured Redis instance"""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "alphaforge:market:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        payload = self.client.get(self.prefix + key)
+        return CacheEntry.from_json(payload) if payload else None
+
+    def set(self, key: str, entry: CacheEntry):
+        ttl = max(1, int(entry.stale_until - time.time()))
+        self.client.set(self.prefix + key, entry.to_json(), ex=ttl)
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+
+class MarketDataCache:
+    """Read-through cache over ordered layers with stale-while-revalidate
+
+    Lookups walk the layers fastest first, stopping at the first fresh entry,
+    and backfill the faster layers with what they found.
+    A fresh entry is returned as is; a stale one is returned immediately while
+    a single background refresh replaces it; anything older is fetched inline.
+    A failing layer is skipped rather than failing the request, and a
+    PartialResult from the fetcher is served without being stored.
+    """
+
+    def __init__(self, layers: List, ttls: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.layers = layers
+        self.ttls = {**CACHE_TTLS, **(ttls or {})}
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.layer_errors: Dict[str, int] = defaultdict(int)
+        self._refreshing = set()
+        self._refresh_tasks = set()  # Strong references to background refreshes on the event loop
+        self._lock = threading.Lock()
+
+    def get_or_fetch(self, data_type: str, key: str, fetch: Callable[[], object]):
+        """Return the cached value for (data_type, key), fetching it on a miss"""
+        cache_key = f"{data_type}:{key}"
+        entry = self._lookup(data_type, cache_key)
+        now = time.time()
+
+        if entry is not None and now < entry.fresh_until:
+            self.stats[data_type]["hits"] += 1
+            return entry.value
+
+        if entry is not None and now < entry.stale_until:
+            self.stats[data_type]["stale_hits"] += 1
+            self._refresh_in_background(data_type, cache_key, fetch)
+            return entry.value
+
+        self.stats[data_type]["misses"] += 1
+        return self._fetch_and_store(data_type, cache_key, fetch)
+
+    async def get_or_fetch_async(self, data_type: str, key: str, fetch: Callable[[], Awaitable]):
+        """``get_or_fetch`` for coroutine fetchers, called from the event loop
+
+        Slower layers (SQLite, Redis) block, so they are read and written from
+        a thread; a stale entry is refreshed by a background task.
+        """
+        cache_key = f"{data_type}:{key}"
+        entry = await self._off_loop(self._lookup, data_type, cache_key)
+        now = time.time()
+
+        if entry is not None and now < entry.fresh_until:
+            self.stats[data_type]["hits"] += 1
+            return entry.value
+
+        if entry is not None and now < entry.stale_until:
+            self.stats[data_type]["stale_hits"] += 1
+            self._refresh_in_task(data_type, cache_key, fetch)
+            return entry.value
+
+        self.stats[data_type]["misses"] += 1
+        try:
+            value = await fetch()
+        except PartialResult as partial:
+            self.stats[data_type]["partial"] += 1
+            return partial.value
+        await self._off_loop(self._store, data_type, cache_key, value)
+        return value
+
+    def invalidate(self, data_type: str, key: str):
+        cache_key = f"{data_type}:{key}"
+        for layer in self.layers:
+            self._safely(layer, "delete", cache_key)
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters per data type and layer"""
+        summary = {}
+        for data_type, counters in self.stats.items():
+            lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+            summary[data_type] = {
+                **counters,
+                "hit_rate": round((counters["hits"] + counters["stale_hits"]) / lookups, 4) if lookups else 0.0,
+            }
+        return {
+            "layers": [layer.name for layer in self.layers],
+            "layer_errors": dict(self.layer_errors),
+            "types": summary,
+        }
+
+    def _lookup(self, data_type: str, cache_key: str) -> Optional[CacheEntry]:
+        best, source = None, 0
+        for depth, layer in enumerate(self.layers):
+            entry = self._safely(layer, "get", cache_key)
+            if entry is None:
+                continue
+            self.stats[data_type][f"{layer.name}_hits"] += 1
+            # A slower layer may hold a fresher copy written by another worker
+            if best is None or entry.fresh_until > best.fresh_until:
+                best, source = entry, depth
+            if time.time() < entry.fresh_until:
+                break
+
+        if best is not None:
+            for faster in self.layers[:source]:
+                self._safely(faster, "set", cache_key, best)
+        return best
+
+    def _fetch_and_store(self, data_type: str, cache_key: str, fetch: Callable[[], object]):
+        try:
+            value = fetch()
+        except PartialResult as partial:
+            self.stats[data_type]["partial"] += 1
+            return partial.value
+        self._store(data_type, cache_key, value)
+        return value
+
+    def _store(self, data_type: str, cache_key: str, value):
+        fresh, stale = self.ttls.get(data_type, DEFAULT_TTL)
+        now = time.time()
+        entry = CacheEntry(value, now + fresh, now + fresh + stale)
+        for layer in self.layers:
+            self._safely(layer, "set", cache_key, entry)
+
+    def _refresh_in_background(self, data_type: str, cache_key: str, fetch: Callable[[], object]):
+        with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        def refresh():
+            try:
+                self._fetch_and_store(data_type, cache_key, fetch)
+                self.stats[data_type]["refreshes"] += 1
+            except Exception:
+                self.stats[data_type]["refresh_errors"] += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(cache_key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _refresh_in_task(self, data_type: str, cache_key: str, fetch: Callable[[], Awaitable]):
+        with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        async def refresh():
+            try:
+                value = await fetch()
+                await self._off_loop(self._store, data_type, cache_key, value)
+                self.stats[data_type]["refreshes"] += 1
+            except PartialResult:
+                # Keep serving the complete stale entry
+                self.stats[data_type]["partial"] += 1
+            except Exception:
+                self.stats[data_type]["refresh_errors"] += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(cache_key)
+
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _off_loop(self, func: Callable, *args):
+        if all(isinstance(layer, MemoryCache) for layer in self.layers):
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    def _safely(self, layer, method: str, *args):
+        try:
+            return getattr(layer, method)(*args)
+        except Exception as e:
+            self.layer_errors[layer.name] += 1
+            print(f"Cache layer {layer.name} {method} failed: {e}")
+            return None
+
+
+_market_data_cache: Optional[MarketDataCache] = None
+
+
+def get_market_data_cache() -> MarketDataCache:
+    """Process-wide cache built from settings on first use"""
+    global _market_data_cache
+    if _market_data_cache is None:
+        layers = [MemoryCache(settings.MARKET_DATA_CACHE_SIZE)]
+        if settings.MARKET_DATA_CACHE_PATH:
+            layers.append(SQLiteCache(settings.MARKET_DATA_CACHE_PATH))
+        if settings.MARKET_DATA_CACHE_REDIS:
+            try:
+                layers.append(RedisCache(settings.REDIS_URL))
+            except ImportError:
+                print("redis is not installed; market data cache runs without Redis")
+        _market_data_cache = MarketDataCache(layers)
+    return _market_data_cache
@@ -1,7 +1,7 @@
 """
 Mock Data Service - for testing when Yahoo Finance is blocked
 """
-from typing import Dict
+from typing import Dict, List
 
 class MockDataService:
     """Provides mock financial data for testing"""
@@ -76,6 +76,14 @@ class MockDataService:
             "current_price": self.get_company_info(ticker)["current_price"],
         }
     
+    def get_bulk_dcf_inputs(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Get mock DCF inputs for many tickers at once"""
+        return {ticker.upper(): self.get_dcf_inputs(ticker) for ticker in tickers}
+    
+    async def get_bulk_dcf_inputs_async(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Same as get_bulk_dcf_inputs; mock data never blocks"""
+        return self.get_bulk_dcf_inputs(tickers)
+    
     def get_market_data(self) -> Dict:
         """Get mock market data"""
         return {
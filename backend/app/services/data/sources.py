@@ -0,0 +1,31 @@
+"""
+Market Data Sources
+The DCF input service selected by MARKET_DATA_SOURCE
+"""
+
+from typing import TYPE_CHECKING, Optional, Union
+
+from app.config import settings
+from app.services.data.mock_data import MockDataService
+
+if TYPE_CHECKING:
+    from app.services.data.yahoo_finance import YahooFinanceService
+
+_data_service: Optional[Union[MockDataService, "YahooFinanceService"]] = None
+
+
+def get_data_service() -> Union[MockDataService, "YahooFinanceService"]:
+    """Process-wide DCF input service built from settings on first use
+
+    "yahoo" fetches from Yahoo Finance. "mock" and the offline "stub" source
+    (which only serves price history) use mock inputs.
+    """
+    global _data_service
+    if _data_service is None:
+        if settings.MARKET_DATA_SOURCE == "yahoo":
+            # yfinance is a heavy import; only load it when it is used
+            from app.services.data.yahoo_finance import YahooFinanceService
+            _data_service = YahooFinanceService()
+        else:
+            _data_service = MockDataService()
+    return _data_service
@@ -2,20 +2,32 @@
 Yahoo Finance Data Service with Rate Limiting
 """
 
+import asyncio
 import yfinance as yf
 from typing import Dict, Optional, List
 from datetime import datetime, timedelta
 import pandas as pd
 import time
-from functools import lru_cache
+
+from app.config import settings
+from app.services.data.async_fetcher import TokenBucket
+from app.services.data.cache import MarketDataCache, PartialResult, get_market_data_cache
 
 class YahooFinanceService:
-    """Service to fetch financial data from Yahoo Finance with rate limiting"""
+    """Service to fetch financial data from Yahoo Finance with rate limiting
+
+    Single lookups wait ``min_request_interval`` between requests; bulk
+    lookups fetch concurrently, each request paying one token from
+    ``limiter`` (MARKET_DATA_REQUESTS_PER_SECOND by default).
+    """
     
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, cache: Optional[MarketDataCache] = None, limiter: Optional[TokenBucket] = None,
+                 max_concurrency: Optional[int] = None):
+        self.cache = cache or get_market_data_cache()
         self.last_request_time = 0
         self.min_request_interval = 2  # 2 seconds between requests
+        self.limiter = limiter or TokenBucket(settings.MARKET_DATA_REQUESTS_PER_SECOND, settings.MARKET_DATA_BURST)
+        self.max_concurrency = max_concurrency or settings.MARKET_DATA_MAX_CONCURRENCY
         
     def _rate_limit(self):
         """Ensure minimum time between requests"""
@@ -26,9 +38,13 @@ class YahooFinanceService:
             time.sleep(sleep_time)
         self.last_request_time = time.time()
     
-    @lru_cache(maxsize=100)
     def get_company_info(self, ticker: str) -> Dict:
         """Get basic company information"""
+        ticker = ticker.upper()
+        return self.cache.get_or_fetch("company_info", ticker, lambda: self._fetch_company_info(ticker))
+    
+    def _fetch_company_info(self, ticker: str) -> Dict:
+        """Fetch company information from Yahoo Finance"""
         try:
             self._rate_limit()
             stock = yf.Ticker(ticker)
@@ -63,84 +79,118 @@ class YahooFinanceService:
     
     def get_dcf_inputs(self, ticker: str) -> Dict:
         """Extract key inputs needed for DCF model"""
+        ticker = ticker.upper()
         try:
-            self._rate_limit()
-            stock = yf.Ticker(ticker)
-            
-            # Get financial statements with error handling
-            try:
-                income_stmt = stock.income_stmt
-                balance_sheet = stock.balance_sheet
-                cash_flow = stock.cashflow
-            except:
-                # Use default values if financials not available
-                return self._get_default_dcf_inputs(ticker)
-            
-            # Get current price from history
-            hist = stock.history(period="5d")
-            current_price = float(hist['Close'].iloc[-1]) if not hist.empty else 100.0
-            
-            # Extract latest year data
-            latest_income = income_stmt.iloc[:, 0] if not income_stmt.empty else pd.Series()
-            latest_balance = balance_sheet.iloc[:, 0] if not balance_sheet.empty else pd.Series()
-            latest_cashflow = cash_flow.iloc[:, 0] if not cash_flow.empty else pd.Series()
-            
-            # Calculate key metrics
-            revenue = latest_income.get('Total Revenue', 1e9)
-            ebitda = latest_income.get('EBITDA', revenue * 0.25)
-            net_income = latest_income.get('Net Income', revenue * 0.15)
-            
-            # Get historical revenue for growth calculation
-            if not income_stmt.empty and len(income_stmt.columns) >= 2:
-                prev_revenue = income_stmt.iloc[:, 1].get('Total Revenue', revenue * 0.9)
-                revenue_growth = (revenue - prev_revenue) / prev_revenue if prev_revenue > 0 else 0.05
-            else:
-                revenue_growth = 0.05  # Default 5%
-            
-            # Calculate margins
-            ebitda_margin = ebitda / revenue if revenue > 0 else 0.25
-            net_margin = net_income / revenue if revenue > 0 else 0.15
-            
-            # Get balance sheet items
-            total_debt = latest_balance.get('Total Debt', 0)
-            cash = latest_balance.get('Cash And Cash Equivalents', 0)
-            net_debt = total_debt - cash
-            
-            # Get shares outstanding
-            try:
-                info = stock.info
-                shares_outstanding = info.get('sharesOutstanding', 1e9)
-            except:
-                shares_outstanding = 1e9
-            
-            # Get CapEx and D&A
-            capex = abs(latest_cashflow.get('Capital Expenditure', revenue * 0.05))
-            da = latest_income.get('Reconciled Depreciation', revenue * 0.03)
-            
-            capex_percent = capex / revenue if revenue > 0 else 0.05
-            da_percent = da / revenue if revenue > 0 else 0.03
-            
-            return {
-                "ticker": ticker.upper(),
-                "base_revenue": float(revenue),
-                "revenue_growth": float(revenue_growth),
-                "ebitda_margin": float(ebitda_margin),
-                "net_margin": float(net_margin),
-                "capex_percent": float(capex_percent),
-                "da_percent": float(da_percent),
-                "nwc_percent": 0.02,
-                "tax_rate": 0.21,
-                "wacc": 0.08,
-                "terminal_growth_rate": 0.025,
-                "projection_years": 10,
-                "net_debt": float(net_debt),
-                "shares_outstanding": float(shares_outstanding),
-                "current_price": float(current_price),
-            }
+            return self.cache.get_or_fetch("dcf_inputs", ticker, lambda: self._fetch_dcf_inputs(ticker))
         except Exception as e:
+            # Defaults are not cached, so the next request retries the fetch
             print(f"Error in get_dcf_inputs: {str(e)}")
             return self._get_default_dcf_inputs(ticker)
     
+    def get_bulk_dcf_inputs(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Blocking ``get_bulk_dcf_inputs_async``, for threads and workers without an event loop"""
+        return asyncio.run(self.get_bulk_dcf_inputs_async(tickers))
+    
+    async def get_bulk_dcf_inputs_async(self, tickers: List[str]) -> Dict[str, Dict]:
+        """DCF inputs for many tickers, fetched concurrently without blocking the loop
+
+        Cached tickers cost no token; at most ``max_concurrency`` fetches are
+        in flight. Tickers that fail get the (uncached) defaults.
+        """
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def fetch(ticker: str) -> Dict:
+            async with semaphore:
+                await self.limiter.acquire()
+                return await asyncio.to_thread(self._download_dcf_inputs, ticker)
+        
+        async def lookup(ticker: str) -> Dict:
+            try:
+                return await self.cache.get_or_fetch_async("dcf_inputs", ticker, lambda: fetch(ticker))
+            except Exception as e:
+                print(f"Error in get_bulk_dcf_inputs for {ticker}: {str(e)}")
+                return self._get_default_dcf_inputs(ticker)
+        
+        inputs = await asyncio.gather(*(lookup(ticker) for ticker in tickers))
+        return dict(zip(tickers, inputs))
+    
+    def _fetch_dcf_inputs(self, ticker: str) -> Dict:
+        """Fetch financial statements and derive DCF inputs"""
+        self._rate_limit()
+        return self._download_dcf_inputs(ticker)
+    
+    def _download_dcf_inputs(self, ticker: str) -> Dict:
+        """DCF inputs from Yahoo's statements; callers pace the requests"""
+        stock = yf.Ticker(ticker)
+        
+        # Financial statements are required; callers fall back to defaults
+        income_stmt = stock.income_stmt
+        balance_sheet = stock.balance_sheet
+        cash_flow = stock.cashflow
+        
+        # Get current price from history
+        hist = stock.history(period="5d")
+        current_price = float(hist['Close'].iloc[-1]) if not hist.empty else 100.0
+        
+        # Extract latest year data
+        latest_income = income_stmt.iloc[:, 0] if not income_stmt.empty else pd.Series()
+        latest_balance = balance_sheet.iloc[:, 0] if not balance_sheet.empty else pd.Series()
+        latest_cashflow = cash_flow.iloc[:, 0] if not cash_flow.empty else pd.Series()
+        
+        # Calculate key metrics
+        revenue = latest_income.get('Total Revenue', 1e9)
+        ebitda = latest_income.get('EBITDA', revenue * 0.25)
+        net_income = latest_income.get('Net Income', revenue * 0.15)
+        
+        # Get historical revenue for growth calculation
+        if not income_stmt.empty and len(income_stmt.columns) >= 2:
+            prev_revenue = income_stmt.iloc[:, 1].get('Total Revenue', revenue * 0.9)
+            revenue_growth = (revenue - prev_revenue) / prev_revenue if prev_revenue > 0 else 0.05
+        else:
+            revenue_growth = 0.05  # Default 5%
+        
+        # Calculate margins
+        ebitda_margin = ebitda / revenue if revenue > 0 else 0.25
+        net_margin = net_income / revenue if revenue > 0 else 0.15
+        
+        # Get balance sheet items
+        total_debt = latest_balance.get('Total Debt', 0)
+        cash = latest_balance.get('Cash And Cash Equivalents', 0)
+        net_debt = total_debt - cash
+        
+        # Get shares outstanding
+        try:
+            info = stock.info
+            shares_outstanding = info.get('sharesOutstanding', 1e9)
+        except:
+            shares_outstanding = 1e9
+        
+        # Get CapEx and D&A
+        capex = abs(latest_cashflow.get('Capital Expenditure', revenue * 0.05))
+        da = latest_income.get('Reconciled Depreciation', revenue * 0.03)
+        
+        capex_percent = capex / revenue if revenue > 0 else 0.05
+        da_percent = da / revenue if revenue > 0 else 0.03
+        
+        return {
+            "ticker": ticker.upper(),
+            "base_revenue": float(revenue),
+            "revenue_growth": float(revenue_growth),
+            "ebitda_margin": float(ebitda_margin),
+            "net_margin": float(net_margin),
+            "capex_percent": float(capex_percent),
+            "da_percent": float(da_percent),
+            "nwc_percent": 0.02,
+            "tax_rate": 0.21,
+            "wacc": 0.08,
+            "terminal_growth_rate": 0.025,
+            "projection_years": 10,
+            "net_debt": float(net_debt),
+            "shares_outstanding": float(shares_outstanding),
+            "current_price": float(current_price),
+        }
+    
     def _get_default_dcf_inputs(self, ticker: str) -> Dict:
         """Return default DCF inputs when data is unavailable"""
         return {
@@ -163,6 +213,10 @@ class YahooFinanceService:
     
     def get_market_data(self) -> Dict:
         """Get major market indices data"""
+        return self.cache.get_or_fetch("market_data", "indices", self._fetch_market_data)
+    
+    def _fetch_market_data(self) -> Dict:
+        """Fetch major market indices from Yahoo Finance"""
         indices = {
             "^GSPC": "S&P 500",
             "^IXIC": "NASDAQ",
@@ -170,6 +224,7 @@ class YahooFinanceService:
         }
         
         market_data = {}
+        errors = {}
         
         for symbol, name in indices.items():
             try:
@@ -193,8 +248,11 @@ class YahooFinanceService:
                     }
             except Exception as e:
                 print(f"Error fetching {name}: {e}")
-                continue
+                errors[name] = str(e)
         
+        if errors:
+            # Served to this caller, but not cached
+            raise PartialResult(market_data, errors)
         return market_data
     
     def get_market_movers(self, limit: int = 5) -> Dict:
@@ -0,0 +1,136 @@
+"""
+Export Jobs
+Build and write exports as background jobs; the files stay downloadable until the job expires
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.schemas.analysis import DCFInputs
+from app.schemas.lbo import LBOInputs
+from app.services.data.sources import get_data_service
+from app.services.export.model_sheets import (
+    dcf_sheets, lbo_sheets, scenario_sheets, screen_sheets, sensitivity_sheets
+)
+from app.services.export.workbook import EXPORT_FORMATS, Sheet, export_filename, write_export
+from app.services.modeling.dcf import DCFModel
+from app.services.modeling.lbo import LBOModel
+from app.services.modeling.scenarios import ScenarioAnalysis
+from app.services.modeling.screening import UniverseScreen
+from app.services.modeling.sensitivity import SensitivityAnalysis
+
+
+def _dcf_inputs(params: Dict) -> DCFInputs:
+    if params.get('base_inputs'):
+        return DCFInputs(**params['base_inputs'])
+    return DCFInputs(**get_data_service().get_dcf_inputs(params['ticker']))
+
+
+def _dcf(params: Dict) -> List[Sheet]:
+    inputs = _dcf_inputs(params)
+    model = DCFModel(inputs)
+    outputs = model.run()
+    return dcf_sheets(inputs, outputs, model.calculate_terminal_value())
+
+
+def _lbo(params: Dict) -> List[Sheet]:
+    return lbo_sheets(LBOModel(LBOInputs(**params['inputs'])).run())
+
+
+def _scenarios(params: Dict) -> List[Sheet]:
+    return scenario_sheets(ScenarioAnalysis(_dcf_inputs(params)).generate_scenarios())
+
+
+def _sensitivity(params: Dict) -> List[Sheet]:
+    x_axis, y_axis = params['x_axis'], params['y_axis']
+    x_values = np.asarray(x_axis['values'], dtype=np.float64)
+    y_values = np.asarray(y_axis['values'], dtype=np.float64)
+    grid = SensitivityAnalysis(_dcf_inputs(params)).grid(
+        x_axis['name'], x_values, y_axis['name'], y_values, output=params['output']
+    )
+    return sensitivity_sheets(x_axis['name'], x_values, y_axis['name'], y_values, grid, params['output'])
+
+
+def _screen(params: Dict) -> List[Sheet]:
+    screen = UniverseScreen(
+        get_data_service().get_bulk_dcf_inputs(params['tickers']),
+        params.get('overrides') or {},
+        params.get('lbo')
+    )
+    order = screen.ranking()
+    if params.get('limit') is not None:
+        order = order[:max(params['limit'], 0)]
+    return screen_sheets(screen, order, params['include_projections'])
+
+
+# Export kind -> sheet builder; builders fetch data and run the models
+EXPORT_BUILDERS = {
+    'dcf': _dcf,
+    'lbo': _lbo,
+    'scenarios': _scenarios,
+    'sensitivity': _sensitivity,
+    'screen': _screen,
+}
+
+
+def export_directory() -> str:
+    """Directory holding finished exports (EXPORT_DIR, or a fixed temporary one)"""
+    directory = settings.EXPORT_DIR or os.path.join(tempfile.gettempdir(), "alphaforge-exports")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def purge_expired_exports(directory: str, ttl: float):
+    """Delete export directories older than ``ttl`` seconds (their jobs have expired)"""
+    cutoff = time.time() - ttl
+    for entry in os.scandir(directory):
+        try:
+            expired = entry.is_dir() and entry.stat().st_mtime < cutoff
+        except OSError:
+            continue
+        if expired:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def export_task(params: Dict, job) -> Dict:
+    """Build an export's sheets and stream them to a file (job kind "export")
+
+    The file lives in a directory named after the job, so the download keeps
+    its name without collisions and is deleted once the job expires.
+    Progress messages carry the running row count.
+    """
+    kind, fmt = params['export'], params['format']
+    if kind not in EXPORT_BUILDERS:
+        raise ValueError(f"Unknown export {kind}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    directory = export_directory()
+    purge_expired_exports(directory, settings.JOB_RESULT_TTL)
+
+    job.progress(0.0, "building sheets")
+    sheets = EXPORT_BUILDERS[kind](params)
+    filename = export_filename(params['stem'], fmt, len(sheets))
+    job_directory = os.path.join(directory, job.job_id)
+    os.makedirs(job_directory, exist_ok=True)
+    path = os.path.join(job_directory, filename)
+    try:
+        rows = write_export(path, fmt, sheets, progress=lambda rows: job.progress(0.0, f"{rows} rows written"))
+    except BaseException:
+        shutil.rmtree(job_directory, ignore_errors=True)
+        raise
+    return {"export": kind, "format": fmt, "filename": filename, "rows": rows}
+
+
+def export_path(job_id: str, result: Optional[Dict]) -> Optional[str]:
+    """Path of a finished export's file, or None once it was purged"""
+    if not result:
+        return None
+    path = os.path.join(export_directory(), job_id, result['filename'])
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,105 @@
+"""
+Model Export Sheets
+Lay out DCF, LBO, scenario, sensitivity and screen results as export sheets
+"""
+
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+
+from app.schemas.analysis import DCFInputs, DCFOutputs, ScenarioResult
+from app.schemas.lbo import LBOOutputs
+from app.schemas.projections import ProjectionTable
+from app.services.export.workbook import Sheet
+from app.services.modeling.screening import UniverseScreen
+
+# Tickers converted from arrays to Python rows at a time in screen projections
+SCREEN_ROW_CHUNK = 500
+
+
+def dcf_sheets(inputs: DCFInputs, outputs: DCFOutputs, terminal_value: float) -> List[Sheet]:
+    """Summary (valuation and assumptions) and per-year projections"""
+    summary = [
+        ("Enterprise Value", outputs.enterprise_value),
+        ("Equity Value", outputs.equity_value),
+        ("Value per Share", outputs.value_per_share),
+        ("PV of FCF", outputs.pv_fcf),
+        ("Terminal Value", terminal_value),
+        ("PV of Terminal Value", outputs.pv_terminal),
+    ]
+    summary += [(name, value) for name, value in inputs.dict().items()]
+    return [
+        Sheet("Summary", ["Item", "Value"], summary),
+        _table_sheet("Projections", outputs.projections),
+    ]
+
+
+def lbo_sheets(outputs: LBOOutputs) -> List[Sheet]:
+    """Returns, sources and uses, operating projections and the debt schedule"""
+    sources_and_uses = [
+        (side.title(), item.replace("_", " ").title(), value)
+        for side, items in outputs.sources_and_uses.items()
+        for item, value in items.items()
+    ]
+    return [
+        Sheet("Returns", ["Metric", "Value"], list(outputs.returns.dict().items())),
+        Sheet("Sources and Uses", ["Side", "Item", "Amount"], sources_and_uses),
+        _table_sheet("Projections", outputs.projections),
+        _table_sheet("Debt Schedule", outputs.debt_schedule),
+    ]
+
+
+def scenario_sheets(scenarios: Dict[str, ScenarioResult]) -> List[Sheet]:
+    """One row per scenario with its valuation and assumptions"""
+    assumptions = list(dict.fromkeys(name for result in scenarios.values() for name in result.assumptions))
+    rows = [
+        [result.scenario, result.value_per_share, result.upside, result.enterprise_value,
+         result.equity_value, *[result.assumptions.get(name) for name in assumptions]]
+        for result in scenarios.values()
+    ]
+    columns = ["Scenario", "Value per Share", "Upside %", "Enterprise Value", "Equity Value", *assumptions]
+    return [Sheet("Scenarios", columns, rows)]
+
+
+def sensitivity_sheets(x_axis: str, x_values: np.ndarray, y_axis: str, y_values: np.ndarray,
+                       grid: np.ndarray, output: str) -> List[Sheet]:
+    """The grid as laid out in a spreadsheet: x values down, y values across"""
+    columns = [f"{output}: {x_axis} \\ {y_axis}", *y_values.tolist()]
+    rows = ([x, *values] for x, values in zip(x_values.tolist(), grid.tolist()))
+    return [Sheet("Sensitivity", columns, rows)]
+
+
+def screen_sheets(screen: UniverseScreen, order: np.ndarray, include_projections: bool = True) -> List[Sheet]:
+    """Ranked screen results and, optionally, every ticker's projections
+
+    Both sheets are generators over the screen's arrays, so a large
+    universe is converted to Python rows only as the writer consumes them.
+    """
+    if screen.results is None:
+        screen.run()
+
+    columns = ["rank", "ticker", *screen.results]
+    rows = ([record[name] for name in columns] for record in screen.records(order, start_rank=1))
+    sheets = [Sheet("Screen", columns, rows)]
+
+    if include_projections:
+        lines = [name for name in screen.dcf.projections if name != 'Year']
+        sheets.append(Sheet("Projections", ["ticker", "Year", *lines], _screen_projection_rows(screen, order, lines)))
+    return sheets
+
+
+def _screen_projection_rows(screen: UniverseScreen, order: np.ndarray, lines: Sequence[str]) -> Iterator[list]:
+    """Long-format projections (one row per ticker and year) in ``order``"""
+    projections = screen.dcf.projections
+    for start in range(0, len(order), SCREEN_ROW_CHUNK):
+        indices = order[start:start + SCREEN_ROW_CHUNK]
+        chunk = {name: projections[name][indices].tolist() for name in lines}
+        horizons = screen.dcf.projection_years[indices].tolist()
+        for offset, index in enumerate(indices.tolist()):
+            ticker = screen.tickers[index]
+            for year in range(horizons[offset]):
+                yield [ticker, year + 1, *[chunk[name][offset][year] for name in lines]]
+
+
+def _table_sheet(name: str, table: ProjectionTable) -> Sheet:
+    return Sheet(name, [table.index, *table.columns], table.rows())
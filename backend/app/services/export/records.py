@@ -0,0 +1,126 @@
+"""
+Record Stream Encoders
+Encode batches of flat records as NDJSON, CSV or Parquet bytes as they arrive
+"""
+
+import csv
+import importlib.util
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Sequence, Tuple
+
+# Parquet export is optional; pyarrow is only imported once a Parquet export runs
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+RECORD_FORMATS = ("ndjson", "csv", "parquet")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# (name, python type) per output column; dict/list values are written as JSON text
+Columns = Sequence[Tuple[str, type]]
+
+
+def format_available(fmt: str) -> bool:
+    return fmt in RECORD_FORMATS and (fmt != "parquet" or PARQUET_AVAILABLE)
+
+
+async def encode_records(batches: AsyncIterator[List[Dict]], columns: Columns, fmt: str) -> AsyncIterator[bytes]:
+    """Bytes of ``fmt`` for each batch of records, never holding more than one batch
+
+    Parquet writes one row group per batch and flushes it straight away; its
+    footer follows the last batch.
+    """
+    if fmt == "ndjson":
+        async for batch in batches:
+            yield "".join(json.dumps(record, default=_json_default) + "\n" for record in batch).encode()
+    elif fmt == "csv":
+        names = [name for name, _ in columns]
+        yield _csv_lines([names])
+        async for batch in batches:
+            yield _csv_lines([[_csv_value(record.get(name)) for name in names] for record in batch])
+    elif fmt == "parquet":
+        async for chunk in _parquet_chunks(batches, columns):
+            yield chunk
+    else:
+        raise ValueError(f"Unsupported export format {fmt}")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _csv_lines(rows: List[list]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+async def _parquet_chunks(batches: AsyncIterator[List[Dict]], columns: Columns) -> AsyncIterator[bytes]:
+    if not PARQUET_AVAILABLE:
+        raise ValueError("Parquet export requires pyarrow")
+    import pyarrow
+    import pyarrow.parquet
+
+    types = {int: pyarrow.int64(), float: pyarrow.float64(), str: pyarrow.string(),
+             bool: pyarrow.bool_(), datetime: pyarrow.timestamp("us")}
+    schema = pyarrow.schema([(name, types.get(kind, pyarrow.string())) for name, kind in columns])
+    as_text = [name for name, kind in columns if kind not in types]
+
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(pyarrow.PythonFile(sink, mode="w"), schema)
+    async for batch in batches:
+        data = {name: [record.get(name) for record in batch] for name, _ in columns}
+        for name in as_text:
+            data[name] = [None if value is None else json.dumps(value) for value in data[name]]
+        writer.write_table(pyarrow.Table.from_pydict(data, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+class _ChunkSink:
+    """Write-only file that hands out what was written since the last drain
+
+    The writer still sees absolute positions, which Parquet records in its footer.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def drain(self) -> bytes:
+        chunk = b"".join(self.chunks)
+        self.chunks = []
+        return chunk
@@ -0,0 +1,110 @@
+"""
+Workbook Writers
+Stream tabular sheets to XLSX or CSV files one row at a time
+"""
+
+import csv
+import io
+import math
+import zipfile
+from typing import Callable, Iterable, List, Optional, Sequence
+
+
+EXPORT_FORMATS = ("xlsx", "csv")
+
+# Excel limits
+MAX_SHEET_ROWS = 1_048_576
+MAX_SHEET_NAME = 31
+
+PROGRESS_EVERY = 1000
+
+
+class Sheet:
+    """One table of an export: a header row and a (lazy) iterable of rows"""
+
+    def __init__(self, name: str, columns: Sequence[str], rows: Iterable[Sequence]):
+        self.name = name
+        self.columns = list(columns)
+        self.rows = rows
+
+
+def export_filename(stem: str, fmt: str, sheets: int) -> str:
+    """File name for an export; multi-sheet CSV exports are zip archives"""
+    if fmt == "csv" and sheets > 1:
+        return f"{stem}.zip"
+    return f"{stem}.{fmt}"
+
+
+def write_export(path: str, fmt: str, sheets: Sequence[Sheet],
+                 progress: Optional[Callable[[int], None]] = None) -> int:
+    """Write ``sheets`` to ``path`` and return the number of data rows written
+
+    Rows are consumed from each sheet's iterable as they are written, so a
+    sheet backed by a generator is never materialized. XLSX uses
+    xlsxwriter's constant-memory mode, which flushes every finished row to
+    a temporary file. ``progress`` is called with the running row count.
+    """
+    if fmt == "xlsx":
+        return _write_xlsx(path, sheets, progress)
+    if fmt == "csv":
+        return _write_csv(path, sheets, progress)
+    raise ValueError(f"Unsupported export format {fmt}")
+
+
+def _write_xlsx(path: str, sheets: Sequence[Sheet], progress) -> int:
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "nan_inf_to_errors": True})
+    header = workbook.add_format({"bold": True})
+    written = 0
+    try:
+        for sheet in sheets:
+            worksheet = workbook.add_worksheet(sheet.name[:MAX_SHEET_NAME])
+            worksheet.write_row(0, 0, sheet.columns, header)
+            worksheet.freeze_panes(1, 0)
+
+            row_number = 1
+            for row in sheet.rows:
+                if row_number >= MAX_SHEET_ROWS:
+                    raise ValueError(f"Sheet {sheet.name} exceeds {MAX_SHEET_ROWS} rows")
+                worksheet.write_row(row_number, 0, row)
+                row_number += 1
+                written += 1
+                if progress is not None and written % PROGRESS_EVERY == 0:
+                    progress(written)
+    finally:
+        workbook.close()
+    return written
+
+
+def _write_csv(path: str, sheets: Sequence[Sheet], progress) -> int:
+    if len(sheets) == 1:
+        with open(path, "w", newline="") as handle:
+            return _write_csv_sheet(handle, sheets[0], 0, progress)
+
+    written = 0
+    # Numeric CSV compresses well even at level 1, which is far cheaper than the default
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for sheet in sheets:
+            with archive.open(f"{sheet.name}.csv", "w") as member:
+                handle = io.TextIOWrapper(member, newline="")
+                written = _write_csv_sheet(handle, sheet, written, progress)
+                handle.flush()
+                handle.detach()
+    return written
+
+
+def _write_csv_sheet(handle, sheet: Sheet, written: int, progress) -> int:
+    writer = csv.writer(handle)
+    writer.writerow(sheet.columns)
+    for row in sheet.rows:
+        writer.writerow(_csv_row(row))
+        written += 1
+        if progress is not None and written % PROGRESS_EVERY == 0:
+            progress(written)
+    return written
+
+
+def _csv_row(row: Sequence) -> List:
+    # Blank cells for NaN/inf, like the #NUM! error cells of the XLSX export
+    return ["" if isinstance(value, float) and not math.isfinite(value) else value for value in row]
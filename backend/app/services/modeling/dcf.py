@@ -2,112 +2,327 @@
 DCF (Discounted Cash Flow) Valuation Model
 """
 
-import pandas as pd
 import numpy as np
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Sequence
+
+from app.schemas.analysis import DCFOutputs
+from app.schemas.projections import ProjectionTable
+
+# Bump whenever the valuation math changes; memoized results of older versions are dropped
+MODEL_VERSION = "4"
+
+# Columns the batch engine reads from each input set
+BATCH_INPUT_FIELDS = (
+    'base_revenue', 'revenue_growth', 'ebitda_margin', 'capex_percent',
+    'da_percent', 'nwc_percent', 'tax_rate', 'wacc', 'terminal_growth_rate',
+    'projection_years', 'net_debt', 'shares_outstanding'
+)
+
+# Fallbacks applied when an input set is degenerate
+DEFAULT_WACC = 0.08
+DEFAULT_TERMINAL_SPREAD = 0.055
+DEFAULT_SHARES_OUTSTANDING = 1e9
+
+# Longest projection horizon; every row of a batch is sized to the longest one
+MAX_PROJECTION_YEARS = 50
+
+# Largest two-way grid a request may value (sensitivity surfaces, LBO returns grids)
+MAX_GRID_CELLS = 250_000
+
+# Per-year lines of a projection, after the year itself
+PROJECTION_LINES = ('Revenue', 'EBITDA', 'EBIT', 'Tax', 'NOPAT', 'Capex', 'NWC_Change', 'FCF')
+
+
+def valuation_key(inputs) -> Dict:
+    """The inputs a valuation reads, for cache keys; ticker and current price do not change it"""
+    return {field: getattr(inputs, field) for field in BATCH_INPUT_FIELDS}
+
+
+def validate_projection_years(years: int):
+    """Raise ValueError for a horizon the models will not project"""
+    if not 1 <= years <= MAX_PROJECTION_YEARS:
+        raise ValueError(f"Projection years must be between 1 and {MAX_PROJECTION_YEARS}")
+
+
+# ============ FORMULAS ============
+# Every line of the model is written once, here, and shared by DCFModel,
+# BatchDCFModel, the sensitivity grid and the incremental graph. Each helper
+# takes scalars or broadcastable arrays.
+
+def _positive_or(value, default):
+    """``value``, with ``default`` wherever it is not positive (scalars stay Python floats)"""
+    if isinstance(value, (int, float)):
+        return default if value <= 0 else value
+    return np.where(value <= 0, default, value)
+
+
+def discount_rate(wacc):
+    """Rate the FCF stream is discounted at; non-positive WACCs use DEFAULT_WACC"""
+    return _positive_or(wacc, DEFAULT_WACC)
+
+
+def discount_factors(rate, years):
+    # One ufunc on the shared years vector for a scalar rate (no negated copy of it)
+    return np.power(1 / (1 + rate), years)
+
+
+def project_revenue(base_revenue, revenue_growth, years):
+    return base_revenue * np.power(1 + revenue_growth, years)
+
+
+def ebitda_line(revenue, ebitda_margin):
+    return revenue * ebitda_margin
+
+
+def da_line(revenue, da_percent):
+    return revenue * da_percent
+
+
+def ebit_line(ebitda, da):
+    return ebitda - da
+
+
+def tax_line(ebit, tax_rate):
+    return ebit * tax_rate
+
+
+def nopat_line(ebit, tax):
+    return ebit - tax
+
+
+def capex_line(revenue, capex_percent):
+    return revenue * capex_percent
+
+
+def nwc_change_line(revenue, nwc_percent):
+    return revenue * nwc_percent
+
+
+def fcf_line(nopat, da, capex, nwc_change):
+    return nopat + da - capex - nwc_change
+
+
+def operating_lines(revenue, ebitda_margin, da_percent, tax_rate, capex_percent, nwc_percent) -> Dict:
+    """Every projection line derived from revenue, keyed as in PROJECTION_LINES"""
+    ebitda = ebitda_line(revenue, ebitda_margin)
+    da = da_line(revenue, da_percent)
+    ebit = ebit_line(ebitda, da)
+    tax = tax_line(ebit, tax_rate)
+    nopat = nopat_line(ebit, tax)
+    capex = capex_line(revenue, capex_percent)
+    nwc_change = nwc_change_line(revenue, nwc_percent)
+    return {
+        'Revenue': revenue,
+        'EBITDA': ebitda,
+        'EBIT': ebit,
+        'Tax': tax,
+        'NOPAT': nopat,
+        'Capex': capex,
+        'NWC_Change': nwc_change,
+        'FCF': fcf_line(nopat, da, capex, nwc_change),
+    }
+
+
+def terminal_value(final_fcf, wacc, terminal_growth_rate):
+    """Gordon growth value of the final FCF; spreads at or below zero use DEFAULT_TERMINAL_SPREAD"""
+    spread = _positive_or(wacc - terminal_growth_rate, DEFAULT_TERMINAL_SPREAD)
+    return final_fcf * (1 + terminal_growth_rate) / spread
+
+
+def per_share(equity_value, shares_outstanding):
+    """Equity value per share; non-positive share counts use DEFAULT_SHARES_OUTSTANDING"""
+    return equity_value / _positive_or(shares_outstanding, DEFAULT_SHARES_OUTSTANDING)
+
+
+class BatchDCFModel:
+    """Vectorized DCF over N input sets held as column arrays
+
+    Every input is a length-N array (scalars are broadcast), and every
+    projection line is an (N x years) array, so a whole universe of tickers
+    or assumption variants is valued in a handful of NumPy operations.
+    Input sets with a shorter projection horizon than the longest one are
+    masked out beyond their final year; horizons outside 1 to
+    MAX_PROJECTION_YEARS are treated as empty and valued as NaN.
+    """
+
+    def __init__(self, **columns):
+        missing = [field for field in BATCH_INPUT_FIELDS if field not in columns]
+        if missing:
+            raise ValueError(f"Missing batch DCF inputs: {', '.join(missing)}")
+
+        arrays = np.broadcast_arrays(
+            *[np.asarray(columns[field], dtype=np.float64) for field in BATCH_INPUT_FIELDS]
+        )
+        self.inputs = {
+            field: np.atleast_1d(array) for field, array in zip(BATCH_INPUT_FIELDS, arrays)
+        }
+        self.size = self.inputs['base_revenue'].shape[0]
+        years = self.inputs['projection_years']
+        valid = (years >= 1) & (years <= MAX_PROJECTION_YEARS)
+        self.projection_years = np.where(valid, years, 0).astype(np.int64)
+        self.projections = None
+        self.valuation = None
+
+    @classmethod
+    def from_inputs(cls, inputs: Sequence) -> 'BatchDCFModel':
+        """Build a batch from a sequence of DCFInputs (or dicts with the same keys)"""
+        rows = [row if isinstance(row, dict) else row.dict() for row in inputs]
+        return cls(**{field: [row[field] for row in rows] for field in BATCH_INPUT_FIELDS})
+
+    def project_financials(self) -> Dict[str, np.ndarray]:
+        """Project financial statements for every input set at once"""
+        inputs = self.inputs
+        horizon = max(int(self.projection_years.max()), 1) if self.size else 0
+        years = np.arange(1, horizon + 1, dtype=np.float64)
+        active = years[None, :] <= self.projection_years[:, None]
+
+        revenue = project_revenue(
+            inputs['base_revenue'][:, None], inputs['revenue_growth'][:, None], years[None, :]
+        ) * active
+        lines = operating_lines(
+            revenue,
+            *[inputs[field][:, None] for field in
+              ('ebitda_margin', 'da_percent', 'tax_rate', 'capex_percent', 'nwc_percent')]
+        )
+
+        self.projections = {'Year': years, **lines}
+        return self.projections
+
+    def calculate_enterprise_value(self) -> Dict[str, np.ndarray]:
+        """Discount every projected FCF stream and capitalize its terminal value"""
+        if self.projections is None:
+            self.project_financials()
+
+        inputs = self.inputs
+        years = self.projections['Year']
+        fcf = self.projections['FCF']
+        # Empty horizons index year one; run() masks those rows
+        final_year = np.maximum(self.projection_years, 1)
+
+        rate = discount_rate(inputs['wacc'])
+        discount = discount_factors(rate[:, None], years[None, :])
+        pv_fcf = np.einsum('ij,ij->i', fcf, discount)
+
+        final_fcf = fcf[np.arange(self.size), final_year - 1]
+        terminal = terminal_value(final_fcf, inputs['wacc'], inputs['terminal_growth_rate'])
+        pv_terminal = terminal * discount_factors(rate, final_year)
+
+        enterprise_value = pv_fcf + pv_terminal
+        equity_value = enterprise_value - inputs['net_debt']
+
+        self.valuation = {
+            'pv_fcf': pv_fcf,
+            'terminal_value': terminal,
+            'pv_terminal': pv_terminal,
+            'enterprise_value': enterprise_value,
+            'equity_value': equity_value,
+            'value_per_share': per_share(equity_value, inputs['shares_outstanding']),
+        }
+        return self.valuation
+
+    def run(self) -> Dict[str, np.ndarray]:
+        """Run the batch DCF; rows with non-positive base revenue or no horizon come back as NaN"""
+        self.project_financials()
+        valuation = self.calculate_enterprise_value()
+
+        invalid = (self.inputs['base_revenue'] <= 0) | (self.projection_years < 1)
+        if invalid.any():
+            for values in valuation.values():
+                values[invalid] = np.nan
+
+        return valuation
+
+    def projection_table(self, index: int) -> ProjectionTable:
+        """Projections of one input set, in the DCFOutputs layout"""
+        horizon = int(self.projection_years[index])
+        values = np.stack([self.projections[name][index, :horizon] for name in PROJECTION_LINES])
+        return ProjectionTable('Year', PROJECTION_LINES, values)
+
+
+@lru_cache(maxsize=MAX_PROJECTION_YEARS)
+def _years(horizon: int) -> np.ndarray:
+    """1..horizon as floats, shared read-only between single valuations
+
+    Callers validate horizons first (at most MAX_PROJECTION_YEARS or
+    MAX_HOLD_PERIOD years), so the cache holds a few small arrays at most.
+    """
+    years = np.arange(1, horizon + 1, dtype=np.float64)
+    years.flags.writeable = False
+    return years
+
 
 class DCFModel:
-    """Discounted Cash Flow valuation model"""
-    
+    """Discounted Cash Flow valuation model
+
+    A single input set is valued with scalar rates over one short vector per
+    line rather than as a one-row batch; both use the same formulas, so a
+    DCFModel and a BatchDCFModel of the same inputs agree.
+    """
+
     def __init__(self, inputs):
         self.inputs = inputs
         self.projections = None
         self.valuation = None
-    
-    def project_financials(self) -> pd.DataFrame:
-        """Project financial statements"""
-        years = range(1, self.inputs.projection_years + 1)
-        
-        projections = {
-            'Year': years,
-            'Revenue': [],
-            'EBITDA': [],
-            'EBIT': [],
-            'Tax': [],
-            'NOPAT': [],
-            'Capex': [],
-            'NWC_Change': [],
-            'FCF': []
-        }
-        
-        for year in years:
-            revenue = self.inputs.base_revenue * (1 + self.inputs.revenue_growth) ** year
-            ebitda = revenue * self.inputs.ebitda_margin
-            ebit = ebitda - (revenue * self.inputs.da_percent)
-            tax = ebit * self.inputs.tax_rate
-            nopat = ebit - tax
-            capex = revenue * self.inputs.capex_percent
-            nwc_change = revenue * self.inputs.nwc_percent
-            fcf = nopat + (revenue * self.inputs.da_percent) - capex - nwc_change
-            
-            projections['Revenue'].append(revenue)
-            projections['EBITDA'].append(ebitda)
-            projections['EBIT'].append(ebit)
-            projections['Tax'].append(tax)
-            projections['NOPAT'].append(nopat)
-            projections['Capex'].append(capex)
-            projections['NWC_Change'].append(nwc_change)
-            projections['FCF'].append(fcf)
-        
-        self.projections = pd.DataFrame(projections)
+
+    def project_financials(self) -> ProjectionTable:
+        """Project financial statements (``.to_dataframe()`` for a DataFrame)"""
+        inputs = self.inputs
+        revenue = project_revenue(inputs.base_revenue, inputs.revenue_growth, _years(inputs.projection_years))
+        # Every line is linear in revenue: take each line's ratio from one unit of revenue
+        # in plain floats, then scale the revenue vector once rather than line by line
+        ratios = operating_lines(
+            1.0, inputs.ebitda_margin, inputs.da_percent, inputs.tax_rate,
+            inputs.capex_percent, inputs.nwc_percent
+        )
+        self.projections = ProjectionTable('Year', PROJECTION_LINES, np.array(list(ratios.values()))[:, None] * revenue)
         return self.projections
-    
+
     def calculate_terminal_value(self) -> float:
         """Calculate terminal value"""
-        final_fcf = self.projections['FCF'].iloc[-1]
-        terminal_fcf = final_fcf * (1 + self.inputs.terminal_growth_rate)
-        
-        denominator = self.inputs.wacc - self.inputs.terminal_growth_rate
-        if denominator <= 0:
-            print(f"Warning: Invalid WACC, using default")
-            denominator = 0.055
-        
-        terminal_value = terminal_fcf / denominator
-        return terminal_value
-    
+        if self.projections is None:
+            self.project_financials()
+        inputs = self.inputs
+        return float(terminal_value(float(self.projections['FCF'][-1]), inputs.wacc, inputs.terminal_growth_rate))
+
     def calculate_enterprise_value(self) -> Dict:
         """Calculate enterprise value and equity value"""
-        if self.inputs.wacc <= 0:
-            wacc = 0.08
-        else:
-            wacc = self.inputs.wacc
-            
-        discount_factors = [(1 + wacc) ** year for year in self.projections['Year']]
-        pv_fcf = sum(self.projections['FCF'] / discount_factors)
-        
-        terminal_value = self.calculate_terminal_value()
-        pv_terminal = terminal_value / ((1 + wacc) ** self.inputs.projection_years)
-        
+        if self.projections is None:
+            self.project_financials()
+        inputs = self.inputs
+        discount = discount_factors(discount_rate(inputs.wacc), _years(inputs.projection_years))
+
+        pv_fcf = float(self.projections['FCF'] @ discount)
+        terminal = self.calculate_terminal_value()
+        pv_terminal = terminal * float(discount[-1])
         enterprise_value = pv_fcf + pv_terminal
-        equity_value = enterprise_value - self.inputs.net_debt
-        
-        shares_outstanding = self.inputs.shares_outstanding if self.inputs.shares_outstanding > 0 else 1e9
-        value_per_share = equity_value / shares_outstanding
-        
-        return {
-            'pv_fcf': float(pv_fcf),
-            'terminal_value': float(terminal_value),
-            'pv_terminal': float(pv_terminal),
-            'enterprise_value': float(enterprise_value),
-            'equity_value': float(equity_value),
-            'value_per_share': float(value_per_share)
+        equity_value = enterprise_value - inputs.net_debt
+
+        self.valuation = {
+            'pv_fcf': pv_fcf,
+            'terminal_value': terminal,
+            'pv_terminal': pv_terminal,
+            'enterprise_value': enterprise_value,
+            'equity_value': equity_value,
+            'value_per_share': per_share(equity_value, inputs.shares_outstanding),
         }
-    
+        return self.valuation
+
     def run(self):
         """Run complete DCF model"""
-        from app.schemas.analysis import DCFOutputs
-        
         if self.inputs.base_revenue <= 0:
             raise ValueError("Base revenue must be positive")
-        
-        self.project_financials()
+        validate_projection_years(self.inputs.projection_years)
+
+        # Not memoized: the valuation costs less than hashing its inputs would
+        projections = self.project_financials()
         valuation = self.calculate_enterprise_value()
-        
+
         return DCFOutputs(
-            projections=self.projections.to_dict('records'),
+            projections=projections,
             enterprise_value=valuation['enterprise_value'],
             equity_value=valuation['equity_value'],
             value_per_share=valuation['value_per_share'],
             pv_fcf=valuation['pv_fcf'],
             pv_terminal=valuation['pv_terminal']
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,273 @@
+"""
+Incremental Valuation
+DCF and LBO models as small dependency graphs that recompute only what an
+assumption change reaches
+"""
+
+import math
+from typing import Any, Callable, Dict, FrozenSet, NamedTuple, Tuple
+
+import numpy as np
+
+from app.schemas.analysis import DCFInputs, DCFOutputs
+from app.schemas.lbo import LBOInputs, LBOOutputs, LBOReturns
+from app.schemas.projections import ProjectionTable
+from app.services.modeling.dcf import (
+    PROJECTION_LINES, _years, capex_line, da_line, discount_factors, discount_rate, ebit_line, ebitda_line,
+    fcf_line, nopat_line, nwc_change_line, per_share, project_revenue, tax_line, terminal_value,
+    validate_projection_years,
+)
+from app.services.modeling.irr import irr as solve_irr
+from app.services.modeling.lbo import (
+    DEBT_SCHEDULE_FIELDS, PROJECTION_FIELDS, SWEEP_FIELDS, debt_sweep, sources_and_uses, validate_hold_period
+)
+
+
+class Node(NamedTuple):
+    name: str
+    inputs: Tuple[str, ...]  # Model inputs the node reads
+    deps: Tuple[str, ...]  # Upstream nodes
+    compute: Callable[[Dict[str, Any], Dict[str, Any]], Any]  # (inputs, node values) -> value
+
+
+def _plan(nodes: Tuple[Node, ...], changed: FrozenSet[str]) -> Tuple[Node, ...]:
+    """Nodes reached by a change to ``changed`` inputs, in evaluation order"""
+    dirty = set()
+    for node in nodes:
+        if changed.intersection(node.inputs) or dirty.intersection(node.deps):
+            dirty.add(node.name)
+    return tuple(node for node in nodes if node.name in dirty)
+
+
+def _same(old: Any, new: Any) -> bool:
+    if type(new) is float:
+        return old == new or (math.isnan(new) and type(old) is float and math.isnan(old))
+    if isinstance(new, np.ndarray):
+        # Bitwise, so NaNs compare equal; a few bytes per line is cheaper than np.array_equal
+        return isinstance(old, np.ndarray) and old.shape == new.shape and old.tobytes() == new.tobytes()
+    return old == new
+
+
+class DependencyGraph:
+    """Model whose intermediate results are cached per node
+
+    ``nodes`` are listed in dependency order. ``update`` re-evaluates only
+    the nodes downstream of the inputs that actually changed and reports
+    the outputs whose values moved: ``lines`` maps nodes to projection rows
+    and ``scalars`` names the headline numbers.
+    """
+
+    name = ""
+    inputs_model = None
+    nodes: Tuple[Node, ...] = ()
+    lines: Dict[str, str] = {}  # node -> projection row label
+    scalars: Tuple[str, ...] = ()
+    editable: FrozenSet[str] = frozenset()  # Inputs the nodes read, i.e. the ones an update may change
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.editable = frozenset(field for node in cls.nodes for field in node.inputs)
+        cls._plans: Dict[FrozenSet[str], Tuple[Node, ...]] = {}
+
+    def __init__(self, inputs):
+        self.inputs = inputs.model_dump()
+        self.values: Dict[str, Any] = {}
+        self.version = 0
+        self.validate(self.inputs)
+        self._evaluate(self.nodes)
+
+    def validate(self, inputs: Dict[str, Any]):
+        """Raise ValueError for input sets the model cannot value"""
+
+    def update(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply assumption changes; returns the recomputed nodes and the outputs that moved"""
+        unknown = changes.keys() - self.editable
+        if unknown:
+            raise ValueError(f"Unknown inputs: {', '.join(sorted(unknown))}")
+
+        # Validated and coerced like a full input set (e.g. projection_years stays an int)
+        merged = self.inputs_model(**{**self.inputs, **changes}).model_dump()
+        self.validate(merged)
+        changed = frozenset(field for field in changes if merged[field] != self.inputs[field])
+
+        plan = self._plans.get(changed)
+        if plan is None:
+            plan = self._plans[changed] = _plan(self.nodes, changed)
+        previous = {node.name: self.values[node.name] for node in plan}
+        previous_inputs, self.inputs = self.inputs, merged
+        try:
+            self._evaluate(plan)
+        except Exception:
+            # A failed update leaves the graph as it was
+            self.inputs = previous_inputs
+            self.values.update(previous)
+            raise
+        self.version += 1
+
+        def moved(names):
+            return [name for name in names if name in previous and not _same(previous[name], self.values[name])]
+
+        return {
+            "version": self.version,
+            "changed_inputs": sorted(changed),
+            "recomputed": [node.name for node in plan],
+            "values": {name: self.values[name] for name in moved(self.scalars)},
+            "projections": {self.lines[name]: self.values[name] for name in moved(self.lines)},
+        }
+
+    def _evaluate(self, nodes: Tuple[Node, ...]):
+        inputs, values = self.inputs, self.values
+        for node in nodes:
+            values[node.name] = node.compute(inputs, values)
+
+    def projection_table(self, index: str) -> ProjectionTable:
+        return ProjectionTable(index, list(self.lines.values()), np.stack([self.values[name] for name in self.lines]))
+
+    def outputs(self):
+        raise NotImplementedError
+
+
+# ============ DCF ============
+
+def _terminal_value(i, v) -> float:
+    return float(terminal_value(float(v['fcf'][-1]), i['wacc'], i['terminal_growth_rate']))
+
+
+class IncrementalDCF(DependencyGraph):
+    """DCFModel as revenue -> EBITDA -> EBIT -> NOPAT -> FCF -> PV -> EV
+
+    A WACC change re-discounts the cached FCF stream; a tax rate change
+    rebuilds tax, NOPAT and FCF and leaves revenue, EBITDA and EBIT alone.
+    """
+
+    name = "dcf"
+    inputs_model = DCFInputs
+    nodes = (
+        Node('years', ('projection_years',), (), lambda i, v: _years(i['projection_years'])),
+        Node('revenue', ('base_revenue', 'revenue_growth'), ('years',),
+             lambda i, v: project_revenue(i['base_revenue'], i['revenue_growth'], v['years'])),
+        Node('ebitda', ('ebitda_margin',), ('revenue',), lambda i, v: ebitda_line(v['revenue'], i['ebitda_margin'])),
+        Node('da', ('da_percent',), ('revenue',), lambda i, v: da_line(v['revenue'], i['da_percent'])),
+        Node('ebit', (), ('ebitda', 'da'), lambda i, v: ebit_line(v['ebitda'], v['da'])),
+        Node('tax', ('tax_rate',), ('ebit',), lambda i, v: tax_line(v['ebit'], i['tax_rate'])),
+        Node('nopat', (), ('ebit', 'tax'), lambda i, v: nopat_line(v['ebit'], v['tax'])),
+        Node('capex', ('capex_percent',), ('revenue',), lambda i, v: capex_line(v['revenue'], i['capex_percent'])),
+        Node('nwc_change', ('nwc_percent',), ('revenue',),
+             lambda i, v: nwc_change_line(v['revenue'], i['nwc_percent'])),
+        Node('fcf', (), ('nopat', 'da', 'capex', 'nwc_change'),
+             lambda i, v: fcf_line(v['nopat'], v['da'], v['capex'], v['nwc_change'])),
+        Node('discount', ('wacc',), ('years',), lambda i, v: discount_factors(discount_rate(i['wacc']), v['years'])),
+        Node('pv_fcf', (), ('fcf', 'discount'), lambda i, v: float(v['fcf'] @ v['discount'])),
+        Node('terminal_value', ('wacc', 'terminal_growth_rate'), ('fcf',), _terminal_value),
+        Node('pv_terminal', (), ('terminal_value', 'discount'),
+             lambda i, v: v['terminal_value'] * float(v['discount'][-1])),
+        Node('enterprise_value', (), ('pv_fcf', 'pv_terminal'), lambda i, v: v['pv_fcf'] + v['pv_terminal']),
+        Node('equity_value', ('net_debt',), ('enterprise_value',), lambda i, v: v['enterprise_value'] - i['net_debt']),
+        Node('value_per_share', ('shares_outstanding',), ('equity_value',),
+             lambda i, v: per_share(v['equity_value'], i['shares_outstanding'])),
+    )
+    lines = dict(zip(
+        ('revenue', 'ebitda', 'ebit', 'tax', 'nopat', 'capex', 'nwc_change', 'fcf'), PROJECTION_LINES
+    ))
+    scalars = ('pv_fcf', 'terminal_value', 'pv_terminal', 'enterprise_value', 'equity_value', 'value_per_share')
+
+    def validate(self, inputs: Dict[str, Any]):
+        if inputs['base_revenue'] <= 0:
+            raise ValueError("Base revenue must be positive")
+        validate_projection_years(inputs['projection_years'])
+
+    def outputs(self) -> DCFOutputs:
+        v = self.values
+        return DCFOutputs(
+            projections=self.projection_table('Year'),
+            enterprise_value=v['enterprise_value'],
+            equity_value=v['equity_value'],
+            value_per_share=v['value_per_share'],
+            pv_fcf=v['pv_fcf'],
+            pv_terminal=v['pv_terminal']
+        )
+
+
+# ============ LBO ============
+
+def _sweep(i, v) -> Dict[str, np.ndarray]:
+    lines = debt_sweep(
+        v['ebitda'][None, :], v['capex'][None, :], v['nwc_change'][None, :], v['management_fees'][None, :],
+        debt=np.array([i['purchase_price'] * i['debt_percent']]),
+        interest_rate=np.array([i['interest_rate']]),
+        tax_rate=np.array([i['tax_rate']]),
+        hold_period=np.array([i['hold_period']]),
+    )
+    return {name: line[0] for name, line in lines.items()}
+
+
+def _sweep_line(name: str) -> Node:
+    return Node(name, (), ('sweep',), lambda i, v: v['sweep'][name])
+
+
+def _irr(i, v) -> float:
+    cash_flows = [-v['entry_equity']] + [0] * (i['hold_period'] - 1) + [v['exit_equity']]
+    irr = float(solve_irr(cash_flows))
+    if math.isnan(irr):
+        # As LBOModel: no IRR means no valuation, not a NaN in the outputs
+        raise ValueError("IRR is undefined without an equity investment")
+    return irr
+
+
+class IncrementalLBO(DependencyGraph):
+    """LBOModel as operating lines -> cash sweep -> exit equity -> returns
+
+    An exit multiple change revalues the exit without re-running the debt
+    sweep; financing terms re-run the sweep but keep the operating lines.
+    """
+
+    name = "lbo"
+    inputs_model = LBOInputs
+    nodes = (
+        Node('years', ('hold_period',), (), lambda i, v: _years(i['hold_period'])),
+        Node('revenue', ('base_revenue', 'revenue_growth'), ('years',),
+             lambda i, v: i['base_revenue'] * np.power(1 + i['revenue_growth'], v['years'])),
+        Node('ebitda', ('ebitda_margin',), ('revenue',), lambda i, v: v['revenue'] * i['ebitda_margin']),
+        Node('capex', ('capex_percent',), ('revenue',), lambda i, v: v['revenue'] * i['capex_percent']),
+        Node('nwc_change', ('nwc_percent',), ('revenue',), lambda i, v: v['revenue'] * i['nwc_percent']),
+        Node('entry_equity', ('purchase_price', 'debt_percent'), (),
+             lambda i, v: i['purchase_price'] * (1 - i['debt_percent'])),
+        Node('management_fees', ('management_fees',), ('entry_equity', 'years'),
+             lambda i, v: np.full(v['years'].shape, v['entry_equity'] * i['management_fees'])),
+        Node('sweep', ('purchase_price', 'debt_percent', 'interest_rate', 'tax_rate', 'hold_period'),
+             ('ebitda', 'capex', 'nwc_change', 'management_fees'), _sweep),
+        *(_sweep_line(name) for name in SWEEP_FIELDS),
+        Node('equity_value', ('exit_multiple',), ('ebitda', 'debt_balance'),
+             lambda i, v: v['ebitda'] * i['exit_multiple'] - v['debt_balance']),
+        Node('exit_equity', (), ('equity_value',), lambda i, v: float(v['equity_value'][-1])),
+        Node('total_return', (), ('entry_equity', 'exit_equity'), lambda i, v: v['exit_equity'] - v['entry_equity']),
+        Node('moic', (), ('entry_equity', 'exit_equity'),
+             lambda i, v: v['exit_equity'] / v['entry_equity'] if v['entry_equity'] > 0 else 0.0),
+        Node('cash_on_cash', (), ('moic',), lambda i, v: v['moic']),
+        Node('irr', ('hold_period',), ('entry_equity', 'exit_equity'), _irr),
+        Node('sources_and_uses', ('purchase_price', 'debt_percent'), (),
+             lambda i, v: sources_and_uses(i['purchase_price'], i['debt_percent'])),
+    )
+    lines = {name: name for name in PROJECTION_FIELDS}
+    scalars = ('entry_equity', 'exit_equity', 'total_return', 'irr', 'moic', 'cash_on_cash', 'sources_and_uses')
+
+    def validate(self, inputs: Dict[str, Any]):
+        validate_hold_period(inputs['hold_period'])
+        if inputs['purchase_price'] * (1 - inputs['debt_percent']) <= 0:
+            raise ValueError("IRR is undefined without an equity investment")
+
+    def outputs(self) -> LBOOutputs:
+        v = self.values
+        projections = self.projection_table('year')
+        balance, paydown = v['debt_balance'], v['debt_paydown']
+        return LBOOutputs(
+            projections=projections,
+            returns=LBOReturns(**{name: v[name] for name in LBOReturns.model_fields}),
+            sources_and_uses=v['sources_and_uses'],
+            debt_schedule=ProjectionTable(
+                'year', DEBT_SCHEDULE_FIELDS, np.stack([balance + paydown, v['interest'], paydown, balance])
+            )
+        )
+
+
+GRAPHS = {graph.name: graph for graph in (IncrementalDCF, IncrementalLBO)}
@@ -0,0 +1,179 @@
+"""
+IRR / XIRR Solver
+Vectorized Newton-Raphson with a bracketed bisection fallback
+"""
+
+import numpy as np
+from datetime import date, datetime
+from typing import Optional, Sequence, Union
+
+MAX_NEWTON_ITERATIONS = 50
+MAX_BISECTION_ITERATIONS = 200
+TOLERANCE = 1e-10
+
+# Rates scanned for a sign change when Newton does not converge
+BRACKET_RATES = np.array([
+    -0.9999, -0.999, -0.99, -0.95, -0.9, -0.75, -0.5, -0.25, -0.1, 0.0,
+    0.05, 0.1, 0.2, 0.35, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0, 100.0, 1000.0
+])
+
+DAYS_PER_YEAR = 365.0
+
+
+def npv(rate: Union[float, np.ndarray], cash_flows, times=None) -> np.ndarray:
+    """Net present value of each cash-flow row at the matching rate"""
+    flows, times = _as_rows(cash_flows, times)
+    rate = np.broadcast_to(np.asarray(rate, dtype=np.float64), flows.shape[:1])
+    values = (flows * (1 + rate)[:, None] ** -times).sum(axis=1)
+    return values[0] if np.ndim(cash_flows) == 1 else values
+
+
+def irr(cash_flows, times: Optional[Sequence[float]] = None) -> Union[float, np.ndarray]:
+    """Internal rate of return of one cash-flow stream or a 2-D array of rows
+
+    Flows are evenly spaced one period apart unless ``times`` (in periods,
+    broadcastable to the flows) is given. Rows that never receive a positive
+    flow return -1.0 (total loss); rows that never invest return NaN.
+    """
+    flows, times = _as_rows(cash_flows, times)
+    rates = _solve(flows, times)
+    return float(rates[0]) if np.ndim(cash_flows) == 1 else rates
+
+
+def xirr(cash_flows, dates) -> Union[float, np.ndarray]:
+    """IRR of irregularly dated flows, annualized on an Actual/365 basis
+
+    ``dates`` may be datetimes, numpy datetime64 values or year fractions,
+    either one shared sequence or one row per cash-flow row.
+    """
+    return irr(cash_flows, year_fractions(dates))
+
+
+def year_fractions(dates) -> np.ndarray:
+    """Years elapsed since the first date of each row"""
+    values = np.asarray(dates)
+    if values.dtype.kind in 'fiu':
+        return values.astype(np.float64)
+
+    if values.dtype.kind != 'M':
+        values = np.vectorize(_to_datetime64, otypes=['datetime64[D]'])(values)
+    days = values.astype('datetime64[D]').astype(np.float64)
+    return (days - days[..., :1]) / DAYS_PER_YEAR
+
+
+def _to_datetime64(value) -> np.datetime64:
+    if isinstance(value, (date, datetime)):
+        return np.datetime64(value, 'D')
+    return np.datetime64(str(value), 'D')
+
+
+def _as_rows(cash_flows, times):
+    """Coerce flows to a 2-D float array and broadcast times against it"""
+    flows = np.atleast_2d(np.asarray(cash_flows, dtype=np.float64))
+    if times is None:
+        times = np.arange(flows.shape[1], dtype=np.float64)
+    times = np.broadcast_to(np.asarray(times, dtype=np.float64), flows.shape)
+    return flows, times
+
+
+def _npv_and_derivative(rate: np.ndarray, flows: np.ndarray, times: np.ndarray):
+    """NPV, its derivative in the rate, and the gross discounted flows for scaling"""
+    discounted = flows * (1 + rate)[:, None] ** -times
+    value = discounted.sum(axis=1)
+    derivative = -(times * discounted).sum(axis=1) / (1 + rate)
+    return value, derivative, np.abs(discounted).sum(axis=1)
+
+
+def _solve(flows: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Solve every row, falling back to bisection where Newton fails"""
+    rates = np.full(flows.shape[0], np.nan)
+    has_outflow = (flows < 0).any(axis=1)
+    has_inflow = (flows > 0).any(axis=1)
+    rates[has_outflow & ~has_inflow] = -1.0
+
+    rows = np.flatnonzero(has_outflow & has_inflow)
+    if rows.size == 0:
+        return rates
+
+    flows, times = flows[rows], times[rows]
+    solved, converged = _newton(flows, times)
+
+    if not converged.all():
+        retry = np.flatnonzero(~converged)
+        solved[retry] = _bisect(flows[retry], times[retry])
+
+    rates[rows] = solved
+    return rates
+
+
+def _initial_guess(flows: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Annualized multiple of inflows over outflows, across their mean timing gap"""
+    inflow = np.where(flows > 0, flows, 0)
+    outflow = np.where(flows < 0, -flows, 0)
+    total_in = inflow.sum(axis=1)
+    total_out = outflow.sum(axis=1)
+    duration = (inflow * times).sum(axis=1) / total_in - (outflow * times).sum(axis=1) / total_out
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        guess = (total_in / total_out) ** (1 / duration) - 1
+    guess = np.where(np.isfinite(guess) & (duration > 0), guess, 0.1)
+    return np.clip(guess, -0.9, 10.0)
+
+
+def _newton(flows: np.ndarray, times: np.ndarray):
+    """Newton-Raphson on all rows at once; returns rates and a converged mask"""
+    rate = _initial_guess(flows, times)
+    converged = np.zeros(rate.shape, dtype=bool)
+    active = np.arange(rate.size)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(MAX_NEWTON_ITERATIONS):
+            value, derivative, scale = _npv_and_derivative(rate[active], flows[active], times[active])
+            step = value / derivative
+            updated = rate[active] - step
+
+            valid = np.isfinite(updated) & (updated > -1)
+            rate[active] = np.where(valid, updated, rate[active])
+            done = valid & (np.abs(value) <= TOLERANCE * scale) & (
+                np.abs(step) <= np.sqrt(TOLERANCE) * (1 + np.abs(updated))
+            )
+            converged[active[done]] = True
+
+            # Rows that left the domain go straight to bisection
+            active = active[valid & ~done]
+            if active.size == 0:
+                break
+
+    return rate, converged
+
+
+def _bisect(flows: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Bisection inside the first bracketing interval of BRACKET_RATES"""
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        values = np.stack([
+            (flows * (1 + rate) ** -times).sum(axis=1) for rate in BRACKET_RATES
+        ], axis=1)
+
+    sign_change = np.signbit(values[:, :-1]) != np.signbit(values[:, 1:])
+    sign_change &= np.isfinite(values[:, :-1]) & np.isfinite(values[:, 1:])
+    bracketed = sign_change.any(axis=1)
+    first = np.argmax(sign_change, axis=1)
+
+    low = BRACKET_RATES[first]
+    high = BRACKET_RATES[first + 1]
+    low_value = values[np.arange(len(first)), first]
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(MAX_BISECTION_ITERATIONS):
+            mid = (low + high) / 2
+            mid_value = (flows * (1 + mid)[:, None] ** -times).sum(axis=1)
+            same_side = np.signbit(mid_value) == np.signbit(low_value)
+            low = np.where(same_side, mid, low)
+            low_value = np.where(same_side, mid_value, low_value)
+            high = np.where(same_side, high, mid)
+            if np.all(high - low <= TOLERANCE * (1 + np.abs(low))):
+                break
+
+    # No sign change but still under water at the lowest bracket: a total loss
+    total_loss = ~bracketed & (values[:, 0] < 0) & (values[:, -1] < 0)
+    return np.where(bracketed, (low + high) / 2, np.where(total_loss, -1.0, np.nan))
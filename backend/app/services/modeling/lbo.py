@@ -3,105 +3,273 @@ LBO (Leveraged Buyout) Model Calculator
 """
 
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
 from app.schemas.lbo import LBOInputs, LBOOutputs, LBOReturns
+from app.schemas.projections import ProjectionTable
+from app.services.modeling.irr import irr as solve_irr
+from app.core.memo import memoize
+from app.services.modeling.dcf import MAX_GRID_CELLS
+
+# Bump whenever the LBO math changes; memoized results of older versions are dropped
+MODEL_VERSION = "3"
+
+# Columns the batch engine reads from each deal
+BATCH_INPUT_FIELDS = (
+    'purchase_price', 'exit_multiple', 'debt_percent', 'interest_rate',
+    'base_revenue', 'revenue_growth', 'ebitda_margin', 'capex_percent',
+    'nwc_percent', 'tax_rate', 'hold_period', 'management_fees'
+)
+
+# Per-year lines produced by the batch engine, in LBOModel projection order
+PROJECTION_FIELDS = (
+    'revenue', 'ebitda', 'interest', 'ebt', 'taxes', 'net_income', 'capex',
+    'nwc_change', 'fcf', 'management_fees', 'fcf_after_fees', 'debt_paydown',
+    'debt_balance', 'equity_value'
+)
+
+# Columns of the debt schedule, after the year
+DEBT_SCHEDULE_FIELDS = ('beginning_balance', 'interest', 'principal_paydown', 'ending_balance')
+
+# Longest hold period; every deal of a batch is stepped through the longest one
+MAX_HOLD_PERIOD = 50
+
+# Lines produced by the cash sweep
+SWEEP_FIELDS = ('interest', 'ebt', 'taxes', 'net_income', 'fcf', 'fcf_after_fees', 'debt_paydown', 'debt_balance')
+
+
+def validate_hold_period(years: int):
+    """Raise ValueError for a hold period the models will not project"""
+    if not 1 <= years <= MAX_HOLD_PERIOD:
+        raise ValueError(f"Hold period must be between 1 and {MAX_HOLD_PERIOD} years")
+
+
+def debt_sweep(ebitda: np.ndarray, capex: np.ndarray, nwc_change: np.ndarray, mgmt_fee: np.ndarray,
+               debt: np.ndarray, interest_rate: np.ndarray, tax_rate: np.ndarray,
+               hold_period: np.ndarray) -> Dict[str, np.ndarray]:
+    """Year-by-year debt paydown for N deals
+
+    Operating lines are (N x years) arrays, deal terms length-N arrays.
+    Each year's interest depends on the previous year's balance, so the
+    sweep steps through the years and advances every deal per step; deals
+    past their hold period keep their exit balance.
+    """
+    size, horizon = ebitda.shape
+    lines = {name: np.zeros((size, horizon)) for name in SWEEP_FIELDS}
+    debt_balance = debt
+
+    for step in range(horizon):
+        active = hold_period > step
+        interest = debt_balance * interest_rate
+        ebt = ebitda[:, step] - interest
+        taxes = np.maximum(0, ebt * tax_rate)
+        net_income = ebt - taxes
+        fcf = net_income + interest - capex[:, step] - nwc_change[:, step]
+        fcf_after_fees = fcf - mgmt_fee[:, step]
+
+        # Cash sweep: all FCF pays down debt, never below zero
+        debt_paydown = np.minimum(fcf_after_fees, debt_balance)
+        debt_balance = np.where(active, np.maximum(0, debt_balance - debt_paydown), debt_balance)
+
+        lines['interest'][:, step] = interest
+        lines['ebt'][:, step] = ebt
+        lines['taxes'][:, step] = taxes
+        lines['net_income'][:, step] = net_income
+        lines['fcf'][:, step] = fcf
+        lines['fcf_after_fees'][:, step] = fcf_after_fees
+        lines['debt_paydown'][:, step] = debt_paydown
+        lines['debt_balance'][:, step] = debt_balance
+
+    return lines
+
+
+def sources_and_uses(purchase_price: float, debt_percent: float) -> Dict:
+    """Sources and uses of funds for a deal"""
+    debt_amount = purchase_price * debt_percent
+    equity_amount = purchase_price * (1 - debt_percent)
+
+    # Assume 2% transaction fees
+    transaction_fees = purchase_price * 0.02
+    total_uses = purchase_price + transaction_fees
+
+    return {
+        "sources": {
+            "debt": debt_amount,
+            "equity": equity_amount,
+            "total": debt_amount + equity_amount
+        },
+        "uses": {
+            "purchase_price": purchase_price,
+            "transaction_fees": transaction_fees,
+            "total": total_uses
+        }
+    }
+
+
+class BatchLBOModel:
+    """Vectorized LBO over N deals held as column arrays
+
+    The debt sweep makes each year depend on the previous one, so the engine
+    steps through the hold period once and advances every deal per step with
+    array operations. Deals with a shorter hold period keep their exit-year
+    balances frozen for the remaining steps.
+    """
+
+    def __init__(self, **columns):
+        missing = [field for field in BATCH_INPUT_FIELDS if field not in columns]
+        if missing:
+            raise ValueError(f"Missing batch LBO inputs: {', '.join(missing)}")
+
+        arrays = np.broadcast_arrays(
+            *[np.asarray(columns[field], dtype=np.float64) for field in BATCH_INPUT_FIELDS]
+        )
+        self.inputs = {
+            field: np.atleast_1d(array).ravel() for field, array in zip(BATCH_INPUT_FIELDS, arrays)
+        }
+        self.size = self.inputs['purchase_price'].shape[0]
+        self.hold_period = self.inputs['hold_period'].astype(np.int64)
+        if self.size:
+            validate_hold_period(int(self.hold_period.min()))
+            validate_hold_period(int(self.hold_period.max()))
+        self.projections = None
+        self.returns = None
+
+    @classmethod
+    def from_inputs(cls, inputs: Sequence) -> 'BatchLBOModel':
+        """Build a batch from a sequence of LBOInputs (or dicts with the same keys)"""
+        rows = [row if isinstance(row, dict) else row.dict() for row in inputs]
+        return cls(**{field: [row[field] for row in rows] for field in BATCH_INPUT_FIELDS})
+
+    def project_financials(self) -> Dict[str, np.ndarray]:
+        """Run the debt schedule for every deal; each line is an (N x years) array"""
+        inputs = self.inputs
+        horizon = int(self.hold_period.max()) if self.size else 0
+        years = np.arange(1, horizon + 1)
+
+        revenue = inputs['base_revenue'][:, None] * (1 + inputs['revenue_growth'])[:, None] ** years[None, :]
+        ebitda = revenue * inputs['ebitda_margin'][:, None]
+        capex = revenue * inputs['capex_percent'][:, None]
+        nwc_change = revenue * inputs['nwc_percent'][:, None]
+        initial_equity = inputs['purchase_price'] * (1 - inputs['debt_percent'])
+        mgmt_fee = np.broadcast_to((initial_equity * inputs['management_fees'])[:, None], revenue.shape)
+
+        lines = debt_sweep(
+            ebitda, capex, nwc_change, mgmt_fee,
+            debt=inputs['purchase_price'] * inputs['debt_percent'],
+            interest_rate=inputs['interest_rate'],
+            tax_rate=inputs['tax_rate'],
+            hold_period=self.hold_period,
+        )
+        enterprise_value = ebitda * inputs['exit_multiple'][:, None]
+
+        self.projections = {
+            'year': years,
+            'revenue': revenue,
+            'ebitda': ebitda,
+            'capex': capex,
+            'nwc_change': nwc_change,
+            'management_fees': mgmt_fee,
+            'equity_value': enterprise_value - lines['debt_balance'],
+            **lines,
+        }
+        return self.projections
+
+    def calculate_returns(self, sponsor_flows: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Entry/exit equity, MOIC and IRR per deal
+
+        ``sponsor_flows`` is an optional (N x years) array of interim equity
+        cash flows (dividend recaps positive, fees or follow-on equity
+        negative) that enter the IRR alongside the entry and exit.
+        """
+        if self.projections is None:
+            self.project_financials()
+
+        rows = np.arange(self.size)
+        entry_equity = self.inputs['purchase_price'] * (1 - self.inputs['debt_percent'])
+        exit_equity = self.projections['equity_value'][rows, self.hold_period - 1]
+
+        # Equity cash flows: invest at t=0, exit at the end of each deal's hold period
+        cash_flows = np.zeros((self.size, self.projections['year'].size + 1))
+        if sponsor_flows is not None:
+            years = self.projections['year']
+            cash_flows[:, 1:] = np.where(years[None, :] <= self.hold_period[:, None], sponsor_flows, 0)
+        cash_flows[:, 0] -= entry_equity
+        cash_flows[rows, self.hold_period] += exit_equity
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            moic = np.where(entry_equity > 0, exit_equity / entry_equity, 0.0)
+        irr = solve_irr(cash_flows)
+
+        self.returns = {
+            'entry_equity': entry_equity,
+            'exit_equity': exit_equity,
+            'total_return': exit_equity - entry_equity,
+            'irr': irr,
+            'moic': moic,
+            'cash_on_cash': moic,
+        }
+        return self.returns
+
+    def run(self, include_schedules: bool = False,
+            sponsor_flows: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Run the batch LBO; schedules are added under 'projections' on request"""
+        self.project_financials()
+        results = dict(self.calculate_returns(sponsor_flows))
+        if include_schedules:
+            results['projections'] = self.projections
+        return results
+
+    def projection_table(self, index: int) -> ProjectionTable:
+        """Projections of one deal, in the LBOModel layout"""
+        horizon = int(self.hold_period[index])
+        values = np.stack([self.projections[name][index, :horizon] for name in PROJECTION_FIELDS])
+        return ProjectionTable('year', PROJECTION_FIELDS, values)
+
+    @classmethod
+    def returns_grid(cls, inputs: LBOInputs, exit_multiples: Sequence[float],
+                     debt_percents: Sequence[float]) -> Dict[str, np.ndarray]:
+        """IRR and MOIC over an exit multiple x leverage grid"""
+        exit_multiples = np.asarray(exit_multiples, dtype=np.float64)
+        debt_percents = np.asarray(debt_percents, dtype=np.float64)
+        if exit_multiples.size == 0 or debt_percents.size == 0:
+            raise ValueError("Grid axes must not be empty")
+        if exit_multiples.size * debt_percents.size > MAX_GRID_CELLS:
+            raise ValueError(f"Returns grid exceeds {MAX_GRID_CELLS} cells")
+
+        base = inputs.dict()
+        columns = {field: base[field] for field in BATCH_INPUT_FIELDS}
+        columns['exit_multiple'] = np.repeat(exit_multiples, debt_percents.size)
+        columns['debt_percent'] = np.tile(debt_percents, exit_multiples.size)
+
+        returns = cls(**columns).run()
+        shape = (exit_multiples.size, debt_percents.size)
+        return {key: returns[key].reshape(shape) for key in ('irr', 'moic', 'exit_equity')}
+
 
 class LBOModel:
     """Leveraged Buyout financial model"""
     
     def __init__(self, inputs: LBOInputs):
         self.inputs = inputs
-        self.projections = []
+        self.projections = None
         
     def calculate_sources_and_uses(self) -> Dict:
         """Calculate sources and uses of funds"""
-        purchase_price = self.inputs.purchase_price
-        debt_amount = purchase_price * self.inputs.debt_percent
-        equity_amount = purchase_price * (1 - self.inputs.debt_percent)
-        
-        # Assume 2% transaction fees
-        transaction_fees = purchase_price * 0.02
-        total_uses = purchase_price + transaction_fees
-        
-        return {
-            "sources": {
-                "debt": debt_amount,
-                "equity": equity_amount,
-                "total": debt_amount + equity_amount
-            },
-            "uses": {
-                "purchase_price": purchase_price,
-                "transaction_fees": transaction_fees,
-                "total": total_uses
-            }
-        }
+        return sources_and_uses(self.inputs.purchase_price, self.inputs.debt_percent)
     
-    def project_financials(self) -> List[Dict]:
+    def project_financials(self) -> ProjectionTable:
         """Project financial statements over hold period"""
-        projections = []
-        debt_balance = self.inputs.purchase_price * self.inputs.debt_percent
-        
-        for year in range(1, self.inputs.hold_period + 1):
-            # Revenue and EBITDA
-            revenue = self.inputs.base_revenue * (1 + self.inputs.revenue_growth) ** year
-            ebitda = revenue * self.inputs.ebitda_margin
-            
-            # Interest expense
-            interest = debt_balance * self.inputs.interest_rate
-            
-            # EBT and taxes
-            ebt = ebitda - interest
-            taxes = max(0, ebt * self.inputs.tax_rate)
-            net_income = ebt - taxes
-            
-            # CapEx and NWC
-            capex = revenue * self.inputs.capex_percent
-            nwc_change = revenue * self.inputs.nwc_percent
-            
-            # Free Cash Flow
-            fcf = net_income + interest - capex - nwc_change
-            
-            # Management fees (on initial equity)
-            initial_equity = self.inputs.purchase_price * (1 - self.inputs.debt_percent)
-            mgmt_fee = initial_equity * self.inputs.management_fees
-            fcf_after_fees = fcf - mgmt_fee
-            
-            # Debt paydown (use all FCF to pay down debt)
-            debt_paydown = min(fcf_after_fees, debt_balance)
-            debt_balance = max(0, debt_balance - debt_paydown)
-            
-            # Equity value at this point
-            enterprise_value = ebitda * self.inputs.exit_multiple
-            equity_value = enterprise_value - debt_balance
-            
-            projections.append({
-                "year": year,
-                "revenue": revenue,
-                "ebitda": ebitda,
-                "interest": interest,
-                "ebt": ebt,
-                "taxes": taxes,
-                "net_income": net_income,
-                "capex": capex,
-                "nwc_change": nwc_change,
-                "fcf": fcf,
-                "management_fees": mgmt_fee,
-                "fcf_after_fees": fcf_after_fees,
-                "debt_paydown": debt_paydown,
-                "debt_balance": debt_balance,
-                "equity_value": equity_value
-            })
-        
-        return projections
+        batch = BatchLBOModel.from_inputs([self.inputs])
+        batch.project_financials()
+        self.projections = batch.projection_table(0)
+        return self.projections
     
-    def calculate_returns(self, projections: List[Dict]) -> LBOReturns:
+    def calculate_returns(self, projections: ProjectionTable) -> LBOReturns:
         """Calculate investment returns (IRR, MOIC, etc.)"""
         # Entry equity
         entry_equity = self.inputs.purchase_price * (1 - self.inputs.debt_percent)
         
         # Exit equity (from final year)
-        final_year = projections[-1]
-        exit_equity = final_year["equity_value"]
+        exit_equity = float(projections['equity_value'][-1])
         
         # Total return
         total_return = exit_equity - entry_equity
@@ -127,32 +295,24 @@ class LBOModel:
         )
     
     def _calculate_irr(self, cash_flows: List[float]) -> float:
-        """Calculate Internal Rate of Return using numpy"""
-        try:
-            return float(np.irr(cash_flows))
-        except:
-            # Fallback: approximate IRR
-            moic = abs(cash_flows[-1] / cash_flows[0])
-            years = len(cash_flows) - 1
-            return (moic ** (1/years)) - 1
+        """Calculate Internal Rate of Return"""
+        irr = solve_irr(cash_flows)
+        if np.isnan(irr):
+            raise ValueError("IRR is undefined without an equity investment")
+        return irr
     
-    def create_debt_schedule(self, projections: List[Dict]) -> List[Dict]:
+    def create_debt_schedule(self, projections: ProjectionTable) -> ProjectionTable:
         """Create debt paydown schedule"""
-        debt_schedule = []
-        
-        for proj in projections:
-            debt_schedule.append({
-                "year": proj["year"],
-                "beginning_balance": proj["debt_balance"] + proj["debt_paydown"],
-                "interest": proj["interest"],
-                "principal_paydown": proj["debt_paydown"],
-                "ending_balance": proj["debt_balance"]
-            })
-        
-        return debt_schedule
+        balance = projections['debt_balance']
+        paydown = projections['debt_paydown']
+        values = np.stack([balance + paydown, projections['interest'], paydown, balance])
+        return ProjectionTable('year', DEBT_SCHEDULE_FIELDS, values)
     
     def run(self) -> LBOOutputs:
         """Run complete LBO model"""
+        return memoize('lbo', MODEL_VERSION, self.inputs, self._run)
+    
+    def _run(self) -> LBOOutputs:
         # Calculate sources and uses
         sources_uses = self.calculate_sources_and_uses()
         
@@ -167,7 +327,7 @@ class LBOModel:
         
         return LBOOutputs(
             projections=projections,
-            returns=returns.dict(),
+            returns=returns,
             sources_and_uses=sources_uses,
             debt_schedule=debt_schedule
         )
@@ -0,0 +1,315 @@
+"""
+Monte Carlo Valuation Service
+Samples DCF assumptions and streams the resulting value distribution
+"""
+
+import multiprocessing
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from app.config import settings
+from app.schemas.analysis import (
+    DCFInputs,
+    MonteCarloDistribution,
+    MonteCarloOutputs,
+    MonteCarloStatistics,
+)
+from app.services.modeling.dcf import BatchDCFModel, BATCH_INPUT_FIELDS, validate_projection_years
+from app.services.modeling.scenarios import ScenarioAnalysis
+
+# Assumptions that can be sampled
+MONTE_CARLO_VARIABLES = ('revenue_growth', 'ebitda_margin', 'wacc', 'terminal_growth_rate')
+
+PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+
+MAX_PATHS = 5_000_000
+DEFAULT_CHUNK_SIZE = 32_768
+HISTOGRAM_BINS = 4000
+PILOT_PATHS = 16_384
+REPORTED_BINS = 50
+
+
+class StreamingHistogram:
+    """Fixed-bin histogram with running moments, mergeable across chunks and workers
+
+    Values outside the bin range land in underflow/overflow buckets bounded by
+    the running min/max, so quantiles stay defined with bounded memory. An
+    optional threshold counts observations strictly above it exactly.
+    """
+
+    def __init__(self, edges: np.ndarray, threshold: Optional[float] = None):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.threshold = threshold
+        self.above = 0
+        self.counts = np.zeros(self.edges.size + 1, dtype=np.int64)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray):
+        """Add a chunk of observations"""
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+
+        bins = np.searchsorted(self.edges, values, side='right')
+        self.counts += np.bincount(bins, minlength=self.counts.size)
+        if self.threshold is not None:
+            self.above += int(np.count_nonzero(values > self.threshold))
+
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(((values - chunk_mean) ** 2).sum())
+        self._merge_moments(values.size, chunk_mean, chunk_m2)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: 'StreamingHistogram'):
+        """Fold another histogram built over the same edges into this one"""
+        if other.count == 0:
+            return
+        self.counts += other.counts
+        self.above += other.above
+        self._merge_moments(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _merge_moments(self, count: int, mean: float, m2: float):
+        """Chan et al. parallel update of count, mean and sum of squared deviations"""
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else 0.0
+
+    def quantiles(self, probabilities: Sequence[float]) -> np.ndarray:
+        """Interpolated quantiles from the bucket counts"""
+        if self.count == 0:
+            return np.full(len(probabilities), np.nan)
+
+        lower = np.concatenate([[min(self.min, self.edges[0])], self.edges])
+        upper = np.concatenate([self.edges, [max(self.max, self.edges[-1])]])
+        cumulative = np.cumsum(self.counts)
+        targets = np.asarray(probabilities, dtype=np.float64) * self.count
+
+        buckets = np.minimum(np.searchsorted(cumulative, targets, side='left'), self.counts.size - 1)
+        before = np.where(buckets > 0, cumulative[buckets - 1], 0)
+        fraction = (targets - before) / np.maximum(self.counts[buckets], 1)
+        values = lower[buckets] + np.clip(fraction, 0, 1) * (upper[buckets] - lower[buckets])
+        return np.clip(values, self.min, self.max)
+
+
+class MonteCarloValuation:
+    """Monte Carlo DCF over sampled growth, margin, WACC and terminal growth"""
+
+    def __init__(self, base_inputs: DCFInputs,
+                 distributions: Optional[Dict[str, MonteCarloDistribution]] = None):
+        if base_inputs.base_revenue <= 0:
+            raise ValueError("Base revenue must be positive")
+        validate_projection_years(base_inputs.projection_years)
+
+        self.base_inputs = base_inputs
+        self.distributions = self._resolve_distributions(distributions or {})
+
+    def _resolve_distributions(self, distributions: Dict[str, MonteCarloDistribution]) -> Dict[str, MonteCarloDistribution]:
+        """Validate user distributions; default the rest to the bear/base/bull spread"""
+        unknown = set(distributions) - set(MONTE_CARLO_VARIABLES)
+        if unknown:
+            raise ValueError(f"Unsupported Monte Carlo variables: {', '.join(sorted(unknown))}")
+
+        ranges = ScenarioAnalysis(self.base_inputs).assumption_ranges()
+        resolved = {}
+        for variable in MONTE_CARLO_VARIABLES:
+            spec = distributions.get(variable)
+            if spec is None:
+                bear, base, bull = ranges[variable]
+                low, high = min(bear, bull), max(bear, bull)
+                if high > low:
+                    spec = MonteCarloDistribution(
+                        distribution='triangular', low=low, high=high, mode=min(max(base, low), high)
+                    )
+                else:
+                    spec = MonteCarloDistribution(distribution='fixed', value=base)
+            _validate_distribution(variable, spec)
+            resolved[variable] = spec
+        return resolved
+
+    def run(self, paths: int = 100_000, seed: int = 0, workers: int = 1,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            progress: Optional[Callable[[float], None]] = None) -> MonteCarloOutputs:
+        """Simulate ``paths`` valuations in seeded chunks, optionally across processes
+
+        Each chunk draws from its own child of the seed sequence, so a given seed
+        samples the same paths regardless of the number of workers.
+        ``progress`` is called with the completed fraction as chunks (or
+        workers) finish.
+        """
+        if not 0 < paths <= MAX_PATHS:
+            raise ValueError(f"Paths must be between 1 and {MAX_PATHS}")
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+
+        base_columns = {field: getattr(self.base_inputs, field) for field in BATCH_INPUT_FIELDS}
+        distributions = {name: spec.dict() for name, spec in self.distributions.items()}
+
+        threshold = self.base_inputs.current_price
+        pilot_seed, *chunk_seeds = np.random.SeedSequence(seed).spawn(1 + -(-paths // chunk_size))
+        edges = _pilot_edges(base_columns, distributions, pilot_seed, min(paths, PILOT_PATHS))
+        chunks = [
+            (chunk_seed, min(chunk_size, paths - index * chunk_size))
+            for index, chunk_seed in enumerate(chunk_seeds)
+        ]
+
+        workers = max(1, min(workers, os.cpu_count() or 1, len(chunks)))
+        if workers == 1:
+            histogram = _simulate_chunks(base_columns, distributions, edges, threshold, chunks, progress)
+        else:
+            histogram = StreamingHistogram(edges, threshold)
+            context = multiprocessing.get_context(settings.WORKER_START_METHOD)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = [
+                    executor.submit(
+                        _simulate_chunks, base_columns, distributions, edges, threshold, chunks[i::workers]
+                    )
+                    for i in range(workers)
+                ]
+                for done, future in enumerate(futures, 1):
+                    histogram.merge(future.result())
+                    if progress is not None:
+                        progress(done / workers)
+
+        return self._summarize(histogram, paths, seed)
+
+    def _summarize(self, histogram: StreamingHistogram, paths: int, seed: int) -> MonteCarloOutputs:
+        """Turn the accumulated histogram into value and upside statistics"""
+        probabilities = [p / 100 for p in PERCENTILES]
+        quantiles = histogram.quantiles(probabilities)
+        value_stats = MonteCarloStatistics(
+            mean=histogram.mean,
+            std=histogram.std,
+            min=histogram.min,
+            max=histogram.max,
+            percentiles={f"p{p}": float(q) for p, q in zip(PERCENTILES, quantiles)}
+        )
+
+        current_price = self.base_inputs.current_price
+        if current_price > 0:
+            scale = 100 / current_price
+            upside_stats = MonteCarloStatistics(
+                mean=(value_stats.mean - current_price) * scale,
+                std=value_stats.std * scale,
+                min=(value_stats.min - current_price) * scale,
+                max=(value_stats.max - current_price) * scale,
+                percentiles={
+                    key: (value - current_price) * scale
+                    for key, value in value_stats.percentiles.items()
+                }
+            )
+            probability_of_upside = histogram.above / histogram.count if histogram.count else 0.0
+        else:
+            upside_stats = MonteCarloStatistics(
+                mean=0.0, std=0.0, min=0.0, max=0.0,
+                percentiles={f"p{p}": 0.0 for p in PERCENTILES}
+            )
+            probability_of_upside = 0.0
+
+        return MonteCarloOutputs(
+            paths=paths,
+            seed=seed,
+            value_per_share=value_stats,
+            upside=upside_stats,
+            probability_of_upside=probability_of_upside,
+            histogram=_coarsen(histogram, REPORTED_BINS),
+            distributions=self.distributions
+        )
+
+
+def _validate_distribution(variable: str, spec: MonteCarloDistribution):
+    """Reject distributions missing the parameters they need"""
+    required = {
+        'normal': ('mean', 'std'),
+        'uniform': ('low', 'high'),
+        'triangular': ('low', 'mode', 'high'),
+        'fixed': ('value',),
+    }
+    if spec.distribution not in required:
+        raise ValueError(f"Unsupported distribution for {variable}: {spec.distribution}")
+
+    missing = [name for name in required[spec.distribution] if getattr(spec, name) is None]
+    if missing:
+        raise ValueError(f"{variable} {spec.distribution} distribution needs {', '.join(missing)}")
+    if spec.distribution == 'normal' and spec.std < 0:
+        raise ValueError(f"{variable} standard deviation must be non-negative")
+    if spec.distribution in ('uniform', 'triangular') and spec.low > spec.high:
+        raise ValueError(f"{variable} low must not exceed high")
+    if spec.distribution == 'triangular' and not spec.low <= spec.mode <= spec.high:
+        raise ValueError(f"{variable} mode must lie between low and high")
+
+
+def _sample(rng: np.random.Generator, spec: Dict, size: int) -> np.ndarray:
+    """Draw ``size`` values from a distribution spec dict"""
+    kind = spec['distribution']
+    if kind == 'normal':
+        values = rng.normal(spec['mean'], spec['std'], size)
+    elif kind == 'uniform':
+        values = rng.uniform(spec['low'], spec['high'], size)
+    elif kind == 'triangular' and spec['high'] > spec['low']:
+        values = rng.triangular(spec['low'], spec['mode'], spec['high'], size)
+    else:
+        values = np.full(size, spec['value'] if kind == 'fixed' else spec['low'])
+
+    # Normal tails are clipped to the optional bounds
+    if kind == 'normal' and (spec.get('low') is not None or spec.get('high') is not None):
+        values = np.clip(values, spec.get('low'), spec.get('high'))
+    return values
+
+
+def _value_chunk(base_columns: Dict, distributions: Dict, seed_sequence, size: int) -> np.ndarray:
+    """Value one chunk of sampled assumption sets"""
+    rng = np.random.default_rng(seed_sequence)
+    columns = dict(base_columns)
+    for variable in MONTE_CARLO_VARIABLES:
+        columns[variable] = _sample(rng, distributions[variable], size)
+    return BatchDCFModel(**columns).run()['value_per_share']
+
+
+def _pilot_edges(base_columns: Dict, distributions: Dict, seed_sequence, size: int) -> np.ndarray:
+    """Histogram edges spanning the bulk of a pilot sample, padded on both sides"""
+    values = _value_chunk(base_columns, distributions, seed_sequence, size)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return np.linspace(-1.0, 1.0, HISTOGRAM_BINS + 1)
+
+    low, high = np.quantile(values, [0.001, 0.999])
+    pad = max(high - low, abs(high), 1e-9) * 0.25
+    return np.linspace(low - pad, high + pad, HISTOGRAM_BINS + 1)
+
+
+def _simulate_chunks(base_columns: Dict, distributions: Dict, edges: np.ndarray,
+                     threshold: float, chunks: List,
+                     progress: Optional[Callable[[float], None]] = None) -> StreamingHistogram:
+    """Worker entry point: value a list of (seed, size) chunks into one histogram"""
+    histogram = StreamingHistogram(edges, threshold)
+    for done, (seed_sequence, size) in enumerate(chunks, 1):
+        histogram.update(_value_chunk(base_columns, distributions, seed_sequence, size))
+        if progress is not None:
+            progress(done / len(chunks))
+    return histogram
+
+
+def _coarsen(histogram: StreamingHistogram, bins: int) -> Dict[str, List[float]]:
+    """Re-bin the inner histogram for the response payload"""
+    inner = histogram.counts[1:-1]
+    group = inner.size // bins
+    counts = inner.reshape(bins, group).sum(axis=1)
+    counts[0] += histogram.counts[0]
+    counts[-1] += histogram.counts[-1]
+    edges = histogram.edges[::group]
+    return {'edges': edges.tolist(), 'counts': counts.astype(float).tolist()}
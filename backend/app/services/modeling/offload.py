@@ -0,0 +1,110 @@
+"""
+Offloaded Model Runs
+Model entry points for async handlers: computed on the compute pool; the heavier ones are memoized locally
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.compute import get_compute_executor, run_memoized
+from app.schemas.analysis import DCFInputs, DCFOutputs, MonteCarloOutputs, ScenarioResult
+from app.schemas.lbo import LBOInputs, LBOOutputs
+from app.services.modeling import dcf, lbo, scenarios
+from app.services.modeling.dcf import MAX_GRID_CELLS, DCFModel, valuation_key
+from app.services.modeling.lbo import BatchLBOModel, LBOModel
+from app.services.modeling.monte_carlo import MonteCarloValuation
+from app.services.modeling.scenarios import ScenarioAnalysis
+from app.services.modeling.screening import screen_records
+from app.services.modeling.sensitivity import SensitivityAnalysis, check_grid_size
+from app.utils.hashing import array_digest
+
+
+def _dcf_valuation(inputs: DCFInputs) -> Tuple[DCFOutputs, float]:
+    model = DCFModel(inputs)
+    return model.run(), model.calculate_terminal_value()
+
+
+def _lbo_outputs(inputs: LBOInputs) -> LBOOutputs:
+    return LBOModel(inputs).run()
+
+
+def _returns_grid(inputs: LBOInputs, exit_multiples: Sequence[float],
+                  debt_percents: Sequence[float]) -> Dict[str, np.ndarray]:
+    return BatchLBOModel.returns_grid(inputs, exit_multiples, debt_percents)
+
+
+def _sensitivity_grid(inputs: DCFInputs, x_axis: str, x_values: np.ndarray, y_axis: str,
+                      y_values: np.ndarray, output: str) -> np.ndarray:
+    return SensitivityAnalysis(inputs).grid(x_axis, x_values, y_axis, y_values, output=output)
+
+
+def _scenarios(inputs: DCFInputs) -> Dict[str, ScenarioResult]:
+    return ScenarioAnalysis(inputs).generate_scenarios()
+
+
+def _simulate(simulation: MonteCarloValuation, paths: int, seed: int) -> MonteCarloOutputs:
+    return simulation.run(paths=paths, seed=seed)
+
+
+async def run_dcf(inputs: DCFInputs) -> Tuple[DCFOutputs, float]:
+    """DCF outputs plus the undiscounted terminal value; not memoized, since a valuation is sub-millisecond"""
+    if inputs.base_revenue <= 0:
+        raise ValueError("Base revenue must be positive")
+    return await get_compute_executor().run(_dcf_valuation, inputs)
+
+
+async def run_lbo(inputs: LBOInputs) -> LBOOutputs:
+    # Same cache entries as LBOModel.run
+    return await run_memoized('lbo', lbo.MODEL_VERSION, inputs, _lbo_outputs, inputs)
+
+
+async def run_returns_grid(inputs: LBOInputs, exit_multiples: Sequence[float],
+                           debt_percents: Sequence[float]) -> Dict[str, np.ndarray]:
+    """IRR and MOIC grid on a compute worker; not memoized, since the axes vary per request"""
+    # Reject oversized grids before shipping the axes to a worker
+    if len(exit_multiples) * len(debt_percents) > MAX_GRID_CELLS:
+        raise ValueError(f"Returns grid exceeds {MAX_GRID_CELLS} cells")
+    return await get_compute_executor().run(_returns_grid, inputs, exit_multiples, debt_percents)
+
+
+async def run_sensitivity_grid(inputs: DCFInputs, x_axis: str, x_values: np.ndarray, y_axis: str,
+                               y_values: np.ndarray, output: str) -> np.ndarray:
+    """Sensitivity surface on a compute worker, memoized by the valuation inputs and both axes"""
+    check_grid_size(x_axis, x_values.size, y_axis, y_values.size, inputs.projection_years)
+    key = {
+        **valuation_key(inputs),
+        'x_axis': x_axis, 'x_values': array_digest(x_values),
+        'y_axis': y_axis, 'y_values': array_digest(y_values),
+        'output': output,
+        # Only upside reads the price
+        'current_price': inputs.current_price if output == 'upside' else None,
+    }
+    return await run_memoized(
+        'sensitivity', dcf.MODEL_VERSION, key,
+        _sensitivity_grid, inputs, x_axis, x_values, y_axis, y_values, output
+    )
+
+
+async def run_scenarios(inputs: DCFInputs) -> Dict[str, ScenarioResult]:
+    # Same cache entries as ScenarioAnalysis.generate_scenarios
+    return await run_memoized('scenarios', scenarios.MODEL_VERSION, inputs, _scenarios, inputs)
+
+
+async def run_monte_carlo(simulation: MonteCarloValuation, paths: int, seed: int) -> MonteCarloOutputs:
+    """One simulation on a single compute worker, memoized by its inputs, distributions, paths and seed"""
+    key = {
+        **valuation_key(simulation.base_inputs),
+        'current_price': simulation.base_inputs.current_price,
+        'distributions': {name: spec.dict() for name, spec in simulation.distributions.items()},
+        'paths': paths,
+        'seed': seed,
+    }
+    return await run_memoized('monte_carlo', dcf.MODEL_VERSION, key, _simulate, simulation, paths, seed)
+
+
+async def run_screen(universe: Dict[str, Dict], overrides: Optional[Dict[str, float]] = None,
+                     lbo_terms: Optional[Dict[str, float]] = None, limit: Optional[int] = None,
+                     start_rank: Optional[int] = None) -> List[Dict]:
+    """Ranked screen records on a compute worker; not memoized, since market inputs move"""
+    return await get_compute_executor().run(screen_records, universe, overrides, lbo_terms, limit, start_rank)
@@ -3,9 +3,13 @@ Scenario Analysis Service
 Generates Bull, Base, and Bear case valuations
 """
 
-from typing import Dict
+from typing import Dict, Tuple
 from app.services.modeling.dcf import DCFModel
 from app.schemas.analysis import DCFInputs, ScenarioResult
+from app.core.memo import memoize
+
+# Bump whenever the scenario rules change; memoized results of older versions are dropped
+MODEL_VERSION = "1"
 
 class ScenarioAnalysis:
     """Generate multiple valuation scenarios"""
@@ -15,7 +19,9 @@ class ScenarioAnalysis:
     
     def generate_scenarios(self) -> Dict[str, ScenarioResult]:
         """Generate Bull, Base, and Bear scenarios"""
-        
+        return memoize('scenarios', MODEL_VERSION, self.base_inputs, self._generate_scenarios)
+    
+    def _generate_scenarios(self) -> Dict[str, ScenarioResult]:
         scenarios = {}
         
         # Base Case (current assumptions)
@@ -103,6 +109,16 @@ class ScenarioAnalysis:
         
         return bear_inputs
     
+    def assumption_ranges(self) -> Dict[str, Tuple[float, float, float]]:
+        """Bear, base and bull value of each scenario-driven assumption"""
+        bull_inputs = self._create_bull_case()
+        bear_inputs = self._create_bear_case()
+        
+        return {
+            field: (getattr(bear_inputs, field), getattr(self.base_inputs, field), getattr(bull_inputs, field))
+            for field in ('revenue_growth', 'ebitda_margin', 'wacc', 'terminal_growth_rate')
+        }
+    
     def _calculate_upside(self, fair_value: float) -> float:
         """Calculate upside/downside percentage"""
         current_price = self.base_inputs.current_price
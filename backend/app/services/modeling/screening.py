@@ -0,0 +1,148 @@
+"""
+Universe Screening
+Value a whole ticker list in one vectorized DCF (and optional LBO) pass
+"""
+
+import numpy as np
+from typing import Dict, Iterator, List, Optional
+
+from app.services.modeling.dcf import BatchDCFModel, BATCH_INPUT_FIELDS as DCF_INPUT_FIELDS
+from app.services.modeling.lbo import BatchLBOModel
+
+# Assumptions a screen may override for every ticker at once
+SCREEN_OVERRIDE_FIELDS = (
+    'revenue_growth', 'ebitda_margin', 'capex_percent', 'da_percent', 'nwc_percent',
+    'tax_rate', 'wacc', 'terminal_growth_rate', 'projection_years'
+)
+
+# Deal terms applied to every ticker when the screen includes LBO returns
+DEFAULT_LBO_TERMS = {
+    'purchase_multiple': 10.0,
+    'exit_multiple': 10.0,
+    'debt_percent': 0.60,
+    'interest_rate': 0.06,
+    'hold_period': 5,
+    'management_fees': 0.02,
+}
+
+MAX_SCREEN_TICKERS = 5000
+
+
+class UniverseScreen:
+    """DCF (and optionally LBO) valuation of many tickers ranked by upside
+
+    ``universe`` maps each ticker to its DCF inputs, as returned by the data
+    service's ``get_bulk_dcf_inputs``. ``overrides`` replace the same
+    assumption for every ticker; ``lbo_terms`` (when given) adds IRR and MOIC
+    from a batch LBO priced off each ticker's EBITDA.
+    """
+
+    def __init__(self, universe: Dict[str, Dict], overrides: Optional[Dict[str, float]] = None,
+                 lbo_terms: Optional[Dict[str, float]] = None):
+        overrides = overrides or {}
+        unknown = sorted(set(overrides) - set(SCREEN_OVERRIDE_FIELDS))
+        if unknown:
+            raise ValueError(f"Unsupported screen overrides: {', '.join(unknown)}")
+        if len(universe) > MAX_SCREEN_TICKERS:
+            raise ValueError(f"Screen exceeds {MAX_SCREEN_TICKERS} tickers")
+
+        self.tickers: List[str] = list(universe)
+        rows = list(universe.values())
+        self.columns = {
+            field: np.array([row[field] for row in rows], dtype=np.float64)
+            for field in DCF_INPUT_FIELDS + ('current_price',)
+        }
+        for field, value in overrides.items():
+            self.columns[field] = np.full(len(rows), value, dtype=np.float64)
+
+        self.lbo_terms = None if lbo_terms is None else {**DEFAULT_LBO_TERMS, **lbo_terms}
+        self.dcf = None
+        self.results = None
+
+    def run(self) -> Dict[str, np.ndarray]:
+        """Value every ticker; rows the model cannot value come back as NaN
+
+        The batch DCF is kept on ``self.dcf`` for its per-year projections.
+        """
+        columns = self.columns
+        self.dcf = BatchDCFModel(**{field: columns[field] for field in DCF_INPUT_FIELDS})
+        valuation = self.dcf.run()
+
+        price = columns['current_price']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            upside = np.where(price > 0, (valuation['value_per_share'] - price) / price * 100, np.nan)
+
+        self.results = {
+            'current_price': price,
+            'value_per_share': valuation['value_per_share'],
+            'upside': upside,
+            'enterprise_value': valuation['enterprise_value'],
+            'equity_value': valuation['equity_value'],
+        }
+        if self.lbo_terms is not None:
+            self.results.update(self._run_lbo())
+        return self.results
+
+    def _run_lbo(self) -> Dict[str, np.ndarray]:
+        columns, terms = self.columns, self.lbo_terms
+        ebitda = columns['base_revenue'] * columns['ebitda_margin']
+        returns = BatchLBOModel(
+            purchase_price=ebitda * terms['purchase_multiple'],
+            exit_multiple=terms['exit_multiple'],
+            debt_percent=terms['debt_percent'],
+            interest_rate=terms['interest_rate'],
+            base_revenue=columns['base_revenue'],
+            revenue_growth=columns['revenue_growth'],
+            ebitda_margin=columns['ebitda_margin'],
+            capex_percent=columns['capex_percent'],
+            nwc_percent=columns['nwc_percent'],
+            tax_rate=columns['tax_rate'],
+            hold_period=terms['hold_period'],
+            management_fees=terms['management_fees'],
+        ).run()
+
+        invalid = ebitda <= 0
+        irr = np.where(invalid, np.nan, returns['irr'])
+        moic = np.where(invalid, np.nan, returns['moic'])
+        return {'irr': irr, 'moic': moic}
+
+    def ranking(self) -> np.ndarray:
+        """Row order by descending upside; unvalued rows go last"""
+        if self.results is None:
+            self.run()
+        upside = self.results['upside']
+        return np.lexsort((-np.nan_to_num(upside, nan=0.0), np.isnan(upside)))
+
+    def records(self, order: Optional[np.ndarray] = None,
+                start_rank: Optional[int] = None) -> Iterator[Dict]:
+        """One JSON-ready dict per ticker in ``order`` (default: input order),
+        numbered from ``start_rank`` when one is given"""
+        if self.results is None:
+            self.run()
+        order = np.arange(len(self.tickers)) if order is None else order
+
+        # Convert each column once instead of boxing every cell separately
+        columns = {name: _nullable(values[order]) for name, values in self.results.items()}
+        for offset, index in enumerate(order.tolist()):
+            record = {} if start_rank is None else {'rank': start_rank + offset}
+            record['ticker'] = self.tickers[index]
+            for name, values in columns.items():
+                record[name] = values[offset]
+            yield record
+
+
+def screen_records(universe: Dict[str, Dict], overrides: Optional[Dict[str, float]] = None,
+                   lbo_terms: Optional[Dict[str, float]] = None, limit: Optional[int] = None,
+                   start_rank: Optional[int] = None) -> List[Dict]:
+    """Value ``universe`` and return its records by descending upside, the first ``limit`` of them"""
+    screen = UniverseScreen(universe, overrides, lbo_terms)
+    order = screen.ranking()
+    if limit is not None:
+        order = order[:max(limit, 0)]
+    return list(screen.records(order, start_rank=start_rank))
+
+
+def _nullable(values: np.ndarray) -> list:
+    """Python floats rounded for display, with NaN/inf mapped to None"""
+    rounded = np.round(values, 4)
+    return [value if finite else None for value, finite in zip(rounded.tolist(), np.isfinite(values).tolist())]
@@ -0,0 +1,154 @@
+"""
+Sensitivity Analysis Service
+Two-way valuation grids over any pair of DCF assumptions
+"""
+
+import numpy as np
+from typing import Sequence
+
+from app.schemas.analysis import DCFInputs
+from app.services.modeling.dcf import (
+    BatchDCFModel,
+    BATCH_INPUT_FIELDS,
+    MAX_GRID_CELLS,
+    discount_factors,
+    discount_rate,
+    per_share,
+    terminal_value,
+    validate_projection_years,
+)
+
+# Assumptions that may be used as a grid axis
+SENSITIVITY_AXES = (
+    'revenue_growth', 'ebitda_margin', 'wacc', 'terminal_growth_rate',
+    'tax_rate', 'capex_percent', 'da_percent', 'nwc_percent'
+)
+
+SENSITIVITY_OUTPUTS = ('value_per_share', 'enterprise_value', 'equity_value', 'upside')
+
+# Axis pair valued from a single projection
+WACC_TERMINAL_AXES = frozenset(('wacc', 'terminal_growth_rate'))
+
+# Cells x projection years a batch grid may project, i.e. a full grid at a ten-year horizon
+MAX_GRID_CELL_YEARS = MAX_GRID_CELLS * 10
+
+# Cell-years projected per chunk of a batch grid, which bounds its working memory
+GRID_CHUNK_CELL_YEARS = 250_000
+
+
+def check_grid_size(x_axis: str, x_size: int, y_axis: str, y_size: int, projection_years: int):
+    """Raise ValueError for a grid too large to value on one request
+
+    Batch grids project every cell, so they are also bounded in cell-years;
+    the WACC x terminal growth grid projects once whatever its size.
+    """
+    cells = x_size * y_size
+    if cells > MAX_GRID_CELLS:
+        raise ValueError(f"Sensitivity grid exceeds {MAX_GRID_CELLS} cells")
+    if {x_axis, y_axis} != WACC_TERMINAL_AXES and cells * projection_years > MAX_GRID_CELL_YEARS:
+        raise ValueError(
+            f"Sensitivity grid exceeds {MAX_GRID_CELL_YEARS} cell-years; "
+            "use fewer steps or a shorter projection"
+        )
+
+
+class SensitivityAnalysis:
+    """Build valuation surfaces around a base set of DCF inputs"""
+
+    def __init__(self, base_inputs: DCFInputs):
+        self.base_inputs = base_inputs
+
+    def grid(self, x_axis: str, x_values: Sequence[float], y_axis: str,
+             y_values: Sequence[float], output: str = 'value_per_share') -> np.ndarray:
+        """Return a (len(x_values) x len(y_values)) grid of the requested output"""
+        for axis in (x_axis, y_axis):
+            if axis not in SENSITIVITY_AXES:
+                raise ValueError(f"Unsupported sensitivity axis: {axis}")
+        if x_axis == y_axis:
+            raise ValueError("Sensitivity axes must be different")
+        if output not in SENSITIVITY_OUTPUTS:
+            raise ValueError(f"Unsupported sensitivity output: {output}")
+
+        x = np.asarray(x_values, dtype=np.float64)
+        y = np.asarray(y_values, dtype=np.float64)
+        if x.size == 0 or y.size == 0:
+            raise ValueError("Sensitivity axes must not be empty")
+        check_grid_size(x_axis, x.size, y_axis, y.size, self.base_inputs.projection_years)
+
+        if {x_axis, y_axis} == WACC_TERMINAL_AXES:
+            if x_axis == 'wacc':
+                values = self.wacc_terminal_grid(x, y, output)
+            else:
+                values = self.wacc_terminal_grid(y, x, output).T
+        else:
+            values = self._batch_grid(x_axis, x, y_axis, y, output)
+
+        return values
+
+    def wacc_terminal_grid(self, wacc_values: np.ndarray, growth_values: np.ndarray,
+                           output: str = 'value_per_share') -> np.ndarray:
+        """WACC x terminal growth grid from a single FCF projection
+
+        The FCF stream does not depend on either axis, so it is projected once
+        and every cell is discounted as a broadcasted outer product.
+        """
+        if self.base_inputs.base_revenue <= 0:
+            raise ValueError("Base revenue must be positive")
+        validate_projection_years(self.base_inputs.projection_years)
+
+        batch = BatchDCFModel.from_inputs([self.base_inputs])
+        fcf = batch.project_financials()['FCF'][0]
+        years = batch.projections['Year']
+        final_year = self.base_inputs.projection_years
+
+        wacc = np.asarray(wacc_values, dtype=np.float64)
+        growth = np.asarray(growth_values, dtype=np.float64)
+        rate = discount_rate(wacc)
+
+        discount = discount_factors(rate[:, None], years[None, :])
+        pv_fcf = discount @ fcf
+
+        terminal = terminal_value(fcf[final_year - 1], wacc[:, None], growth[None, :])
+        pv_terminal = terminal * discount_factors(rate, final_year)[:, None]
+
+        enterprise_value = pv_fcf[:, None] + pv_terminal
+        return self._select_output(enterprise_value, output)
+
+    def _batch_grid(self, x_axis: str, x: np.ndarray, y_axis: str, y: np.ndarray,
+                    output: str) -> np.ndarray:
+        """Any other axis pair, valued as flattened batch DCFs over chunks of x rows"""
+        if self.base_inputs.base_revenue <= 0:
+            raise ValueError("Base revenue must be positive")
+        years = self.base_inputs.projection_years
+        validate_projection_years(years)
+
+        base = self.base_inputs.dict()
+        columns = {field: base[field] for field in BATCH_INPUT_FIELDS}
+
+        enterprise_value = np.empty((x.size, y.size))
+        rows = max(GRID_CHUNK_CELL_YEARS // (y.size * years), 1)
+        for start in range(0, x.size, rows):
+            chunk = x[start:start + rows]
+            columns[x_axis] = np.repeat(chunk, y.size)
+            columns[y_axis] = np.tile(y, chunk.size)
+            valuation = BatchDCFModel(**columns).run()
+            enterprise_value[start:start + chunk.size] = valuation['enterprise_value'].reshape(chunk.size, y.size)
+        return self._select_output(enterprise_value, output)
+
+    def _select_output(self, enterprise_value: np.ndarray, output: str) -> np.ndarray:
+        """Derive the requested output from an enterprise value grid"""
+        if output == 'enterprise_value':
+            return enterprise_value
+
+        equity_value = enterprise_value - self.base_inputs.net_debt
+        if output == 'equity_value':
+            return equity_value
+
+        value_per_share = per_share(equity_value, self.base_inputs.shares_outstanding)
+        if output == 'value_per_share':
+            return value_per_share
+
+        current_price = self.base_inputs.current_price
+        if current_price > 0:
+            return (value_per_share - current_price) / current_price * 100
+        return np.zeros_like(value_per_share)
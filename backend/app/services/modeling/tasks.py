@@ -0,0 +1,91 @@
+"""
+Background Model Tasks
+Long-running valuations run by the job queue in worker processes
+"""
+
+import numpy as np
+from typing import Dict
+
+from app.schemas.analysis import DCFInputs, MonteCarloDistribution
+from app.services.data.sources import get_data_service
+from app.services.export.jobs import export_task
+from app.services.modeling.monte_carlo import MonteCarloValuation
+from app.services.modeling.screening import screen_records
+from app.services.modeling.sensitivity import SensitivityAnalysis
+
+# Tickers fetched and reported per progress step of a screen
+SCREEN_CHUNK_SIZE = 250
+
+
+def _base_inputs(params: Dict) -> DCFInputs:
+    if params.get('base_inputs'):
+        return DCFInputs(**params['base_inputs'])
+    return DCFInputs(**get_data_service().get_dcf_inputs(params['ticker'].upper()))
+
+
+def _axis_values(axis: Dict) -> np.ndarray:
+    if axis.get('values') is not None:
+        return np.asarray(axis['values'], dtype=np.float64)
+    return np.linspace(axis['start'], axis['stop'], axis['steps'])
+
+
+def monte_carlo_task(params: Dict, job) -> Dict:
+    """Monte Carlo valuation (see /analysis/monte-carlo)
+
+    Runs on a single process: the job queue already holds one worker per job.
+    """
+    distributions = {
+        name: MonteCarloDistribution(**spec) for name, spec in params.get('distributions', {}).items()
+    }
+    simulation = MonteCarloValuation(_base_inputs(params), distributions)
+    outputs = simulation.run(paths=params['paths'], seed=params['seed'], workers=1, progress=job.progress)
+    return outputs.dict()
+
+
+def sensitivity_task(params: Dict, job) -> Dict:
+    """Two-way sensitivity grid in the columnar layout of /analysis/sensitivity"""
+    x_axis, y_axis = params['x_axis'], params['y_axis']
+    x_values, y_values = _axis_values(x_axis), _axis_values(y_axis)
+    job.progress(0.0, "valuing grid")
+
+    grid = SensitivityAnalysis(_base_inputs(params)).grid(
+        x_axis['name'], x_values, y_axis['name'], y_values, output=params['output']
+    )
+    return {
+        "ticker": params['ticker'].upper(),
+        "output": params['output'],
+        "shape": [x_values.size, y_values.size],
+        "x_axis": {"name": x_axis['name'], "values": x_values.tolist()},
+        "y_axis": {"name": y_axis['name'], "values": y_values.tolist()},
+        "values": grid.ravel().tolist()
+    }
+
+
+def screen_task(params: Dict, job) -> Dict:
+    """Ranked universe screen (see /analysis/batch); progress follows the data fetch"""
+    tickers = list(dict.fromkeys(
+        ticker.strip().upper() for ticker in params['tickers'] if ticker.strip()
+    ))
+    if not tickers:
+        raise ValueError("No tickers to screen")
+
+    universe = {}
+    for start in range(0, len(tickers), SCREEN_CHUNK_SIZE):
+        universe.update(get_data_service().get_bulk_dcf_inputs(tickers[start:start + SCREEN_CHUNK_SIZE]))
+        job.progress(0.9 * len(universe) / len(tickers), f"fetched {len(universe)} of {len(tickers)}")
+
+    rows = screen_records(universe, params.get('overrides') or {}, params.get('lbo'), params.get('limit'), start_rank=1)
+    return {
+        "count": len(tickers),
+        "valued": sum(row['value_per_share'] is not None for row in rows),
+        "rows": rows
+    }
+
+
+# Job kind -> task, as registered with the job queue
+TASKS = {
+    'monte_carlo': monte_carlo_task,
+    'sensitivity': sensitivity_task,
+    'screen': screen_task,
+    'export': export_task,
+}
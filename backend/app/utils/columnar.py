@@ -0,0 +1,168 @@
+"""
+Columnar Result Encoding
+Compact binary form of saved model results with projection tables stored as arrays
+"""
+
+import json
+import struct
+import zlib
+from typing import Any, Dict, List
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:  # zlib is always available
+    zstandard = None
+
+MAGIC = b"AFC1"
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# Lists shorter than this stay in the JSON header
+MIN_TABLE_ROWS = 2
+
+_HEADER = struct.Struct("<4sBI")  # magic, codec, header length
+_MAX_EXACT_INT = 2 ** 53  # Largest integer range float64 holds exactly
+
+# Single-key dicts with these keys are markers in the encoded tree
+_TABLE_KEY = "__table__"
+_LITERAL_KEY = "__literal__"
+
+
+def encode_results(results: Any) -> bytes:
+    """Encode a JSON-compatible result tree
+
+    Every list of flat dicts with the same keys and numeric values (the
+    per-year projection and debt schedule tables) becomes one row-major
+    float64 block; everything else stays JSON. The whole payload is
+    compressed with zstd when available, zlib otherwise.
+
+    Values decode exactly as they went in: ints stay ints (also in columns
+    that mix ints and floats), nulls stay null and NaNs stay NaN.
+    """
+    tables: List[Dict] = []
+    tree = _extract_tables(results, tables)
+    blocks = [table.pop("block") for table in tables]
+
+    header = json.dumps({"tree": tree, "tables": tables}, separators=(",", ":")).encode()
+    body = header + b"".join(block.tobytes() for block in blocks)
+
+    if zstandard is not None:
+        codec, payload = CODEC_ZSTD, zstandard.ZstdCompressor(level=3).compress(body)
+    else:
+        codec, payload = CODEC_ZLIB, zlib.compress(body, 6)
+    return _HEADER.pack(MAGIC, codec, len(header)) + payload
+
+
+def decode_results(blob: bytes) -> Any:
+    """Inverse of encode_results"""
+    magic, codec, header_length = _HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError("Not a columnar result payload")
+
+    payload = memoryview(blob)[_HEADER.size:]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstandard is required to read this result payload")
+        body = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec == CODEC_ZLIB:
+        body = zlib.decompress(payload)
+    else:
+        raise ValueError(f"Unknown result codec {codec}")
+
+    header = json.loads(body[:header_length])
+    offset = header_length
+    tables = []
+    for table in header["tables"]:
+        names, rows = table["columns"], table["rows"]
+        count = rows * len(names)
+        values = np.frombuffer(body, dtype="<f8", count=count, offset=offset).reshape(rows, len(names))
+        offset += count * 8
+
+        records = values.tolist()
+        if "null_cells" in table:
+            for index, cells in table["null_cells"]:
+                for row in cells:
+                    records[row][index] = None
+        elif table["nulls"]:
+            # Payloads written before null_cells was recorded: every NaN was a null
+            records = [[None if value != value else value for value in record] for record in records]
+        for index in table["ints"]:
+            for record in records:
+                record[index] = int(record[index])
+        for index, cells in table.get("int_cells", ()):
+            for row in cells:
+                records[row][index] = int(records[row][index])
+        tables.append([dict(zip(names, record)) for record in records])
+
+    return _restore_tables(header["tree"], tables)
+
+
+def _extract_tables(value: Any, tables: List[Dict]) -> Any:
+    if isinstance(value, dict):
+        encoded = {key: _extract_tables(item, tables) for key, item in value.items()}
+        if len(value) == 1 and next(iter(value)) in (_TABLE_KEY, _LITERAL_KEY):
+            return {_LITERAL_KEY: encoded}
+        return encoded
+    if isinstance(value, list):
+        table = _as_table(value)
+        if table is not None:
+            tables.append(table)
+            return {_TABLE_KEY: len(tables) - 1}
+        return [_extract_tables(item, tables) for item in value]
+    return value
+
+
+def _as_table(rows: list):
+    """Row-major float64 block for a list of same-keyed numeric dicts, else None"""
+    if len(rows) < MIN_TABLE_ROWS or not all(isinstance(row, dict) for row in rows):
+        return None
+    names = list(rows[0])
+    if not names or any(list(row) != names for row in rows):
+        return None
+
+    records = [list(row.values()) for row in rows]
+    # "ints" and "nulls" keep their original meaning (all-int columns; any null
+    # present) so older readers still decode the block. The exact positions of
+    # ints in mixed columns and of nulls go in int_cells / null_cells.
+    ints, int_cells, null_cells = [], [], []
+    for index in range(len(names)):
+        column = [record[index] for record in records]
+        kinds = {type(value) for value in column}
+        # bools are not numbers here; ints must survive the float64 round trip
+        if not kinds <= {int, float, type(None)}:
+            return None
+        int_rows = [row for row, value in enumerate(column) if type(value) is int]
+        if any(abs(column[row]) > _MAX_EXACT_INT for row in int_rows):
+            return None
+        if kinds == {int}:
+            ints.append(index)
+        elif int_rows:
+            int_cells.append([index, int_rows])
+        null_rows = [row for row, value in enumerate(column) if value is None]
+        if null_rows:
+            null_cells.append([index, null_rows])
+
+    nulls = bool(null_cells)
+    block = np.array(records, dtype="<f8") if not nulls else np.array(
+        [[np.nan if value is None else value for value in record] for record in records], dtype="<f8"
+    )
+    table = {"rows": len(rows), "columns": names, "ints": ints, "nulls": nulls, "block": block}
+    if int_cells:
+        table["int_cells"] = int_cells
+    if nulls:
+        table["null_cells"] = null_cells
+    return table
+
+
+def _restore_tables(value: Any, tables: List[list]) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and _TABLE_KEY in value:
+            return tables[value[_TABLE_KEY]]
+        if len(value) == 1 and _LITERAL_KEY in value:
+            value = value[_LITERAL_KEY]
+        return {key: _restore_tables(item, tables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_restore_tables(item, tables) for item in value]
+    return value
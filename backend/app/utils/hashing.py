@@ -0,0 +1,27 @@
+"""
+Stable hashing of request and input models
+"""
+
+import hashlib
+import json
+from typing import Any
+
+import numpy as np
+
+
+def canonical_json(value: Any) -> str:
+    """Deterministic JSON for a pydantic model, dict or plain value"""
+    if hasattr(value, "dict"):
+        value = value.dict()
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def stable_hash(value: Any, namespace: str = "") -> str:
+    """SHA-256 of the canonical JSON form, prefixed with an optional namespace"""
+    digest = hashlib.sha256(canonical_json(value).encode()).hexdigest()
+    return f"{namespace}:{digest}" if namespace else digest
+
+
+def array_digest(values) -> str:
+    """SHA-256 of an array's float64 buffer, for keys over large axes"""
+    return hashlib.sha256(np.ascontiguousarray(values, dtype=np.float64).tobytes()).hexdigest()
@@ -0,0 +1,141 @@
+"""
+Benchmark: login storm and authenticated request throughput
+
+Starts the API under uvicorn on a throwaway SQLite database twice: once
+with bcrypt on the event loop and no token/user cache
+(AUTH_HASH_WORKERS=0, AUTH_CACHE_TTL=0), once with the defaults. Each run
+
+    1. fires concurrent logins for SECONDS while probing /health, and
+       reports logins per second, /health latency and 429s
+    2. fires concurrent authenticated /auth/me requests for SECONDS and
+       reports requests per second and latency
+
+Usage (from backend/):
+    python -m benchmarks.bench_auth [SECONDS] [CONCURRENCY]
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+PORT = 8767
+BASE_URL = f"http://127.0.0.1:{PORT}"
+USERS = 8
+PASSWORD = "correct horse battery staple"
+PROBE_INTERVAL = 0.01
+
+
+def start_server(database: str, **env) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}", DATABASE_CREATE_TABLES="true",
+               RATE_LIMIT_ENABLED="false", **env)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def login(client: httpx.AsyncClient, user: int) -> httpx.Response:
+    return await client.post("/api/v1/auth/login", data={"username": f"user{user}", "password": PASSWORD})
+
+
+async def login_storm(client: httpx.AsyncClient, worker: int, deadline: float, counts: dict) -> None:
+    attempt = worker
+    while time.monotonic() < deadline:
+        response = await login(client, attempt % USERS)
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+        attempt += 1
+
+
+async def probe(client: httpx.AsyncClient, deadline: float, latencies: list) -> None:
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(PROBE_INTERVAL)
+
+
+async def authenticated(client: httpx.AsyncClient, token: str, deadline: float, latencies: list) -> None:
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/api/v1/auth/me", headers=headers)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def measure(seconds: float, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=120) as client, \
+            httpx.AsyncClient(base_url=BASE_URL, timeout=120) as prober:
+        await wait_ready(prober)
+        for user in range(USERS):
+            response = await client.post("/api/v1/auth/signup", json={
+                "email": f"user{user}@example.com", "username": f"user{user}", "password": PASSWORD
+            })
+            response.raise_for_status()
+
+        health, counts = [], {}
+        deadline = time.monotonic() + seconds
+        await asyncio.gather(
+            probe(prober, deadline, health),
+            *(login_storm(client, worker, deadline, counts) for worker in range(concurrency)),
+        )
+
+        tokens = [(await login(client, user)).json()["access_token"] for user in range(USERS)]
+        me = []
+        deadline = time.monotonic() + seconds
+        await asyncio.gather(*(authenticated(client, tokens[i % USERS], deadline, me) for i in range(concurrency)))
+
+    health_ms, me_ms = np.asarray(health) * 1e3, np.asarray(me) * 1e3
+    return {
+        "logins": counts.get(200, 0) / seconds,
+        "rejected": counts.get(429, 0),
+        "health_p50": float(np.percentile(health_ms, 50)),
+        "health_p99": float(np.percentile(health_ms, 99)),
+        "me": len(me) / seconds,
+        "me_p50": float(np.percentile(me_ms, 50)),
+    }
+
+
+def main(seconds: float = 10.0, concurrency: int = 16) -> None:
+    print(f"seconds={seconds} concurrency={concurrency} users={USERS} cpus={os.cpu_count()}")
+    configs = (
+        ("inline, no cache", {"AUTH_HASH_WORKERS": "0", "AUTH_CACHE_TTL": "0"}),
+        ("pool + cache", {}),
+    )
+    for label, env in configs:
+        with tempfile.TemporaryDirectory() as directory:
+            server = start_server(os.path.join(directory, "auth.db"), COMPUTE_WORKERS="0", **env)
+            try:
+                result = asyncio.run(measure(seconds, concurrency))
+            finally:
+                server.terminate()
+                server.wait()
+        print(
+            f"  {label:<16}: logins {result['logins']:6.1f}/s (429s {result['rejected']})  "
+            f"/health p50 {result['health_p50']:8.1f} ms p99 {result['health_p99']:8.1f} ms  |  "
+            f"/auth/me {result['me']:6.0f}/s p50 {result['me_p50']:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(float(args[0]) if len(args) > 0 else 10.0, int(args[1]) if len(args) > 1 else 16)
@@ -0,0 +1,52 @@
+"""
+Benchmark: batch DCF engine vs. one DCFModel run per input set
+
+Usage (from backend/):
+    python -m benchmarks.bench_dcf_batch [N]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from app.schemas.analysis import DCFInputs
+from app.services.data.mock_data import MockDataService
+from app.services.modeling.dcf import BatchDCFModel, DCFModel
+
+
+def make_inputs(n: int, seed: int = 7) -> list:
+    """Assumption variants around the mock AAPL inputs"""
+    rng = np.random.default_rng(seed)
+    base = MockDataService().get_dcf_inputs("AAPL")
+    growth = rng.uniform(0.0, 0.20, n)
+    margin = rng.uniform(0.15, 0.40, n)
+    wacc = rng.uniform(0.06, 0.12, n)
+    return [
+        DCFInputs(**{**base, "revenue_growth": g, "ebitda_margin": m, "wacc": w})
+        for g, m, w in zip(growth, margin, wacc)
+    ]
+
+
+def main(n: int = 10_000) -> None:
+    inputs = make_inputs(n)
+    sample = inputs[:min(n, 500)]
+
+    start = time.perf_counter()
+    for row in sample:
+        DCFModel(row).run()
+    single = (time.perf_counter() - start) / len(sample)
+
+    columns = BatchDCFModel.from_inputs(inputs).inputs
+    start = time.perf_counter()
+    BatchDCFModel(**columns).run()
+    batch = (time.perf_counter() - start) / n
+
+    print(f"N={n}")
+    print(f"  single-row DCFModel.run : {single * 1e6:10.2f} us/valuation")
+    print(f"  BatchDCFModel.run       : {batch * 1e6:10.2f} us/valuation")
+    print(f"  speedup                 : {single / batch:10.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
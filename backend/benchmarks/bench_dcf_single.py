@@ -0,0 +1,58 @@
+"""
+Benchmark: single DCF and LBO valuations
+
+Times one uncached valuation through DCFModel and LBOModel, the same DCF
+valued as a one-row BatchDCFModel for comparison, and each way of getting
+the projections out (records, response JSON, DataFrame). Timings are the
+best of several repeats, which is what the code costs without scheduler
+noise.
+
+Usage (from backend/):
+    python -m benchmarks.bench_dcf_single [CALLS]
+"""
+
+import sys
+import timeit
+
+from app.api.v1.routes.lbo import LBORequest, build_lbo_inputs
+from app.config import settings
+from app.schemas.analysis import DCFInputs
+from app.services.data.mock_data import MockDataService
+from app.services.modeling.dcf import BatchDCFModel, DCFModel
+from app.services.modeling.lbo import LBOModel
+
+
+def best_us(func, calls: int, repeat: int = 7) -> float:
+    return min(timeit.repeat(func, number=calls, repeat=repeat)) / calls * 1e6
+
+
+def batch_of_one(inputs: DCFInputs):
+    batch = BatchDCFModel.from_inputs([inputs])
+    batch.run()
+    return batch.projection_table(0)
+
+
+def main(calls: int = 20_000) -> None:
+    # Measure the models, not the cache
+    settings.MODEL_CACHE_ENABLED = False
+
+    inputs = DCFInputs(**MockDataService().get_dcf_inputs("AAPL"))
+    lbo_inputs = build_lbo_inputs(LBORequest(ticker="AAPL"))
+    outputs = DCFModel(inputs).run()
+    table = outputs.projections
+
+    print(f"calls={calls} years={inputs.projection_years}")
+    timings = [
+        ("DCFModel.run", lambda: DCFModel(inputs).run(), calls),
+        ("one-row BatchDCFModel", lambda: batch_of_one(inputs), calls),
+        ("LBOModel.run", lambda: LBOModel(lbo_inputs).run(), calls // 10),
+        ("projections.records()", table.records, calls),
+        ("DCFOutputs JSON", outputs.model_dump_json, calls),
+        ("projections.to_dataframe()", table.to_dataframe, calls // 10),
+    ]
+    for label, func, number in timings:
+        print(f"  {label:<27}: {best_us(func, number):8.2f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,124 @@
+"""
+Benchmark: event loop responsiveness under model load
+
+Starts the API under uvicorn twice, once with the models run inline on the
+event loop (COMPUTE_WORKERS=0) and once offloaded to the compute pool, and
+drives it with concurrent uncached DCF and LBO valuations while probing
+/health. Reports /health latency percentiles, valuation throughput and
+how many requests were shed with 429.
+
+Usage (from backend/):
+    python -m benchmarks.bench_event_loop [SECONDS] [CONCURRENCY] [WORKERS]
+"""
+
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}"
+PROBE_INTERVAL = 0.01
+
+
+def start_server(workers: int) -> subprocess.Popen:
+    env = dict(os.environ, COMPUTE_WORKERS=str(workers), MODEL_CACHE_ENABLED="false", RATE_LIMIT_ENABLED="false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def load(client: httpx.AsyncClient, counter, deadline: float, counts: dict) -> None:
+    # Unique tickers and multiples so neither single-flight nor the model cache can help
+    while time.monotonic() < deadline:
+        n = next(counter)
+        if n % 2:
+            response = await client.post("/api/v1/analysis/quick", json={"ticker": f"T{n:07d}"})
+        else:
+            response = await client.post(
+                "/api/v1/lbo/calculate",
+                json={"ticker": f"T{n:07d}", "exit_multiple": 8 + (n % 1000) / 250, "hold_period": 10},
+            )
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+        if response.status_code == 429:
+            await asyncio.sleep(float(response.headers.get("Retry-After", 1)) / 100)
+
+
+async def probe(client: httpx.AsyncClient, deadline: float, latencies: list) -> None:
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(PROBE_INTERVAL)
+
+
+async def measure(seconds: float, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=60) as client, \
+            httpx.AsyncClient(base_url=BASE_URL, timeout=60) as prober:
+        await wait_ready(prober)
+        # Warm up imports, the compute pool and the connection pools
+        await asyncio.gather(*(client.post("/api/v1/analysis/quick", json={"ticker": f"W{i}"}) for i in range(8)))
+
+        idle = []
+        await probe(prober, time.monotonic() + 1.0, idle)
+
+        latencies, counts, counter = [], {}, itertools.count()
+        deadline = time.monotonic() + seconds
+        await asyncio.gather(
+            probe(prober, deadline, latencies),
+            *(load(client, counter, deadline, counts) for _ in range(concurrency)),
+        )
+
+    ms = np.asarray(latencies) * 1e3
+    return {
+        "idle_p99": float(np.percentile(np.asarray(idle) * 1e3, 99)),
+        "p50": float(np.percentile(ms, 50)),
+        "p99": float(np.percentile(ms, 99)),
+        "max": float(ms.max()),
+        "ok_per_s": counts.get(200, 0) / seconds,
+        "rejected": counts.get(429, 0),
+    }
+
+
+def main(seconds: float = 10.0, concurrency: int = 32, workers: int = 2) -> None:
+    print(f"seconds={seconds} concurrency={concurrency} cpus={os.cpu_count()}")
+    for label, pool in (("inline", 0), (f"offload x{workers}", workers)):
+        server = start_server(pool)
+        try:
+            result = asyncio.run(measure(seconds, concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+        print(
+            f"  {label:<11}: /health p50 {result['p50']:7.2f} ms  p99 {result['p99']:7.2f} ms  "
+            f"max {result['max']:7.2f} ms  (idle p99 {result['idle_p99']:5.2f} ms)  "
+            f"valuations {result['ok_per_s']:7.0f}/s  429s {result['rejected']}"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        float(args[0]) if len(args) > 0 else 10.0,
+        int(args[1]) if len(args) > 1 else 32,
+        int(args[2]) if len(args) > 2 else 2,
+    )
@@ -0,0 +1,73 @@
+"""
+Benchmark: model export throughput
+
+Exports a synthetic universe screen (ranked sheet plus per-ticker
+projections) to XLSX and CSV and reports rows per second and the peak
+Python memory allocated while writing, which stays flat as the universe
+grows because rows are streamed to disk.
+
+Usage (from backend/):
+    python -m benchmarks.bench_export [TICKERS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.services.data.mock_data import MockDataService
+from app.services.export.model_sheets import screen_sheets
+from app.services.export.workbook import export_filename, write_export
+from app.services.modeling.screening import UniverseScreen
+
+
+def make_universe(size: int, seed: int = 0) -> dict:
+    base = MockDataService().get_dcf_inputs("AAPL")
+    rng = np.random.default_rng(seed)
+    universe = {}
+    for i in range(size):
+        inputs = dict(base, ticker=f"T{i:05d}")
+        inputs["base_revenue"] = base["base_revenue"] * rng.uniform(0.01, 2.0)
+        inputs["revenue_growth"] = rng.uniform(-0.02, 0.25)
+        inputs["ebitda_margin"] = rng.uniform(0.05, 0.45)
+        inputs["current_price"] = rng.uniform(5, 500)
+        universe[inputs["ticker"]] = inputs
+    return universe
+
+
+def bench(universe: dict, fmt: str, directory: str) -> dict:
+    screen = UniverseScreen(universe, lbo_terms={})
+    sheets = screen_sheets(screen, screen.ranking())
+    path = os.path.join(directory, export_filename("screen", fmt, len(sheets)))
+
+    started = time.perf_counter()
+    rows = write_export(path, fmt, sheets)
+    elapsed = time.perf_counter() - started
+
+    # Memory is traced on a second run; tracing slows the writers severalfold
+    tracemalloc.start()
+    write_export(path, fmt, screen_sheets(screen, screen.ranking()))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"rows": rows, "seconds": elapsed, "peak_mb": peak / 1e6, "file_mb": os.path.getsize(path) / 1e6}
+
+
+def main(tickers: int = 5000) -> None:
+    universe = make_universe(tickers)
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"tickers={tickers}")
+        for fmt in ("xlsx", "csv"):
+            result = bench(universe, fmt, directory)
+            print(
+                f"  {fmt:<5}: {result['rows']:7d} rows in {result['seconds']:6.2f}s "
+                f"= {result['rows'] / result['seconds']:9.0f} rows/s, "
+                f"peak {result['peak_mb']:6.1f} MB, file {result['file_mb']:6.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,43 @@
+"""
+Benchmark: vectorized IRR over many cash-flow rows
+
+Usage (from backend/):
+    python -m benchmarks.bench_irr [ROWS]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from app.services.modeling.irr import irr, npv
+
+
+def make_flows(rows: int, periods: int = 8, seed: int = 11) -> np.ndarray:
+    """Entry outflow, noisy interim flows (recaps and fees) and an exit inflow"""
+    rng = np.random.default_rng(seed)
+    flows = np.zeros((rows, periods))
+    flows[:, 0] = -rng.uniform(50, 150, rows)
+    flows[:, 1:-1] = rng.normal(5, 20, (rows, periods - 2))
+    flows[:, -1] = rng.uniform(0, 400, rows)
+    return flows
+
+
+def main(rows: int = 100_000) -> None:
+    flows = make_flows(rows)
+
+    start = time.perf_counter()
+    rates = irr(flows)
+    elapsed = time.perf_counter() - start
+
+    solved = np.isfinite(rates) & (rates > -1)
+    residual = np.abs(npv(rates[solved], flows[solved])) / np.abs(flows[solved]).sum(axis=1)
+    print(f"rows={rows}")
+    print(f"  total           : {elapsed * 1e3:10.1f} ms")
+    print(f"  per row         : {elapsed / rows * 1e6:10.2f} us")
+    print(f"  solved          : {np.isfinite(rates).mean() * 100:10.2f} %")
+    print(f"  median |NPV|/sum: {np.median(residual):10.2e}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
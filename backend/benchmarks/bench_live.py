@@ -0,0 +1,82 @@
+"""
+Benchmark: live slider drag over HTTP vs the WebSocket channel
+
+Replays a slider drag of EVENTS wacc values, two ways:
+
+    http       one PATCH /what-if/{session_id} per event, each waiting for
+               its response, as the UI does without the live channel
+    websocket  every event sent on /analysis/live as it happens; the server
+               debounces them and answers with merged diffs
+
+For the WebSocket run, events are paced PACE_MS apart (0 sends them back to
+back) and the drag ends when the diff carrying the last event's seq arrives.
+Reports wall time, recomputes and bytes received. Runs in process against a
+temporary SQLite database.
+
+Usage (from backend/):
+    python -m benchmarks.bench_live [EVENTS] [PACE_MS]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_live.db")
+os.environ.setdefault("DATABASE_CREATE_TABLES", "true")
+os.environ.setdefault("COMPUTE_WORKERS", "0")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+def drag(events: int):
+    return [round(0.08 + 0.02 * i / max(events - 1, 1), 6) for i in range(events)]
+
+
+def over_http(client: TestClient, events: int):
+    session_id = client.post("/api/v1/analysis/what-if", json={"ticker": "AAPL"}).json()["session_id"]
+    received = 0
+    started = time.perf_counter()
+    for wacc in drag(events):
+        response = client.patch(f"/api/v1/analysis/what-if/{session_id}", json={"changes": {"wacc": wacc}})
+        received += len(response.content)
+    return time.perf_counter() - started, events, received
+
+
+def over_websocket(client: TestClient, events: int, pace: float):
+    with client.websocket_connect("/api/v1/analysis/live") as ws:
+        ws.send_text(json.dumps({"type": "open", "ticker": "AAPL"}))
+        ws.receive_text()
+        started = time.perf_counter()
+        for seq, wacc in enumerate(drag(events)):
+            ws.send_text(json.dumps({"type": "update", "changes": {"wacc": wacc}, "seq": seq}))
+            if pace:
+                time.sleep(pace)
+        recomputes = received = 0
+        while True:
+            text = ws.receive_text()
+            recomputes += 1
+            received += len(text)
+            if json.loads(text).get("seq") == events - 1:
+                break
+        return time.perf_counter() - started, recomputes, received
+
+
+def main(events: int = 200, pace_ms: float = 5.0) -> None:
+    print(f"events={events} pace_ms={pace_ms}")
+    with TestClient(app) as client:
+        over_http(client, 10)  # warm up
+        for name, run in (
+            ("http", lambda: over_http(client, events)),
+            ("websocket", lambda: over_websocket(client, events, pace_ms / 1000)),
+        ):
+            elapsed, recomputes, received = run()
+            print(f"  {name:9s}  {elapsed * 1e3:8.1f} ms  {recomputes:4d} recomputes  {received / 1024:8.1f} KiB received")
+
+
+if __name__ == "__main__":
+    main(*(float(arg) if i else int(arg) for i, arg in enumerate(sys.argv[1:])))
@@ -0,0 +1,70 @@
+"""
+Benchmark: /api/v1/lbo/calculate response encoding
+
+Times turning one LBOOutputs into response bytes three ways:
+
+    response_model  FastAPI's path for a returned model: validate against the
+                    route's response_model, serialize to Python, json.dumps
+    orjson default  the same path rendered by FastJSONResponse (the app's
+                    default response class for plain dict results)
+    direct          FastJSONResponse(outputs) returned by the handler, which
+                    skips re-validation and encodes the model as it is
+
+Usage (from backend/):
+    python -m benchmarks.bench_response_encoding [CALLS]
+"""
+
+import asyncio
+import sys
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.api.v1.routes.lbo import LBORequest, build_lbo_inputs
+from app.core.responses import FastJSONResponse
+from app.main import app
+from app.services.modeling.lbo import LBOModel
+
+
+def route_field(path: str):
+    return next(route.response_field for route in app.routes if getattr(route, "path", None) == path)
+
+
+async def best_us(encode, calls: int, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(calls):
+            await encode()
+        best = min(best, time.perf_counter() - started)
+    return best / calls * 1e6
+
+
+async def run(calls: int) -> None:
+    outputs = LBOModel(build_lbo_inputs(LBORequest(ticker="AAPL"))).run()
+    field = route_field("/api/v1/lbo/calculate")
+
+    async def response_model():
+        content = await serialize_response(field=field, response_content=outputs)
+        return JSONResponse(content).body
+
+    async def orjson_default():
+        content = await serialize_response(field=field, response_content=outputs)
+        return FastJSONResponse(content).body
+
+    async def direct():
+        return FastJSONResponse(outputs).body
+
+    sizes = {len(await encode()) for encode in (response_model, orjson_default, direct)}
+    print(f"calls={calls} years={len(outputs.projections)} bytes={'/'.join(map(str, sorted(sizes)))}")
+    for label, encode in (("response_model", response_model), ("orjson default", orjson_default), ("direct", direct)):
+        print(f"  {label:<15}: {await best_us(encode, calls):8.2f} us")
+
+
+def main(calls: int = 5000) -> None:
+    asyncio.run(run(calls))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,99 @@
+"""
+Benchmark: saved result storage, JSON vs columnar
+
+Compares the stored size of DCF and LBO result payloads and the time to
+load them back from a SQLite table, in both formats.
+
+Usage (from backend/):
+    python -m benchmarks.bench_result_storage [ROWS]
+"""
+
+import json
+import sys
+import time
+
+import sqlalchemy as sa
+
+from app.schemas.analysis import DCFInputs
+from app.schemas.lbo import LBOInputs
+from app.services.modeling.dcf import DCFModel
+from app.services.modeling.lbo import LBOModel
+from app.utils.columnar import decode_results, encode_results
+
+
+def make_payloads() -> dict:
+    dcf_inputs = DCFInputs(
+        ticker="BENCH", base_revenue=394e9, revenue_growth=0.08, ebitda_margin=0.30,
+        net_margin=0.20, capex_percent=0.05, da_percent=0.03, nwc_percent=0.02,
+        tax_rate=0.21, wacc=0.09, terminal_growth_rate=0.025, projection_years=10,
+        net_debt=50e9, shares_outstanding=15.5e9, current_price=178.5
+    )
+    lbo_inputs = LBOInputs(
+        ticker="BENCH", company_name="Bench Inc.", purchase_price=1.2e12, purchase_multiple=10.0,
+        exit_multiple=10.0, debt_percent=0.6, interest_rate=0.06, base_revenue=394e9,
+        revenue_growth=0.08, ebitda_margin=0.30, capex_percent=0.05, nwc_percent=0.02,
+        tax_rate=0.21, hold_period=7, management_fees=0.02
+    )
+    return {
+        "dcf": DCFModel(dcf_inputs).run().dict(),
+        "lbo": LBOModel(lbo_inputs).run().dict(),
+    }
+
+
+def time_per_call(function, repeat: int = 2000) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def load_latency(payload: dict, rows: int) -> dict:
+    """Seconds to read every row back into Python dicts, per format"""
+    engine = sa.create_engine("sqlite://")
+    metadata = sa.MetaData()
+    table = sa.Table(
+        "results", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("as_json", sa.JSON),
+        sa.Column("as_blob", sa.LargeBinary),
+    )
+    metadata.create_all(engine)
+    blob = encode_results(payload)
+    with engine.begin() as connection:
+        connection.execute(table.insert(), [{"as_json": payload, "as_blob": blob}] * rows)
+
+    timings = {}
+    with engine.connect() as connection:
+        start = time.perf_counter()
+        loaded = [row[0] for row in connection.execute(sa.select(table.c.as_json))]
+        timings["json"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        decoded = [decode_results(row[0]) for row in connection.execute(sa.select(table.c.as_blob))]
+        timings["columnar"] = time.perf_counter() - start
+
+    assert loaded[0] == decoded[0]
+    return timings
+
+
+def main(rows: int = 5000) -> None:
+    for name, payload in make_payloads().items():
+        as_json = json.dumps(payload).encode()
+        as_blob = encode_results(payload)
+        assert decode_results(as_blob) == payload
+
+        encode_json = time_per_call(lambda: json.dumps(payload))
+        encode_blob = time_per_call(lambda: encode_results(payload))
+        decode_json = time_per_call(lambda: json.loads(as_json))
+        decode_blob = time_per_call(lambda: decode_results(as_blob))
+        loads = load_latency(payload, rows)
+
+        print(f"{name} results")
+        print(f"  size json/columnar  : {len(as_json):8d} / {len(as_blob):8d} bytes  ({len(as_json) / len(as_blob):.1f}x)")
+        print(f"  encode json/columnar: {encode_json * 1e6:8.1f} / {encode_blob * 1e6:8.1f} us")
+        print(f"  decode json/columnar: {decode_json * 1e6:8.1f} / {decode_blob * 1e6:8.1f} us")
+        print(f"  load {rows} rows      : {loads['json'] * 1e3:8.1f} / {loads['columnar'] * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,117 @@
+"""
+Benchmark: saved-analysis throughput under concurrent load
+
+Drives the /api/v1/saved routes in-process with a mix of saves, reads and
+lists, and samples event-loop lag while they run (a blocking database call
+shows up as lag). Uses DATABASE_URL when set, otherwise a throwaway SQLite
+file in WAL mode.
+
+Usage (from backend/):
+    python -m benchmarks.bench_saved_analyses [REQUESTS] [CONCURRENCY]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+
+from app.database import Base, SessionLocal, dispose_async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.analysis import User  # noqa: E402
+
+
+def make_dcf_payload(i: int) -> dict:
+    projections = [
+        {"Year": year, "Revenue": 100e9 * 1.08 ** year, "FCF": 20e9 * 1.08 ** year}
+        for year in range(1, 11)
+    ]
+    return {
+        "ticker": f"T{i % 500}",
+        "company_name": f"Company {i % 500}",
+        "current_price": 150.0,
+        "fair_value": 180.0,
+        "upside_percent": 20.0,
+        "enterprise_value": 2e12,
+        "equity_value": 1.9e12,
+        "dcf_results": {"projections": projections},
+    }
+
+
+def setup_database():
+    from app.models import analysis  # noqa: F401  (registers the tables)
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if db.get(User, 1) is None:
+            db.add(User(id=1, email="bench@alphaforge.com", username="bench", hashed_password="x"))
+            db.commit()
+    finally:
+        db.close()
+
+
+async def monitor_loop_lag(samples: list, stop: asyncio.Event, interval: float = 0.005):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - started - interval)
+
+
+async def run(requests: int, concurrency: int) -> None:
+    latencies = {"save": [], "get": [], "list": []}
+    lag, stop = [], asyncio.Event()
+    semaphore = asyncio.Semaphore(concurrency)
+    saved_ids = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            async with semaphore:
+                op = ("save", "save", "get", "list")[i % 4] if saved_ids else "save"
+                started = time.perf_counter()
+                if op == "save":
+                    response = await client.post("/api/v1/saved/dcf/save", json=make_dcf_payload(i))
+                    response.raise_for_status()
+                    saved_ids.append(response.json()["id"])
+                elif op == "get":
+                    response = await client.get(f"/api/v1/saved/dcf/{saved_ids[i % len(saved_ids)]}")
+                else:
+                    response = await client.get("/api/v1/saved/dcf/list")
+                response.raise_for_status()
+                latencies[op].append(time.perf_counter() - started)
+
+        monitor = asyncio.create_task(monitor_loop_lag(lag, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await monitor
+    await dispose_async_engine()
+
+    print(f"database={os.environ['DATABASE_URL']}")
+    print(f"requests={requests} concurrency={concurrency}")
+    print(f"  throughput      : {requests / elapsed:10.1f} req/s")
+    for op, values in latencies.items():
+        if values:
+            p50, p99 = np.percentile(values, [50, 99]) * 1e3
+            print(f"  {op:<6} p50/p99   : {p50:8.2f} / {p99:8.2f} ms  (n={len(values)})")
+    if lag:
+        print(f"  loop lag max    : {max(lag) * 1e3:10.2f} ms")
+
+
+def main(requests: int = 1000, concurrency: int = 50) -> None:
+    setup_database()
+    asyncio.run(run(requests, concurrency))
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,115 @@
+"""
+Benchmark: API cold start
+
+Measures, each in a fresh interpreter:
+
+    import app.main   time to import the application (median of RUNS)
+    first /health     time from launching uvicorn until /health answers
+
+and profiles the import with ``python -X importtime``, reporting the
+slowest top-level packages and app modules by cumulative import time.
+Pass ``--report PATH`` to also write the results as a text report; the
+report under benchmarks/reports is kept in the repo so import-time
+regressions show up in review.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup [RUNS] [--report PATH]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from urllib.error import URLError
+from urllib.request import urlopen
+
+PORT = 8766
+TOP = 15
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def import_seconds() -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def first_health_seconds(timeout: float = 60.0) -> float:
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urlopen(f"http://127.0.0.1:{PORT}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError("server did not answer /health")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def import_profile() -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) for every module imported by app.main"""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if self_us.isdigit():
+            modules.append((name, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def summarize(modules: List[Tuple[str, int, int]]) -> Dict[str, List[Tuple[str, float]]]:
+    """Slowest third-party packages (summed self time) and app modules (cumulative)"""
+    packages: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    app_modules = {name: cumulative for name, _, cumulative in modules if name.startswith("app.")}
+    return {
+        "packages": [(name, us / 1e3) for name, us in sorted(packages.items(), key=lambda item: -item[1])[:TOP]],
+        "app modules": [(name, us / 1e3) for name, us in sorted(app_modules.items(), key=lambda item: -item[1])[:TOP]],
+    }
+
+
+def main(runs: int = 5, report: str = None) -> None:
+    imports = [import_seconds() for _ in range(runs)]
+    health = [first_health_seconds() for _ in range(runs)]
+    modules = import_profile()
+
+    lines = [
+        f"runs={runs} python={sys.version.split()[0]} cpus={os.cpu_count()}",
+        f"  import app.main : median {statistics.median(imports) * 1e3:7.0f} ms  (min {min(imports) * 1e3:.0f} ms)",
+        f"  first /health   : median {statistics.median(health) * 1e3:7.0f} ms  (min {min(health) * 1e3:.0f} ms)",
+        f"  modules imported: {len(modules)}",
+    ]
+    for title, rows in summarize(modules).items():
+        lines.append(f"  slowest {title} (-X importtime, ms):")
+        lines += [f"    {name:<45} {ms:8.1f}" for name, ms in rows]
+
+    print("\n".join(lines))
+    if report:
+        with open(report, "w") as handle:
+            handle.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    report_path = None
+    if "--report" in args:
+        index = args.index("--report")
+        report_path = args[index + 1]
+        del args[index:index + 2]
+    main(int(args[0]) if args else 5, report_path)
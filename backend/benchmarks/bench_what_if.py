@@ -0,0 +1,80 @@
+"""
+Benchmark: what-if slider updates
+
+Times one assumption change per call, two ways:
+
+    full     the UI re-posts every input: validate DCFInputs/LBOInputs, run
+             DCFModel/LBOModel from scratch (memoization off) and encode the
+             full outputs
+    session  a what-if session applies the change to its dependency graph
+             and encodes the diff-only payload
+
+and reports the response size of each.
+
+Usage (from backend/):
+    python -m benchmarks.bench_what_if [CALLS]
+"""
+
+import sys
+import time
+
+from app.api.v1.routes.lbo import LBORequest, build_lbo_inputs
+from app.api.v1.routes.what_if import build_graph
+from app.config import settings
+from app.core.responses import dumps
+from app.schemas.analysis import DCFInputs
+from app.schemas.lbo import LBOInputs
+from app.services.data.mock_data import MockDataService
+from app.services.modeling.dcf import DCFModel
+from app.services.modeling.lbo import LBOModel
+
+# (model, slider, two values it alternates between)
+SLIDERS = (
+    ("dcf", "wacc", (0.08, 0.09)),
+    ("dcf", "tax_rate", (0.21, 0.25)),
+    ("dcf", "revenue_growth", (0.08, 0.10)),
+    ("lbo", "exit_multiple", (10.0, 12.0)),
+    ("lbo", "interest_rate", (0.06, 0.07)),
+)
+
+
+def best_us(step, calls: int, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for call in range(calls):
+            step(call)
+        best = min(best, time.perf_counter() - started)
+    return best / calls * 1e6
+
+
+def main(calls: int = 2000) -> None:
+    settings.MODEL_CACHE_ENABLED = False
+    base = {
+        "dcf": DCFInputs(**MockDataService().get_dcf_inputs("AAPL")).model_dump(),
+        "lbo": build_lbo_inputs(LBORequest(ticker="AAPL")).model_dump(),
+    }
+    models = {"dcf": (DCFInputs, DCFModel), "lbo": (LBOInputs, LBOModel)}
+
+    print(f"calls={calls}")
+    for model, field, values in SLIDERS:
+        inputs_model, model_class = models[model]
+        graph = build_graph(model, "AAPL", {})
+
+        def full(call):
+            inputs = inputs_model(**{**base[model], field: values[call % 2]})
+            return dumps(model_class(inputs).run())
+
+        def session(call):
+            return dumps(graph.update({field: values[call % 2]}))
+
+        session(0)
+        full_bytes, session_bytes = len(full(1)), len(session(1))
+        print(
+            f"  {model} {field:<15}: full {best_us(full, calls):7.1f} us {full_bytes:5d} B  |  "
+            f"session {best_us(session, calls):7.1f} us {session_bytes:5d} B"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
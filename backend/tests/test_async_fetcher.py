@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.data.async_fetcher import AsyncMarketDataFetcher, StubHistoryProvider, TokenBucket
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    async def scenario():
+        bucket = TokenBucket(rate=50.0, capacity=5)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        burst = time.monotonic() - start
+        for _ in range(5):
+            await bucket.acquire()
+        return burst, time.monotonic() - start
+
+    burst, total = asyncio.run(scenario())
+    assert burst < 0.05
+    # Five more tokens at 50 per second
+    assert total >= 0.09
+
+
+def test_token_bucket_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, capacity=1)
+    with pytest.raises(ValueError):
+        asyncio.run(TokenBucket(rate=1.0, capacity=2).acquire(3))
+
+
+def test_fetcher_batches_and_coalesces_concurrent_requests():
+    provider = StubHistoryProvider(latency=0.05)
+    fetcher = AsyncMarketDataFetcher(provider, TokenBucket(rate=100.0, capacity=10), batch_size=2)
+
+    async def scenario():
+        return await asyncio.gather(
+            fetcher.get_history(["aapl", "MSFT", "AAPL", "NVDA"]),
+            fetcher.get_history(["MSFT", "NVDA"]),
+        )
+
+    first, second = asyncio.run(scenario())
+    assert set(first) == {"AAPL", "MSFT", "NVDA"}
+    assert second == {symbol: first[symbol] for symbol in ("MSFT", "NVDA")}
+    # Two batches for three distinct symbols; the second request fetched nothing itself
+    assert sorted(provider.calls) == [("AAPL", "MSFT"), ("NVDA",)]
+    assert fetcher.stats == {"requested": 5, "coalesced": 2, "fetched": 3, "batches": 2}
+
+
+def test_failed_batch_does_not_strand_coalesced_waiters():
+    class FailingProvider:
+        def fetch_history(self, symbols, period):
+            time.sleep(0.02)
+            raise RuntimeError("upstream down")
+
+    fetcher = AsyncMarketDataFetcher(FailingProvider(), TokenBucket(rate=100.0, capacity=10))
+
+    async def scenario():
+        first = asyncio.create_task(fetcher.get_history(["AAPL"]))
+        await asyncio.sleep(0)
+        second = await asyncio.wait_for(fetcher.get_history(["AAPL"]), timeout=1.0)
+        return await first, second
+
+    # Symbols whose fetch failed are omitted for every waiter
+    assert asyncio.run(scenario()) == ({}, {})
+    assert fetcher._in_flight == {}
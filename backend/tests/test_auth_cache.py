@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.core import auth_cache
+from app.core.auth_cache import TTLCache, invalidate_user, user_cache
+from app.models.user import User, UserTier
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(auth_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def test_entries_expire_no_later_than_their_token(clock):
+    cache = TTLCache(ttl=60, max_entries=10)
+    cache.set("token", "alice")
+    # A token expiring sooner than the cache TTL is dropped with it
+    cache.set("short-lived", "bob", ttl=5)
+    cache.set("expired", "carol", ttl=-1)
+
+    clock.now += 6
+    assert cache.get("token") == "alice"
+    assert cache.get("short-lived") is None
+    assert cache.get("expired") is None
+
+    clock.now += 60
+    assert cache.get("token") is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(clock):
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_invalidate_user_drops_only_that_user():
+    user_cache.set("alice", User(id=1, username="alice"))
+    user_cache.set("bob", User(id=2, username="bob"))
+
+    assert invalidate_user(1) == 1
+    assert user_cache.get("alice") is None
+    assert user_cache.get("bob").id == 2
+
+
+def test_orm_updates_and_deletes_invalidate_cached_rows():
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    with Session(engine, expire_on_commit=False) as session:
+        user = User(email="a@example.com", username="alice", hashed_password="x")
+        session.add(user)
+        session.commit()
+
+        user_cache.set("alice", user)
+        user.tier = UserTier.PREMIUM
+        session.commit()
+        # The upgrade is seen on the next request, not after the cache TTL
+        assert user_cache.get("alice") is None
+
+        user_cache.set("alice", user)
+        session.delete(user)
+        session.commit()
+        assert user_cache.get("alice") is None
@@ -0,0 +1,113 @@
+import time as real_time
+
+import pytest
+
+from app.services.data import cache as cache_module
+from app.services.data.cache import CacheEntry, MarketDataCache, MemoryCache, PartialResult, SQLiteCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+class Fetcher:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"call": self.calls}
+
+
+def _wait_for(condition, timeout: float = 2.0):
+    deadline = real_time.monotonic() + timeout
+    while not condition():
+        assert real_time.monotonic() < deadline, "timed out"
+        real_time.sleep(0.005)
+
+
+def test_fresh_stale_and_expired_entries(clock):
+    cache = MarketDataCache([MemoryCache()], ttls={"quote": (10, 20)})
+    fetch = Fetcher()
+
+    assert cache.get_or_fetch("quote", "AAPL", fetch) == {"call": 1}
+    clock.now += 9
+    assert cache.get_or_fetch("quote", "AAPL", fetch) == {"call": 1}
+    assert fetch.calls == 1
+
+    # Stale: served at once while one background refresh replaces it
+    clock.now += 2
+    assert cache.get_or_fetch("quote", "AAPL", fetch) == {"call": 1}
+    _wait_for(lambda: cache.stats["quote"]["refreshes"] == 1)
+    assert cache.get_or_fetch("quote", "AAPL", fetch) == {"call": 2}
+
+    # Past the stale window: fetched inline
+    clock.now += 31
+    assert cache.get_or_fetch("quote", "AAPL", fetch) == {"call": 3}
+    stats = cache.stats["quote"]
+    assert (stats["hits"], stats["stale_hits"], stats["misses"]) == (2, 1, 2)
+
+
+def test_slower_layer_hits_are_promoted(clock, tmp_path):
+    memory, sqlite = MemoryCache(), SQLiteCache(str(tmp_path / "cache.sqlite"))
+    cache = MarketDataCache([memory, sqlite], ttls={"quote": (10, 20)})
+    sqlite.set("quote:MSFT", CacheEntry({"price": 1.0}, clock.now + 10, clock.now + 30))
+
+    assert cache.get_or_fetch("quote", "MSFT", Fetcher()) == {"price": 1.0}
+    assert memory.get("quote:MSFT").value == {"price": 1.0}
+    assert cache.stats["quote"]["sqlite_hits"] == 1
+
+    # A fresher copy written by another worker wins over a stale local one
+    clock.now += 15
+    sqlite.set("quote:MSFT", CacheEntry({"price": 2.0}, clock.now + 10, clock.now + 30))
+    assert cache.get_or_fetch("quote", "MSFT", Fetcher()) == {"price": 2.0}
+    assert memory.get("quote:MSFT").value == {"price": 2.0}
+
+
+def test_partial_results_are_not_cached(clock):
+    cache = MarketDataCache([MemoryCache()])
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            raise PartialResult({"S&P 500": 1.0}, {"NASDAQ": "timeout"})
+        return {"S&P 500": 1.0, "NASDAQ": 2.0}
+
+    assert cache.get_or_fetch("market_data", "indices", fetch) == {"S&P 500": 1.0}
+    assert cache.get_or_fetch("market_data", "indices", fetch) == {"S&P 500": 1.0, "NASDAQ": 2.0}
+    assert cache.get_or_fetch("market_data", "indices", fetch) == {"S&P 500": 1.0, "NASDAQ": 2.0}
+    assert len(calls) == 2
+    assert cache.stats["market_data"]["partial"] == 1
+
+
+def test_sqlite_layer_purges_expired_rows(clock, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    layer = SQLiteCache(path, purge_interval=60)
+    layer.set("old", CacheEntry(1, clock.now + 1, clock.now + 2))
+
+    def rows():
+        return layer._connection().execute("SELECT COUNT(*) FROM market_cache").fetchone()[0]
+
+    clock.now += 10
+    layer.set("new", CacheEntry(2, clock.now + 1, clock.now + 2))
+    assert rows() == 2  # Within the purge interval
+
+    clock.now += 60
+    layer.set("newer", CacheEntry(3, clock.now + 1, clock.now + 2))
+    assert rows() == 1
+
+    # Reopening the file (a new worker) sweeps it straight away
+    clock.now += 10
+    assert SQLiteCache(path)._connection().execute("SELECT COUNT(*) FROM market_cache").fetchone()[0] == 0
@@ -0,0 +1,85 @@
+import importlib.util
+import math
+from pathlib import Path
+
+import pytest
+
+from app.utils.columnar import decode_results, encode_results
+
+MIGRATION = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "0003_columnar_saved_results.py"
+
+
+def _frozen_codec():
+    """The v1 codec vendored in migration 0003"""
+    spec = importlib.util.spec_from_file_location("migration_0003", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _same(left, right) -> bool:
+    """Equal with matching types, NaN equal to NaN"""
+    if type(left) is not type(right):
+        return False
+    if isinstance(left, float):
+        return left == right or (math.isnan(left) and math.isnan(right))
+    if isinstance(left, dict):
+        return list(left) == list(right) and all(_same(left[key], right[key]) for key in left)
+    if isinstance(left, list):
+        return len(left) == len(right) and all(_same(a, b) for a, b in zip(left, right))
+    return left == right
+
+
+def _projections(years=5):
+    return [
+        {"Year": year, "Revenue": 100.0 * 1.1 ** year, "EBITDA": 30.0 * 1.1 ** year, "FCF": 12.5 * year}
+        for year in range(1, years + 1)
+    ]
+
+
+CASES = {
+    "projections": {"value_per_share": 101.5, "projections": _projections()},
+    # Whole-valued floats arrive as JSON ints, so one column can hold both
+    "mixed_int_float": {"projections": [{"Year": 1, "Revenue": 100}, {"Year": 2, "Revenue": 110.5}]},
+    "ints_with_nulls": {"rows": [{"Year": 1, "Debt": 5}, {"Year": 2, "Debt": None}, {"Year": 3, "Debt": 7}]},
+    "nan_and_null": {"rows": [{"a": float("nan"), "b": None}, {"a": None, "b": 2.0}, {"a": 1.5, "b": float("nan")}]},
+    "infinities": {"rows": [{"a": float("inf")}, {"a": float("-inf")}]},
+    "large_ints": {"rows": [{"a": 2 ** 60}, {"a": 1}]},
+    "bools_stay_json": {"rows": [{"flag": True, "x": 1.0}, {"flag": False, "x": 2.0}]},
+    "ragged_rows": {"rows": [{"a": 1.0}, {"a": 2.0, "b": 3.0}]},
+    "marker_keys": {"__table__": 3, "nested": {"__literal__": [1, 2]}},
+    "no_tables": {"irr": 0.215, "sources": {"debt": 600.0, "equity": 400.0}, "notes": ["a", "b"]},
+    "nested_tables": {"scenarios": [{"name": "bear", "projections": _projections(3)}]},
+    "empty": {},
+}
+
+
+@pytest.mark.parametrize("results", CASES.values(), ids=CASES.keys())
+def test_round_trip_is_exact(results):
+    assert _same(decode_results(encode_results(results)), results)
+
+
+def test_tables_are_stored_as_blocks():
+    results = {"projections": _projections(40)}
+    assert len(encode_results(results)) < len(repr(results)) / 2
+
+
+def test_frozen_codec_output_still_decodes():
+    frozen = _frozen_codec()
+    results = CASES["projections"]
+    assert _same(decode_results(frozen.encode_results(results)), results)
+
+
+@pytest.mark.parametrize("results", CASES.values(), ids=CASES.keys())
+def test_frozen_codec_reads_current_payloads(results):
+    """Downgrading past migration 0003 decodes what the app wrote since"""
+    frozen = _frozen_codec()
+    assert _same(
+        frozen.decode_results(encode_results(results)),
+        frozen.decode_results(frozen.encode_results(results))
+    )
+
+
+def test_rejects_other_payloads():
+    with pytest.raises(ValueError):
+        decode_results(b"XXXX" + bytes(5))
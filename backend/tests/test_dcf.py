@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.schemas.analysis import DCFInputs
+from app.services.modeling.dcf import PROJECTION_LINES, BatchDCFModel, DCFModel
+from app.services.modeling import sensitivity
+from app.services.modeling.sensitivity import MAX_GRID_CELL_YEARS, SensitivityAnalysis
+
+RTOL = 1e-12
+VALUATION_FIELDS = ('pv_fcf', 'pv_terminal', 'enterprise_value', 'equity_value', 'value_per_share')
+
+
+@pytest.fixture(autouse=True)
+def _no_model_cache(monkeypatch):
+    # Compare the models, not cached results
+    monkeypatch.setattr(settings, "MODEL_CACHE_ENABLED", False)
+
+
+def _random_inputs(rng: np.random.Generator) -> DCFInputs:
+    return DCFInputs(
+        ticker="TEST",
+        base_revenue=rng.uniform(1e6, 1e12),
+        revenue_growth=rng.uniform(-0.2, 0.4),
+        ebitda_margin=rng.uniform(-0.1, 0.6),
+        net_margin=rng.uniform(0.0, 0.3),
+        capex_percent=rng.uniform(0.0, 0.15),
+        da_percent=rng.uniform(0.0, 0.1),
+        nwc_percent=rng.uniform(0.0, 0.05),
+        tax_rate=rng.uniform(0.0, 0.35),
+        # Includes non-positive WACCs and WACC <= growth, which take the fallbacks
+        wacc=rng.uniform(-0.02, 0.15),
+        terminal_growth_rate=rng.uniform(0.0, 0.06),
+        projection_years=int(rng.integers(1, 51)),
+        net_debt=rng.uniform(-1e10, 1e11),
+        shares_outstanding=rng.choice([0.0, rng.uniform(1e6, 1e10)]),
+        current_price=rng.uniform(1.0, 500.0),
+    )
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_single_model_matches_batch(seed):
+    inputs = _random_inputs(np.random.default_rng(seed))
+
+    outputs = DCFModel(inputs).run()
+    batch = BatchDCFModel.from_inputs([inputs])
+    valuation = batch.run()
+
+    for field in VALUATION_FIELDS:
+        np.testing.assert_allclose(getattr(outputs, field), valuation[field][0], rtol=RTOL, err_msg=field)
+    table = batch.projection_table(0)
+    for line in PROJECTION_LINES:
+        np.testing.assert_allclose(outputs.projections[line], table[line], rtol=RTOL, err_msg=line)
+
+
+def test_terminal_value_matches_batch():
+    inputs = _random_inputs(np.random.default_rng(7))
+    valuation = BatchDCFModel.from_inputs([inputs]).run()
+    np.testing.assert_allclose(
+        DCFModel(inputs).calculate_terminal_value(), valuation['terminal_value'][0], rtol=RTOL
+    )
+
+
+def test_batch_of_mixed_horizons_matches_single_models():
+    rng = np.random.default_rng(11)
+    inputs = [_random_inputs(rng) for _ in range(20)]
+    valuation = BatchDCFModel.from_inputs(inputs).run()
+
+    for index, row in enumerate(inputs):
+        outputs = DCFModel(row).run()
+        np.testing.assert_allclose(outputs.enterprise_value, valuation['enterprise_value'][index], rtol=RTOL)
+
+
+def test_wacc_terminal_grid_matches_single_models():
+    inputs = _random_inputs(np.random.default_rng(3))
+    wacc = np.array([-0.01, 0.0, 0.03, 0.08, 0.12])
+    growth = np.array([0.0, 0.02, 0.05])
+    grid = SensitivityAnalysis(inputs).grid('wacc', wacc, 'terminal_growth_rate', growth, output='enterprise_value')
+
+    for x, rate in enumerate(wacc):
+        for y, g in enumerate(growth):
+            cell = inputs.model_copy(update={'wacc': float(rate), 'terminal_growth_rate': float(g)})
+            np.testing.assert_allclose(grid[x, y], DCFModel(cell).run().enterprise_value, rtol=RTOL)
+
+
+def test_chunked_batch_grid_matches_single_models(monkeypatch):
+    inputs = _random_inputs(np.random.default_rng(9)).model_copy(update={'shares_outstanding': 0.0})
+    growth = np.linspace(-0.1, 0.3, 7)
+    margin = np.linspace(0.05, 0.5, 3)
+    # A few rows per chunk, with a ragged final chunk
+    monkeypatch.setattr(sensitivity, 'GRID_CHUNK_CELL_YEARS', 2 * margin.size * inputs.projection_years)
+    grid = SensitivityAnalysis(inputs).grid('revenue_growth', growth, 'ebitda_margin', margin)
+
+    for x, g in enumerate(growth):
+        for y, m in enumerate(margin):
+            cell = inputs.model_copy(update={'revenue_growth': float(g), 'ebitda_margin': float(m)})
+            np.testing.assert_allclose(grid[x, y], DCFModel(cell).run().value_per_share, rtol=RTOL)
+
+
+def test_batch_grid_is_bounded_in_cell_years():
+    inputs = _random_inputs(np.random.default_rng(5)).model_copy(update={'projection_years': 50})
+    side = int(np.sqrt(MAX_GRID_CELL_YEARS / 50)) + 1
+    axis = np.linspace(0.0, 0.1, side)
+    with pytest.raises(ValueError, match="cell-years"):
+        SensitivityAnalysis(inputs).grid('revenue_growth', axis, 'ebitda_margin', axis)
+    # The WACC x terminal growth grid projects once, so only its cell count is bounded
+    assert SensitivityAnalysis(inputs).grid('wacc', axis, 'terminal_growth_rate', axis).shape == (side, side)
+
+
+def test_invalid_horizon_is_rejected_and_masked():
+    inputs = _random_inputs(np.random.default_rng(5)).model_copy(update={'projection_years': 0})
+    with pytest.raises(ValueError):
+        DCFModel(inputs).run()
+    assert np.isnan(BatchDCFModel.from_inputs([inputs]).run()['enterprise_value'][0])
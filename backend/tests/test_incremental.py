@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.schemas.analysis import DCFInputs
+from app.schemas.lbo import LBOInputs
+from app.services.modeling.dcf import MAX_PROJECTION_YEARS, DCFModel
+from app.services.modeling.incremental import IncrementalDCF, IncrementalLBO
+from app.services.modeling.lbo import MAX_HOLD_PERIOD, LBOModel
+
+RTOL = 1e-12
+
+
+@pytest.fixture(autouse=True)
+def _no_model_cache(monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_CACHE_ENABLED", False)
+
+
+def _dcf_inputs(**overrides) -> DCFInputs:
+    values = dict(
+        ticker="TEST", base_revenue=1e9, revenue_growth=0.08, ebitda_margin=0.3, net_margin=0.15,
+        capex_percent=0.05, da_percent=0.03, nwc_percent=0.02, tax_rate=0.21, wacc=0.09,
+        terminal_growth_rate=0.025, projection_years=10, net_debt=2e8, shares_outstanding=1e8,
+        current_price=50.0,
+    )
+    return DCFInputs(**{**values, **overrides})
+
+
+def _lbo_inputs(**overrides) -> LBOInputs:
+    values = dict(
+        ticker="TEST", company_name="Test", purchase_price=3e9, purchase_multiple=10.0, exit_multiple=10.0,
+        debt_percent=0.6, interest_rate=0.06, base_revenue=1e9, revenue_growth=0.08, ebitda_margin=0.3,
+        capex_percent=0.05, nwc_percent=0.02, tax_rate=0.21, hold_period=5, management_fees=0.02,
+    )
+    return LBOInputs(**{**values, **overrides})
+
+
+@pytest.mark.parametrize("changes", [
+    {"wacc": 0.07}, {"tax_rate": 0.3}, {"projection_years": 25}, {"wacc": -0.01}, {"terminal_growth_rate": 0.2},
+])
+def test_dcf_graph_matches_model_after_update(changes):
+    graph = IncrementalDCF(_dcf_inputs())
+    graph.update(changes)
+
+    expected = DCFModel(_dcf_inputs(**changes)).run()
+    outputs = graph.outputs()
+    for field in ("pv_fcf", "pv_terminal", "enterprise_value", "equity_value", "value_per_share"):
+        np.testing.assert_allclose(getattr(outputs, field), getattr(expected, field), rtol=RTOL, err_msg=field)
+    np.testing.assert_allclose(outputs.projections.values, expected.projections.values, rtol=RTOL)
+
+
+def test_horizons_are_capped():
+    with pytest.raises(ValueError):
+        IncrementalDCF(_dcf_inputs(projection_years=MAX_PROJECTION_YEARS + 1))
+    with pytest.raises(ValueError):
+        IncrementalLBO(_lbo_inputs(hold_period=MAX_HOLD_PERIOD + 1))
+    with pytest.raises(ValueError):
+        LBOModel(_lbo_inputs(hold_period=MAX_HOLD_PERIOD + 1)).run()
+
+    graph = IncrementalDCF(_dcf_inputs())
+    with pytest.raises(ValueError):
+        graph.update({"projection_years": 10 ** 7})
+    assert graph.inputs["projection_years"] == 10
+
+
+def test_lbo_without_equity_is_rejected_like_the_model():
+    with pytest.raises(ValueError, match="equity investment"):
+        LBOModel(_lbo_inputs(debt_percent=1.0)).run()
+    with pytest.raises(ValueError, match="equity investment"):
+        IncrementalLBO(_lbo_inputs(debt_percent=1.0))
+
+    graph = IncrementalLBO(_lbo_inputs())
+    irr = graph.values["irr"]
+    with pytest.raises(ValueError, match="equity investment"):
+        graph.update({"debt_percent": 1.0})
+    assert graph.inputs["debt_percent"] == 0.6
+    assert graph.values["irr"] == irr
+
+
+def test_failed_update_leaves_graph_unchanged(monkeypatch):
+    graph = IncrementalDCF(_dcf_inputs())
+    before = dict(graph.values)
+
+    def fail(*args):
+        raise ValueError("boom")
+
+    nodes = tuple(node._replace(compute=fail) if node.name == "pv_terminal" else node for node in graph.nodes)
+    monkeypatch.setattr(IncrementalDCF, "nodes", nodes)
+    monkeypatch.setattr(IncrementalDCF, "_plans", {})
+    with pytest.raises(ValueError):
+        graph.update({"wacc": 0.07})
+
+    assert graph.inputs["wacc"] == 0.09
+    assert all(graph.values[name] is before[name] for name in before)
@@ -0,0 +1,68 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.services.modeling.irr import irr, npv, xirr
+
+
+@pytest.mark.parametrize("flows, expected", [
+    ([-100, 110], 0.10),
+    ([-100, 0, 121], 0.10),
+    ([-1000, 300, 400, 500], 0.0889633947),
+    ([-100, 39, 59, 55, 20], 0.2809484211),
+    ([-100, 50], -0.5),
+])
+def test_irr_of_known_cash_flows(flows, expected):
+    rate = irr(flows)
+    assert rate == pytest.approx(expected, abs=1e-9)
+    assert npv(rate, flows) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_irr_without_a_sign_change():
+    # Never paid back anything: total loss
+    assert irr([-100, 0, 0]) == -1.0
+    # Never invested: undefined
+    assert np.isnan(irr([100, 50, 25]))
+    assert np.isnan(irr([0, 0, 0]))
+
+
+def test_irr_rows_are_solved_independently():
+    flows = np.array([
+        [-100, 110, 0],
+        [-100, 0, 121],
+        [-100, 0, 0],
+        [100, 10, 10],
+    ])
+    np.testing.assert_allclose(irr(flows), [0.10, 0.10, -1.0, np.nan], atol=1e-9)
+
+
+def test_irr_falls_back_to_bisection(monkeypatch):
+    from app.services.modeling import irr as solver
+
+    # Deep losses send Newton out of its domain; bisection must still land on the root
+    flows = [-100, 0, 0, 0, 0, 0, 0, 0, 0, 0.0001]
+    monkeypatch.setattr(solver, 'MAX_NEWTON_ITERATIONS', 1)
+    rate = irr(flows)
+    assert rate == pytest.approx((0.0001 / 100) ** (1 / 9) - 1, rel=1e-8)
+
+
+def test_xirr_of_dated_cash_flows():
+    # One year apart on an Actual/365 basis
+    assert xirr([-1000, 1100], [date(2021, 1, 1), date(2022, 1, 1)]) == pytest.approx(0.10, abs=1e-9)
+
+    dates = [date(2020, 1, 1), date(2020, 3, 1), date(2020, 10, 30), date(2021, 2, 15)]
+    flows = [-10_000, 2_750, 4_250, 3_250]
+    # One sign change, so the root is unique
+    rate = xirr(flows, dates)
+    years = [(d - dates[0]).days / 365 for d in dates]
+    assert npv(rate, flows, years) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_xirr_accepts_datetime64_and_year_fractions():
+    dates = np.array(['2021-01-01', '2021-07-02', '2022-01-01'], dtype='datetime64[D]')
+    flows = [-100, 5, 105]
+    by_date = xirr(flows, dates)
+    by_fraction = xirr(flows, (dates - dates[0]).astype(np.float64) / 365)
+    assert by_date == pytest.approx(by_fraction, abs=1e-12)
+    assert xirr([-100, 0], dates[:2]) == -1.0
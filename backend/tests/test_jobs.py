@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from app.core.jobs import JobQueue, LocalJobStore, RedisJobStore
+
+
+def echo_task(params, job):
+    job.progress(0.5)
+    return {"echo": params["value"]}
+
+
+def _local_store():
+    return LocalJobStore()
+
+
+def _redis_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisJobStore(fakeredis.FakeRedis())
+
+
+@pytest.fixture(params=[_local_store, _redis_store], ids=["local", "redis"])
+def store(request):
+    return request.param()
+
+
+@pytest.fixture
+def idle_queue(store, monkeypatch):
+    """A queue whose dispatcher never starts, so tests drive the store directly"""
+    queue = JobQueue(store, {"echo": echo_task})
+    monkeypatch.setattr(queue, "_ensure_started", lambda: None)
+    return queue
+
+
+def test_higher_tiers_are_popped_first(idle_queue):
+    submitted = [idle_queue.submit("echo", {"value": tier}, tier)["id"]
+                 for tier in ("free", "enterprise", "free", "premium", "enterprise")]
+
+    popped = [idle_queue.store.pop() for _ in submitted]
+    # By tier, then in submission order within a tier
+    assert popped == [submitted[1], submitted[4], submitted[3], submitted[0], submitted[2]]
+    assert idle_queue.store.pop() is None
+
+
+def test_cancelled_job_cannot_be_started(idle_queue):
+    job_id = idle_queue.submit("echo", {"value": 1})["id"]
+
+    assert idle_queue.cancel(job_id)["status"] == "cancelled"
+    assert idle_queue.store.start(job_id, time.time()) is False
+    assert idle_queue.get(job_id)["status"] == "cancelled"
+
+
+def test_dispatch_wins_the_race_against_a_late_cancel(idle_queue):
+    job_id = idle_queue.submit("echo", {"value": 1})["id"]
+
+    assert idle_queue.store.pop() == job_id
+    assert idle_queue.store.start(job_id, time.time()) is True
+    # Taken twice (another dispatcher) is refused as well
+    assert idle_queue.store.start(job_id, time.time()) is False
+    # Too late to dequeue: the job is marked cancelled and its outcome discarded
+    assert idle_queue.cancel(job_id)["status"] == "cancelled"
+
+
+def test_finished_jobs_and_results_expire():
+    store = LocalJobStore()
+    queue = JobQueue(store, {"echo": echo_task}, result_ttl=0.0)
+    queue._ensure_started = lambda: None
+    job_id = queue.submit("echo", {"value": 1})["id"]
+
+    store.set_result(job_id, {"echo": 1}, queue.result_ttl)
+    queue._finish(job_id, "done", progress=1.0)
+    assert queue.get(job_id) is None
+    assert queue.result(job_id) is None
+
+
+def test_job_runs_to_completion():
+    queue = JobQueue(LocalJobStore(), {"echo": echo_task}, workers=1, start_method="fork")
+    try:
+        job_id = queue.submit("echo", {"value": 7})["id"]
+        deadline = time.monotonic() + 10
+        while queue.get(job_id)["status"] != "done":
+            assert time.monotonic() < deadline, "timed out"
+            time.sleep(0.02)
+        assert queue.result(job_id) == {"echo": 7}
+        assert queue.get(job_id)["expires_at"] is not None
+    finally:
+        queue.shutdown()
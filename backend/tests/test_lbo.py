@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.schemas.lbo import LBOInputs
+from app.services.modeling.lbo import BatchLBOModel, LBOModel
+
+RTOL = 1e-10
+RETURN_FIELDS = ('entry_equity', 'exit_equity', 'total_return', 'irr', 'moic')
+
+
+@pytest.fixture(autouse=True)
+def _no_model_cache(monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_CACHE_ENABLED", False)
+
+
+def _random_inputs(rng: np.random.Generator) -> LBOInputs:
+    return LBOInputs(
+        ticker="TEST",
+        company_name="Test",
+        purchase_price=rng.uniform(1e8, 1e10),
+        purchase_multiple=10.0,
+        exit_multiple=rng.uniform(5.0, 15.0),
+        debt_percent=rng.uniform(0.0, 0.9),
+        interest_rate=rng.uniform(0.02, 0.12),
+        base_revenue=rng.uniform(5e7, 5e9),
+        revenue_growth=rng.uniform(-0.1, 0.3),
+        ebitda_margin=rng.uniform(0.05, 0.5),
+        capex_percent=rng.uniform(0.0, 0.1),
+        nwc_percent=rng.uniform(0.0, 0.05),
+        tax_rate=rng.uniform(0.0, 0.35),
+        hold_period=int(rng.integers(1, 11)),
+        management_fees=rng.uniform(0.0, 0.03),
+    )
+
+
+def _reference_returns(inputs: LBOInputs) -> dict:
+    """One deal stepped through in plain Python"""
+    debt = inputs.purchase_price * inputs.debt_percent
+    entry_equity = inputs.purchase_price - debt
+    fee = entry_equity * inputs.management_fees
+    for year in range(1, inputs.hold_period + 1):
+        revenue = inputs.base_revenue * (1 + inputs.revenue_growth) ** year
+        ebitda = revenue * inputs.ebitda_margin
+        interest = debt * inputs.interest_rate
+        ebt = ebitda - interest
+        taxes = max(0.0, ebt * inputs.tax_rate)
+        fcf = ebt - taxes + interest - revenue * inputs.capex_percent - revenue * inputs.nwc_percent
+        debt = max(0.0, debt - min(fcf - fee, debt))
+
+    exit_equity = ebitda * inputs.exit_multiple - debt
+    moic = exit_equity / entry_equity
+    return {
+        'entry_equity': entry_equity,
+        'exit_equity': exit_equity,
+        'total_return': exit_equity - entry_equity,
+        'moic': moic,
+        # Single outflow and single inflow: IRR in closed form
+        'irr': moic ** (1 / inputs.hold_period) - 1 if moic > 0 else -1.0,
+    }
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_model_matches_reference(seed):
+    inputs = _random_inputs(np.random.default_rng(seed))
+    returns = LBOModel(inputs).run().returns
+    expected = _reference_returns(inputs)
+    for field in RETURN_FIELDS:
+        np.testing.assert_allclose(getattr(returns, field), expected[field], rtol=RTOL, atol=1e-9, err_msg=field)
+
+
+def test_batch_of_mixed_hold_periods_matches_single_models():
+    rng = np.random.default_rng(17)
+    deals = [_random_inputs(rng) for _ in range(25)]
+    batch = BatchLBOModel.from_inputs(deals)
+    returns = batch.run()
+
+    for index, deal in enumerate(deals):
+        outputs = LBOModel(deal).run()
+        for field in RETURN_FIELDS:
+            np.testing.assert_allclose(
+                returns[field][index], getattr(outputs.returns, field), rtol=RTOL, atol=1e-9, err_msg=field
+            )
+        np.testing.assert_allclose(batch.projection_table(index).values, outputs.projections.values, rtol=RTOL)
+
+
+def test_returns_grid_matches_single_models():
+    inputs = _random_inputs(np.random.default_rng(4))
+    exit_multiples = [6.0, 8.0, 10.0, 12.0]
+    debt_percents = [0.3, 0.5, 0.7]
+    grid = BatchLBOModel.returns_grid(inputs, exit_multiples, debt_percents)
+
+    assert grid['irr'].shape == (len(exit_multiples), len(debt_percents))
+    for x, multiple in enumerate(exit_multiples):
+        for y, debt_percent in enumerate(debt_percents):
+            deal = inputs.model_copy(update={'exit_multiple': multiple, 'debt_percent': debt_percent})
+            returns = LBOModel(deal).run().returns
+            np.testing.assert_allclose(grid['irr'][x, y], returns.irr, rtol=RTOL, atol=1e-9)
+            np.testing.assert_allclose(grid['moic'][x, y], returns.moic, rtol=RTOL, atol=1e-9)
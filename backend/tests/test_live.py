@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes import live as live_module
+from app.api.v1.routes.live import LiveValuation
+from app.api.v1.routes.what_if import build_graph
+from app.config import settings
+
+
+class FakeSocket:
+    """Collects sent messages; ``latency`` makes each send take a while"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sent = []
+
+    async def send_text(self, text: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent.append(json.loads(text))
+
+    def of_type(self, kind: str):
+        return [message for message in self.sent if message["type"] == kind]
+
+
+def _scenario(live: LiveValuation, events, settle: float = 0.15):
+    """Attach a DCF session, submit ``(delay, changes)`` events in order with seq 1, 2, ..."""
+    async def run():
+        await live.attach("session", build_graph("dcf", "AAPL", {}))
+        for seq, (delay, changes) in enumerate(events, 1):
+            live.submit(changes, seq)
+            await asyncio.sleep(delay)
+        await asyncio.sleep(settle)
+
+    asyncio.run(run())
+
+
+def test_a_burst_of_events_is_applied_once():
+    socket = FakeSocket()
+    live = LiveValuation(socket, debounce=0.05, max_wait=1.0)
+    events = [(0.005, {"wacc": wacc}) for wacc in (0.08, 0.09, 0.095)]
+    _scenario(live, events + [(0.005, {"terminal_growth_rate": 0.03})])
+
+    [diff] = socket.of_type("diff")
+    assert (diff["seq"], diff["version"]) == (4, 1)
+    assert diff["changed_inputs"] == ["terminal_growth_rate", "wacc"]
+    assert live.graph.inputs["wacc"] == 0.095
+    assert live.stats == {"events": 4, "recomputes": 1, "superseded": 3}
+
+
+def test_a_continuous_drag_still_gets_updates():
+    socket = FakeSocket()
+    live = LiveValuation(socket, debounce=0.05, max_wait=0.1)
+    _scenario(live, [(0.03, {"wacc": 0.08 + i * 0.001}) for i in range(10)])
+
+    diffs = socket.of_type("diff")
+    # max_wait forces an update during the drag; the last one carries the final event
+    assert len(diffs) >= 3
+    assert [diff["seq"] for diff in diffs] == sorted(diff["seq"] for diff in diffs)
+    assert [diff["version"] for diff in diffs] == list(range(1, len(diffs) + 1))
+    assert diffs[-1]["seq"] == 10
+    assert live.graph.inputs["wacc"] == pytest.approx(0.089)
+
+
+def test_diffs_go_out_in_order_behind_a_slow_send():
+    socket = FakeSocket(latency=0.04)
+    live = LiveValuation(socket, debounce=0.01, max_wait=0.1)
+    # The first recompute is still sending when the second one is ready
+    _scenario(live, [(0.06, {"wacc": 0.08}), (0.0, {"wacc": 0.09})], settle=0.2)
+
+    diffs = socket.of_type("diff")
+    assert [(diff["seq"], diff["version"]) for diff in diffs] == [(1, 1), (2, 2)]
+    assert live.stats["superseded"] == 0
+
+
+def test_close_applies_unsent_changes():
+    socket = FakeSocket()
+    live = LiveValuation(socket, debounce=1.0, max_wait=1.0)
+
+    async def run():
+        await live.attach("session", build_graph("dcf", "AAPL", {}))
+        live.submit({"wacc": 0.11}, 1)
+        live.close()
+
+    asyncio.run(run())
+    assert socket.of_type("diff") == []
+    assert live.graph.inputs["wacc"] == 0.11
+
+
+def test_websocket_debounces_updates(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(settings, "LIVE_DEBOUNCE_MS", 30)
+    monkeypatch.setattr(settings, "LIVE_MAX_WAIT_MS", 1000)
+    app = FastAPI()
+    app.include_router(live_module.router)
+
+    with TestClient(app).websocket_connect("/live") as websocket:
+        websocket.send_json({"type": "update", "changes": {"wacc": 0.09}})
+        assert websocket.receive_json()["type"] == "error"
+
+        websocket.send_json({"type": "open", "ticker": "aapl"})
+        snapshot = websocket.receive_json()
+        assert (snapshot["type"], snapshot["ticker"], snapshot["version"]) == ("snapshot", "AAPL", 0)
+
+        for seq, wacc in enumerate((0.08, 0.09, 0.1), 1):
+            websocket.send_json({"type": "update", "changes": {"wacc": wacc}, "seq": seq})
+        diff = websocket.receive_json()
+        assert (diff["type"], diff["seq"], diff["version"]) == ("diff", 3, 1)
+
+        websocket.send_json({"type": "snapshot"})
+        assert websocket.receive_json()["inputs"]["wacc"] == 0.1
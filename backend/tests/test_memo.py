@@ -0,0 +1,58 @@
+import asyncio
+
+import numpy as np
+
+from app.config import settings
+from app.core import compute
+from app.core.memo import ResultCache, estimate_size, get_model_cache
+from app.schemas.analysis import DCFInputs
+from app.services.data.mock_data import MockDataService
+from app.services.modeling import offload
+from app.services.modeling.dcf import DCFModel
+
+
+def _inputs(**overrides) -> DCFInputs:
+    return DCFInputs(**{**MockDataService().get_dcf_inputs("AAPL"), **overrides})
+
+
+def test_entries_are_sized_by_their_arrays():
+    outputs = DCFModel(_inputs()).run()
+    size = estimate_size(outputs)
+    assert outputs.projections.values.nbytes < size < outputs.projections.values.nbytes + 2048
+
+    grid = np.zeros((500, 500))
+    assert estimate_size({'grid': grid}) >= grid.nbytes
+
+
+def test_cache_evicts_by_size_and_drops_old_versions():
+    cache = ResultCache(max_bytes=3 * 8_000 + 500)
+    cache.register('grid', '1')
+    for key in range(4):
+        cache.put('grid', {'key': key}, np.zeros(1_000))
+    assert cache.get('grid', {'key': 0}) is None
+    assert all(cache.get('grid', {'key': key}) is not None for key in (1, 2, 3))
+    assert cache.stats['grid']['evictions'] == 1
+
+    cache.register('grid', '2')
+    assert cache.get('grid', {'key': 3}) is None
+    assert cache.get_stats()['bytes'] == 0
+
+
+def test_grid_is_memoized_on_the_valuation_inputs(monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_CACHE_ENABLED", True)
+    # Inline executor: compute in the test process
+    monkeypatch.setattr(compute, "_compute_executor", compute.ComputeExecutor(workers=0))
+    get_model_cache().clear()
+    axis = np.linspace(0.0, 0.2, 5)
+
+    def grid(inputs, output='value_per_share'):
+        return asyncio.run(offload.run_sensitivity_grid(inputs, 'revenue_growth', axis, 'ebitda_margin', axis, output))
+
+    first = grid(_inputs())
+    # Neither the ticker nor the price changes a value-per-share grid
+    assert grid(_inputs(ticker="OTHER", current_price=1.0)) is first
+    assert grid(_inputs(wacc=0.12)) is not first
+    # Upside does read the price
+    assert grid(_inputs(), 'upside') is not grid(_inputs(current_price=1.0), 'upside')
+    stats = get_model_cache().stats['sensitivity']
+    assert (stats['hits'], stats['misses']) == (1, 4)
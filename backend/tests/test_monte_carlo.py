@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.schemas.analysis import DCFInputs, MonteCarloDistribution
+from app.services.modeling.dcf import DCFModel
+from app.services.modeling.monte_carlo import PERCENTILES, MonteCarloValuation, StreamingHistogram
+
+
+@pytest.fixture(autouse=True)
+def _no_model_cache(monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_CACHE_ENABLED", False)
+
+
+def _inputs(**overrides) -> DCFInputs:
+    values = dict(
+        ticker="TEST", base_revenue=1e9, revenue_growth=0.08, ebitda_margin=0.3, net_margin=0.15,
+        capex_percent=0.05, da_percent=0.03, nwc_percent=0.02, tax_rate=0.21, wacc=0.09,
+        terminal_growth_rate=0.025, projection_years=10, net_debt=2e8, shares_outstanding=1e8,
+        current_price=50.0,
+    )
+    return DCFInputs(**{**values, **overrides})
+
+
+def _fixed(value: float) -> MonteCarloDistribution:
+    return MonteCarloDistribution(distribution='fixed', value=value)
+
+
+def test_same_seed_gives_identical_outputs():
+    simulation = MonteCarloValuation(_inputs())
+    first = simulation.run(paths=50_000, seed=42, chunk_size=8_192)
+    second = MonteCarloValuation(_inputs()).run(paths=50_000, seed=42, chunk_size=8_192)
+    assert first == second
+
+    other = simulation.run(paths=50_000, seed=43, chunk_size=8_192)
+    assert other.value_per_share.mean != first.value_per_share.mean
+
+
+def test_percentiles_match_the_exact_distribution():
+    # Only WACC varies, and value per share falls as WACC rises, so the p-th
+    # percentile of value is the model valued at the (1 - p) quantile of WACC
+    low, high = 0.08, 0.12
+    distributions = {
+        'wacc': MonteCarloDistribution(distribution='uniform', low=low, high=high),
+        'revenue_growth': _fixed(0.08),
+        'ebitda_margin': _fixed(0.3),
+        'terminal_growth_rate': _fixed(0.025),
+    }
+    outputs = MonteCarloValuation(_inputs(), distributions).run(paths=200_000, seed=7)
+
+    for p in PERCENTILES:
+        wacc = low + (1 - p / 100) * (high - low)
+        expected = DCFModel(_inputs(wacc=wacc)).run().value_per_share
+        np.testing.assert_allclose(outputs.value_per_share.percentiles[f"p{p}"], expected, rtol=2e-3, err_msg=f"p{p}")
+
+
+def test_streaming_histogram_quantiles_and_merge():
+    values = np.random.default_rng(0).normal(100.0, 15.0, 100_000)
+    edges = np.linspace(20.0, 180.0, 4001)
+
+    merged = StreamingHistogram(edges)
+    for chunk in np.array_split(values, 7):
+        part = StreamingHistogram(edges)
+        part.update(chunk)
+        merged.merge(part)
+
+    probabilities = [p / 100 for p in PERCENTILES]
+    np.testing.assert_allclose(merged.quantiles(probabilities), np.quantile(values, probabilities), atol=0.05)
+    assert merged.count == values.size
+    assert merged.mean == pytest.approx(values.mean())
+    assert merged.std == pytest.approx(values.std(ddof=1))
+    assert (merged.min, merged.max) == (values.min(), values.max())
@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.middleware import rate_limit as middleware
+from app.config import settings
+from app.core.entitlements import monthly_analysis_limit
+from app.core.rate_limit import LocalRateLimiter, RedisRateLimiter
+from app.models.user import User, UserTier
+
+
+def _local_limiter():
+    return LocalRateLimiter()
+
+
+def _redis_limiter():
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisRateLimiter(fakeredis.FakeRedis())
+
+
+@pytest.fixture(params=[_local_limiter, _redis_limiter], ids=["local", "redis"])
+def limiter(request):
+    return request.param()
+
+
+def _connection(host: str):
+    return SimpleNamespace(client=SimpleNamespace(host=host))
+
+
+@pytest.fixture
+def metered(monkeypatch):
+    """Quotas enforced on a fresh local limiter, with usage recorded in a list"""
+    limiter, recorded = LocalRateLimiter(), []
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(middleware, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(middleware, "get_usage_recorder",
+                        lambda: SimpleNamespace(record=lambda user_id, period: recorded.append((user_id, period))))
+    monkeypatch.setattr(middleware, "usage_period", lambda: "202610")
+    return recorded
+
+
+def _run(user, connection, fail: bool = False):
+    async def scenario():
+        async with middleware.charged_analysis(user, connection):
+            if fail:
+                raise RuntimeError("model failed")
+
+    asyncio.run(scenario())
+
+
+def test_sliding_window_weighs_the_previous_window(limiter):
+    decisions = [limiter.hit("ip:1.2.3.4", 10, 60, now=600.0 + i) for i in range(11)]
+    assert [decision.allowed for decision in decisions] == [True] * 10 + [False]
+    assert decisions[-1].retry_after > 0
+
+    # Halfway into the next window half of the previous one still counts
+    assert sum(limiter.hit("ip:1.2.3.4", 10, 60, now=690.0).allowed for _ in range(10)) == 5
+    # Two windows on, the slate is clean
+    assert all(limiter.hit("ip:1.2.3.4", 10, 60, now=780.0).allowed for _ in range(10))
+
+
+def test_quota_counts_per_month(limiter):
+    assert all(limiter.consume("user:1:202610", 3, 1).allowed for _ in range(2))
+    assert not limiter.consume("user:1:202610", 3, 1).allowed
+    limiter.release("user:1:202610")
+    assert limiter.consume("user:1:202610", 3, 1).allowed
+    # A new billing month is a new counter, seeded from the new month's count
+    assert limiter.consume("user:1:202611", 3, 0).remaining == 2
+
+
+def test_user_counts_reset_with_the_billing_month():
+    user = User(id=1, tier=UserTier.FREE, monthly_analyses=10, usage_period="202609")
+    assert user.analyses_in_period("202609") == 10
+    assert user.analyses_in_period("202610") == 0
+
+
+def test_anonymous_callers_get_the_free_quota_per_ip(metered, monkeypatch):
+    free = monthly_analysis_limit(UserTier.FREE)
+    for _ in range(free):
+        _run(None, _connection("1.2.3.4"))
+    with pytest.raises(HTTPException) as excinfo:
+        _run(None, _connection("1.2.3.4"))
+    assert excinfo.value.status_code == 429
+
+    # Other clients and the next month are unaffected; nothing is recorded against a user row
+    _run(None, _connection("5.6.7.8"))
+    monkeypatch.setattr(middleware, "usage_period", lambda: "202611")
+    _run(None, _connection("1.2.3.4"))
+    assert metered == []
+
+
+def test_failed_runs_are_not_charged(metered):
+    user = User(id=7, tier=UserTier.FREE, monthly_analyses=9, usage_period="202610")
+    with pytest.raises(RuntimeError):
+        _run(user, None, fail=True)
+    with pytest.raises(RuntimeError):
+        _run(None, _connection("1.2.3.4"), fail=True)
+
+    # The one remaining run is still there, and only a success is recorded
+    _run(user, None)
+    assert metered == [(7, "202610")]
+    with pytest.raises(HTTPException):
+        _run(user, None)
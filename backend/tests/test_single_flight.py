@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight(result_ttl=60.0)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"value": len(calls)}
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("dcf:abc", compute) for _ in range(10)))
+        other = await flight.do("dcf:def", compute)
+        cached = await flight.do("dcf:abc", compute)
+        return results, other, cached
+
+    results, other, cached = asyncio.run(scenario())
+    assert all(result is results[0] for result in results)
+    assert other == {"value": 2}
+    assert cached is results[0]
+    assert len(calls) == 2
+
+    stats = flight.get_stats()["namespaces"]["dcf"]
+    assert (stats["requests"], stats["executed"], stats["collapsed"], stats["cached"]) == (12, 2, 9, 1)
+
+
+def test_failures_are_shared_but_not_cached():
+    flight = SingleFlight(result_ttl=60.0)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("boom")
+        return "ok"
+
+    async def scenario():
+        first = await asyncio.gather(flight.do("lbo:x", compute), flight.do("lbo:x", compute),
+                                     return_exceptions=True)
+        return first, await flight.do("lbo:x", compute)
+
+    first, retry = asyncio.run(scenario())
+    assert all(isinstance(error, ValueError) for error in first)
+    assert retry == "ok"
+    assert len(calls) == 2
+
+
+def test_a_cancelled_caller_does_not_cancel_the_flight():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def scenario():
+        impatient = asyncio.create_task(flight.do("dcf:k", compute))
+        patient = asyncio.create_task(flight.do("dcf:k", compute))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await patient
+
+    assert asyncio.run(scenario()) == 42
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from app.services.data.async_fetcher import TokenBucket
+from app.services.data.cache import MarketDataCache, MemoryCache
+from app.services.data.yahoo_finance import YahooFinanceService
+
+
+class SlowDownloads:
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.calls = []
+        self.in_flight = self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker: str):
+        with self._lock:
+            self.calls.append(ticker)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        if ticker == "FAIL":
+            raise RuntimeError("no statements")
+        return {"ticker": ticker, "base_revenue": 1.0}
+
+
+def _service(downloads, monkeypatch) -> YahooFinanceService:
+    service = YahooFinanceService(
+        cache=MarketDataCache([MemoryCache()]),
+        limiter=TokenBucket(rate=1000.0, capacity=100),
+        max_concurrency=4
+    )
+    monkeypatch.setattr(service, "_download_dcf_inputs", downloads)
+    return service
+
+
+def test_bulk_inputs_are_fetched_concurrently_and_cached(monkeypatch):
+    downloads = SlowDownloads()
+    service = _service(downloads, monkeypatch)
+    tickers = [f"T{i}" for i in range(8)]
+
+    started = time.perf_counter()
+    inputs = service.get_bulk_dcf_inputs(tickers + ["t0"])
+    elapsed = time.perf_counter() - started
+
+    assert list(inputs) == tickers
+    assert downloads.peak == 4
+    assert elapsed < 8 * downloads.latency
+    # Cached tickers are neither downloaded again nor charged a token
+    service.get_bulk_dcf_inputs(tickers)
+    assert sorted(downloads.calls) == sorted(tickers)
+
+
+def test_failed_tickers_get_uncached_defaults(monkeypatch):
+    downloads = SlowDownloads(latency=0.0)
+    service = _service(downloads, monkeypatch)
+
+    inputs = service.get_bulk_dcf_inputs(["AAPL", "FAIL"])
+    assert inputs["AAPL"] == {"ticker": "AAPL", "base_revenue": 1.0}
+    assert inputs["FAIL"] == service._get_default_dcf_inputs("FAIL")
+
+    service.get_bulk_dcf_inputs(["AAPL", "FAIL"])
+    assert downloads.calls.count("FAIL") == 2
+    assert downloads.calls.count("AAPL") == 1